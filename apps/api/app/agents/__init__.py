@@ -1,47 +1,44 @@
 """
 Flipside AI Agents Package
 4 AI agents working together for critical thinking analysis
+
+Exports are resolved on first access: importing a light submodule such as
+app.agents.utils does not pull in the nodes, langgraph and google-genai.
 """
 
-from .prompts import (
-    ANALYZER_PROMPT,
-    SOURCE_VERIFIER_PROMPT,
-    PERSPECTIVE_EXPLORER_PROMPT,
-    SOCRATES_PROMPT,
-    CONTENT_PARSER_PROMPT,
-)
-
-from .nodes import (
-    analyzer_node,
-    source_verifier_node,
-    perspective_explorer_node,
-    socrates_init_node,
-    aggregate_results_node,
-)
-
-from .graph import (
-    FlipsideState,
-    get_initial_state,
-    create_flipside_graph,
-    get_flipside_graph,
-)
-
-__all__ = [
+import importlib
+
+_EXPORTS = {
     # Prompts
-    "ANALYZER_PROMPT",
-    "SOURCE_VERIFIER_PROMPT",
-    "PERSPECTIVE_EXPLORER_PROMPT",
-    "SOCRATES_PROMPT",
-    "CONTENT_PARSER_PROMPT",
+    "SOURCE_VERIFIER_PROMPT": ".prompts",
+    "PERSPECTIVE_EXPLORER_PROMPT": ".prompts",
+    "CONTENT_PARSER_PROMPT": ".prompts",
     # Nodes
-    "analyzer_node",
-    "source_verifier_node",
-    "perspective_explorer_node",
-    "socrates_init_node",
-    "aggregate_results_node",
+    "analyzer_node": ".nodes",
+    "source_verifier_node": ".nodes",
+    "perspective_explorer_node": ".nodes",
+    "socrates_init_node": ".nodes",
+    "aggregate_results_node": ".nodes",
     # Graph
-    "FlipsideState",
-    "get_initial_state",
-    "create_flipside_graph",
-    "get_flipside_graph",
-]
+    "FlipsideState": ".graph",
+    "get_initial_state": ".graph",
+    "create_checkpointer": ".graph",
+    "create_flipside_graph": ".graph",
+    "get_flipside_graph": ".graph",
+    "get_thread_config": ".graph",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,93 @@
+"""Per-session node outputs for readiness-driven scheduling.
+
+LangGraph runs nodes in supersteps: a node joined on several parents only
+starts after the whole previous superstep has finished, including parents
+it does not need. Nodes that depend on only some of their siblings (e.g.
+expanded topics needs the bias stage and perspectives, but not the
+search-grounded source verifier or Socrates) therefore run in the same
+superstep as their producers and await just those producers' outputs here.
+
+Every graph node publishes its output when it finishes (see
+graph._publishing); a failed node publishes {} so its consumers never hang.
+"""
+
+import asyncio
+import logging
+
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class NodeOutputs:
+    """Outputs of the nodes of one graph run, awaitable by node name."""
+
+    def __init__(self):
+        self._futures: dict[str, asyncio.Future] = {}
+
+    def _future(self, node: str) -> asyncio.Future:
+        future = self._futures.get(node)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[node] = future
+        return future
+
+    def publish(self, node: str, output: dict):
+        """Record a node's output and wake up everyone waiting for it."""
+        future = self._future(node)
+        if not future.done():
+            future.set_result(output or {})
+
+    async def wait_for(self, *nodes: str) -> dict:
+        """Merged outputs of the given nodes, in argument order."""
+        outputs = await asyncio.gather(*(self._future(node) for node in nodes))
+        merged = {}
+        for output in outputs:
+            merged.update(output)
+        return merged
+
+
+_node_outputs: TTLCache[NodeOutputs] = TTLCache(ttl=10 * 60, max_entries=1000)
+
+
+def get_node_outputs(session_id: str) -> NodeOutputs:
+    """The session's NodeOutputs, created on first use."""
+    outputs = _node_outputs.get(session_id)
+    if outputs is None:
+        outputs = NodeOutputs()
+        _node_outputs.set(session_id, outputs)
+    return outputs
+
+
+def reset_node_outputs(session_id: str) -> NodeOutputs:
+    """Start a fresh NodeOutputs for a new graph run of the session."""
+    outputs = NodeOutputs()
+    _node_outputs.set(session_id, outputs)
+    return outputs
+
+
+async def wait_for_inputs(state: dict, *nodes: str) -> dict:
+    """State as seen after the given sibling nodes have finished.
+
+    The node's own state snapshot is taken at the start of its superstep;
+    the producers' outputs are layered on top once all of them are ready.
+    Fields only accumulated through reducers (agent_statuses, errors) are
+    left as in the snapshot.
+    """
+    outputs = await get_node_outputs(state.get("session_id", "")).wait_for(*nodes)
+    outputs.pop("agent_statuses", None)
+    outputs.pop("errors", None)
+    return {**state, **outputs}
+
+
+def publish_completed_tasks(session_id: str, snapshot) -> None:
+    """Publish outputs of tasks that finished before a run was interrupted.
+
+    On resume those nodes are not executed again, so their consumers would
+    otherwise wait forever.
+    """
+    outputs = get_node_outputs(session_id)
+    for task in snapshot.tasks:
+        if task.result is not None:
+            logger.info(f"[Dataflow] Restored output of {task.name} (session={session_id})")
+            outputs.publish(task.name, task.result)
@@ -4,14 +4,38 @@ Flipside LangGraph State and Graph Definition
 Graph Flow:
 START -> Analyzer(A) -> [Source(B) | Perspective(C) | Socrates Init(D)] -> Aggregate -> END
                         (parallel execution)
+START -> Perspective Speculator -> Perspective(C)
+         (starts the perspective search before the analyzer finishes)
+Analyzer(A) -> Bias Analyzer -> Aggregate
+         (deep Pro bias analysis, started together with the fast Flash claim extraction)
+Analyzer(A) -> [Steel Man | Expanded Topics] -> Aggregate
+         (run alongside B, C, D and the bias stage; each starts as soon as the
+         sibling outputs it needs are published, see app.agents.dataflow)
+
+The graph is compiled with a checkpointer (settings.graph_checkpointer) keyed
+by session_id, so an interrupted run resumes from the last completed node
+instead of starting over from START.
 """
 
+import asyncio
+import functools
+import logging
 import operator
-from typing import Annotated, Literal, Optional
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Annotated, Callable, Literal, Optional
 
 from typing_extensions import TypedDict
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import StateGraph, START, END
 
+from app.agents.dataflow import get_node_outputs
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
 
 # ====================
 # Type Definitions
@@ -110,6 +134,8 @@ class FlipsideState(TypedDict):
     session_id: str
     content_type: str  # 'url' | 'text' | 'image'
     content: str
+    content_ref: Optional[str]  # blob id of large text / image payloads
+    analysis_mode: str  # 'fast' | 'balanced' | 'deep' (selects generation profiles)
 
     # Agent A (Analyzer) Output
     claims: list[Claim]
@@ -120,6 +146,9 @@ class FlipsideState(TypedDict):
     source_verifier_instructions: dict
     perspective_instructions: dict
 
+    # Downstream results of a near-identical past analysis (see services/similarity)
+    reused_result: Optional[dict]
+
     # Agent B (Source Verifier) Output
     verified_sources: list[VerifiedSource]
     overall_trust_score: int
@@ -138,6 +167,9 @@ class FlipsideState(TypedDict):
 
     # Aggregate Output
     steel_man: Optional[dict]
+    alternative_framing: str
+    expanded_topics: list
+    related_content: list
 
     # Status tracking (append-only for parallel nodes)
     agent_statuses: Annotated[list[AgentStatusUpdate], operator.add]
@@ -149,7 +181,9 @@ class FlipsideState(TypedDict):
 def get_initial_state(
     session_id: str,
     content_type: str,
-    content: str
+    content: str,
+    content_ref: Optional[str] = None,
+    analysis_mode: Optional[str] = None,
 ) -> FlipsideState:
     """Create initial state for a new analysis session."""
     return FlipsideState(
@@ -157,6 +191,8 @@ def get_initial_state(
         session_id=session_id,
         content_type=content_type,
         content=content,
+        content_ref=content_ref,
+        analysis_mode=analysis_mode or settings.analysis_default_mode,
 
         # Agent A outputs (will be filled)
         claims=[],
@@ -166,6 +202,7 @@ def get_initial_state(
         information_biases=[],
         source_verifier_instructions={},
         perspective_instructions={},
+        reused_result=None,
 
         # Agent B outputs
         verified_sources=[],
@@ -185,6 +222,9 @@ def get_initial_state(
 
         # Aggregate outputs
         steel_man=None,
+        alternative_framing="",
+        expanded_topics=[],
+        related_content=[],
 
         # Tracking
         agent_statuses=[],
@@ -196,54 +236,186 @@ def get_initial_state(
 # Graph Builder
 # ====================
 
-def create_flipside_graph():
+# Callbacks receiving (session_id, node_name, started_at, ended_at) with
+# time.perf_counter() timestamps after every node run (used by benchmarks).
+NODE_TIMING_HOOKS: list[Callable[[str, str, float, float], None]] = []
+
+
+def _timed(name: str, node):
+    """Wrap a node so its wall time is logged and reported to NODE_TIMING_HOOKS."""
+
+    @functools.wraps(node)
+    async def timed_node(state: dict) -> dict:
+        started_at = time.perf_counter()
+        try:
+            return await node(state)
+        finally:
+            ended_at = time.perf_counter()
+            session_id = state.get("session_id", "")
+            logger.info(f"[Graph] {name} finished in {ended_at - started_at:.3f}s (session={session_id})")
+            for hook in NODE_TIMING_HOOKS:
+                hook(session_id, name, started_at, ended_at)
+
+    return timed_node
+
+
+def _publishing(name: str, node):
+    """Wrap a node so its output is published to the session's NodeOutputs.
+
+    Failed nodes publish {} so nodes waiting on them never hang.
+    """
+
+    @functools.wraps(node)
+    async def publishing_node(state: dict) -> dict:
+        output = {}
+        try:
+            output = await node(state)
+            return output
+        finally:
+            get_node_outputs(state.get("session_id", "")).publish(name, output)
+
+    return publishing_node
+
+
+def _add_node(builder: StateGraph, name: str, node):
+    builder.add_node(name, _timed(name, _publishing(name, node)))
+
+
+def create_checkpointer(kind: Optional[str] = None) -> Optional[BaseCheckpointSaver]:
+    """Create the configured checkpointer ("none" | "memory" | "sqlite").
+
+    Only "sqlite" survives a worker restart: sessions live in the in-memory
+    SessionStore, and /api/stream rebuilds a missing one from its checkpoint
+    (content, blob reference, mode). Its usage ledger, chat context and
+    /api/result state start over, and a swept blob cannot be resumed.
+    """
+    kind = kind or settings.graph_checkpointer
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return InMemorySaver()
+    if kind == "sqlite":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise RuntimeError(
+                "graph_checkpointer='sqlite' requires the langgraph-checkpoint-sqlite package"
+            ) from e
+        path = Path(settings.graph_checkpoint_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return AsyncSqliteSaver(aiosqlite.connect(path))
+    raise ValueError(f"Unknown graph checkpointer: {kind}")
+
+
+# Threads whose checkpoints are kept so a failed or cancelled run can resume,
+# oldest first; completed runs delete theirs (see release_checkpoints).
+_retained_threads: OrderedDict[str, None] = OrderedDict()
+
+
+async def release_checkpoints(session_id: str):
+    """Delete a session's checkpoints once its run completed (nothing left to resume)."""
+    _retained_threads.pop(session_id, None)
+    graph = _flipside_graph
+    checkpointer = graph.checkpointer if graph is not None else None
+    if checkpointer is None:
+        return
+    setup = getattr(checkpointer, "setup", None)
+    if setup is not None:
+        await setup()  # the sqlite saver connects lazily and adelete_thread does not
+    await checkpointer.adelete_thread(session_id)
+
+
+def retain_checkpoints(session_id: str):
+    """Keep a failed or cancelled run's checkpoints for a resume, up to
+    graph_checkpoint_max_retained sessions (the oldest are deleted)."""
+    _retained_threads[session_id] = None
+    _retained_threads.move_to_end(session_id)
+    while len(_retained_threads) > settings.graph_checkpoint_max_retained:
+        evicted, _ = _retained_threads.popitem(last=False)
+        asyncio.create_task(release_checkpoints(evicted))
+
+
+def get_thread_config(session_id: str) -> dict:
+    """Run config that keys checkpoints by session id."""
+    return {"configurable": {"thread_id": session_id}}
+
+
+def create_flipside_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
     """
     Create the main Flipside analysis graph.
 
     Graph structure:
     - START: Entry point
-    - analyzer: Agent A - parses content, extracts claims, detects biases
+    - analyzer: Agent A (fast stage) - parses content, extracts claims and instructions
+    - bias_analyzer: Agent A (deep stage) - logic structure, instincts, information biases (parallel)
     - source_verifier: Agent B - verifies sources (parallel)
+    - perspective_speculator: starts Agent C's search from local keywords at START
     - perspective_explorer: Agent C - finds alternative views (parallel)
     - socrates_init: Agent D - prepares dialogue context (parallel)
-    - aggregate_results: Combines all results
+    - steel_man: Steel Man once bias, perspectives and sources are ready (parallel)
+    - expanded_topics: expanded topics once bias and perspectives are ready (parallel)
+    - aggregate_results: Final step after all of the above
     - END: Exit point
+
+    With a checkpointer, runs must pass get_thread_config(session_id).
     """
-    from app.agents.nodes.analyzer import analyzer_node
+    from app.agents.nodes.analyzer import analyzer_node, bias_analyzer_node
     from app.agents.nodes.source_verifier import source_verifier_node
-    from app.agents.nodes.perspective import perspective_explorer_node
+    from app.agents.nodes.perspective import perspective_explorer_node, perspective_speculator_node
     from app.agents.nodes.socrates import socrates_init_node
-    from app.agents.nodes.aggregate import aggregate_results_node
+    from app.agents.nodes.aggregate import aggregate_results_node, expanded_topics_node, steel_man_node
 
     builder = StateGraph(FlipsideState)
 
     # Add nodes
-    builder.add_node("analyzer", analyzer_node)
-    builder.add_node("source_verifier", source_verifier_node)
-    builder.add_node("perspective_explorer", perspective_explorer_node)
-    builder.add_node("socrates_init", socrates_init_node)
-    builder.add_node("aggregate_results", aggregate_results_node)
+    _add_node(builder, "analyzer", analyzer_node)
+    _add_node(builder, "bias_analyzer", bias_analyzer_node)
+    _add_node(builder, "source_verifier", source_verifier_node)
+    _add_node(builder, "perspective_speculator", perspective_speculator_node)
+    _add_node(builder, "perspective_explorer", perspective_explorer_node)
+    _add_node(builder, "socrates_init", socrates_init_node)
+    _add_node(builder, "steel_man", steel_man_node)
+    _add_node(builder, "expanded_topics", expanded_topics_node)
+    _add_node(builder, "aggregate_results", aggregate_results_node)
 
     # Define edges
-    # START -> Analyzer
+    # START -> Analyzer, plus the speculative perspective search
     builder.add_edge(START, "analyzer")
+    builder.add_edge(START, "perspective_speculator")
 
     # Analyzer -> Parallel execution of B, C, D
     # LangGraph automatically runs these in parallel since they
     # all originate from the same source and don't depend on each other
     builder.add_edge("analyzer", "source_verifier")
-    builder.add_edge("analyzer", "perspective_explorer")
+    builder.add_edge(["analyzer", "perspective_speculator"], "perspective_explorer")
     builder.add_edge("analyzer", "socrates_init")
-
-    # All parallel nodes -> Aggregate
-    builder.add_edge("source_verifier", "aggregate_results")
-    builder.add_edge("perspective_explorer", "aggregate_results")
-    builder.add_edge("socrates_init", "aggregate_results")
+    builder.add_edge("analyzer", "bias_analyzer")
+
+    # Aggregate sub-tasks share the superstep with the agents they read from.
+    # A join edge would make them wait for the whole superstep (including
+    # the search-grounded source verifier and Socrates); instead they await
+    # just their own producers' outputs.
+    builder.add_edge("analyzer", "steel_man")
+    builder.add_edge("analyzer", "expanded_topics")
+
+    # All parallel nodes -> Aggregate (waits for all of them)
+    builder.add_edge(
+        [
+            "source_verifier",
+            "perspective_explorer",
+            "socrates_init",
+            "bias_analyzer",
+            "steel_man",
+            "expanded_topics",
+        ],
+        "aggregate_results",
+    )
 
     # Aggregate -> END
     builder.add_edge("aggregate_results", END)
 
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
 
 
 # Pre-compiled graph instance (for reuse)
@@ -251,8 +423,21 @@ _flipside_graph = None
 
 
 def get_flipside_graph():
-    """Get or create the compiled graph."""
+    """Get or create the compiled graph (with the configured checkpointer)."""
     global _flipside_graph
     if _flipside_graph is None:
-        _flipside_graph = create_flipside_graph()
+        _flipside_graph = create_flipside_graph(create_checkpointer())
     return _flipside_graph
+
+
+async def close_flipside_graph():
+    """Close the compiled graph's checkpointer connection (call on application shutdown).
+
+    The sqlite saver runs its connection on a non-daemon thread, which would
+    otherwise keep the interpreter from exiting.
+    """
+    global _flipside_graph
+    graph, _flipside_graph = _flipside_graph, None
+    conn = getattr(graph.checkpointer, "conn", None) if graph is not None else None
+    if conn is not None:
+        await conn.close()
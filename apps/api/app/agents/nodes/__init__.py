@@ -3,16 +3,20 @@ Flipside Agent Nodes
 LangGraph nodes for the 4 AI agents
 """
 
-from .analyzer import analyzer_node
+from .analyzer import analyzer_node, bias_analyzer_node
 from .source_verifier import source_verifier_node
-from .perspective import perspective_explorer_node
+from .perspective import perspective_explorer_node, perspective_speculator_node
 from .socrates import socrates_init_node
-from .aggregate import aggregate_results_node
+from .aggregate import aggregate_results_node, expanded_topics_node, steel_man_node
 
 __all__ = [
     "analyzer_node",
+    "bias_analyzer_node",
     "source_verifier_node",
     "perspective_explorer_node",
+    "perspective_speculator_node",
     "socrates_init_node",
+    "steel_man_node",
+    "expanded_topics_node",
     "aggregate_results_node",
 ]
@@ -1,118 +1,146 @@
-"""Aggregate Results Node - Generates Steel Man analysis"""
-import asyncio
-import json
-from google import genai
+"""Aggregate Results Nodes - Steel Man, expanded topics and the final step
+
+Steel Man and expanded topics run in the same superstep as the agents they
+read from and start as soon as their own inputs are ready (see
+app.agents.dataflow), instead of waiting for every agent to finish.
+"""
 from google.genai import types
-from app.core.config import settings
-from app.agents.prompts import STEEL_MAN_GENERATOR_PROMPT, EXPANDED_TOPICS_PROMPT
-from app.agents.utils import extract_json
+from app.core.gemini import generate_for_node, get_gemini_client, node_enabled
+from app.agents.dataflow import wait_for_inputs
+from app.agents.prompts import STEEL_MAN_GENERATOR_TEMPLATE, EXPANDED_TOPICS_TEMPLATE
+from app.agents.utils import extract_json, state_json
 
+# Producer nodes each sub-task reads from.
+STEEL_MAN_INPUTS = ("bias_analyzer", "perspective_explorer", "source_verifier")
+EXPANDED_TOPICS_INPUTS = ("bias_analyzer", "perspective_explorer")
 
-async def aggregate_results_node(state: dict) -> dict:
+
+async def steel_man_node(state: dict) -> dict:
     """
-    Aggregates results from all parallel agents.
     Generates Steel Man analysis with refutation points.
-    Generates expanded topics and related content.
+    Needs claims, biases, perspectives and verified sources.
     """
-    print("[AGGREGATE] Node called!", flush=True)
+    print("[STEEL_MAN] Node called!", flush=True)
 
+    reused = state.get("reused_result")
+    if reused:
+        print("[STEEL_MAN] Reusing Steel Man from a near-identical analysis", flush=True)
+        return {"steel_man": reused.get("steel_man")}
+
+    state = await wait_for_inputs(state, *STEEL_MAN_INPUTS)
     claims = state.get("claims", [])
     detected_biases = state.get("detected_biases", [])
     perspectives = state.get("perspectives", [])
-    verified_sources = state.get("verified_sources", [])
 
-    print(f"[AGGREGATE] claims={len(claims)}, biases={len(detected_biases)}, perspectives={len(perspectives)}", flush=True)
+    print(f"[STEEL_MAN] claims={len(claims)}, biases={len(detected_biases)}, perspectives={len(perspectives)}", flush=True)
 
     steel_man = None
-    expanded_topics = []
-    related_content = []
-    alternative_framing = ""
-
-    # Generate Steel Man and Expanded Topics in parallel
     if claims or detected_biases or perspectives:
         try:
-            print("[AGGREGATE] Calling Gemini for Steel Man and Expanded Topics...", flush=True)
-            client = genai.Client(api_key=settings.gemini_api_key)
-
-            # Steel Man prompt
-            steel_man_prompt = STEEL_MAN_GENERATOR_PROMPT.format(
-                claims=json.dumps(claims, ensure_ascii=False),
-                biases=json.dumps(detected_biases, ensure_ascii=False),
-                perspectives=json.dumps(perspectives[:3], ensure_ascii=False),
-                sources=json.dumps(verified_sources[:2], ensure_ascii=False),
+            print("[STEEL_MAN] Calling Gemini...", flush=True)
+            prompt = STEEL_MAN_GENERATOR_TEMPLATE.render(
+                claims=state_json(state, "claims"),
+                biases=state_json(state, "detected_biases"),
+                perspectives=state_json(state, "perspectives", limit=3),
+                sources=state_json(state, "verified_sources", limit=2),
             )
-
-            # Expanded Topics prompt
-            expanded_prompt = EXPANDED_TOPICS_PROMPT.format(
-                claims=json.dumps(claims, ensure_ascii=False),
-                biases=json.dumps(detected_biases, ensure_ascii=False),
-                perspectives=json.dumps(perspectives[:3], ensure_ascii=False),
-            )
-
-            # Run both API calls in parallel
-            steel_man_task = client.aio.models.generate_content(
-                model=settings.gemini_model_pro,
-                contents=steel_man_prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    temperature=0.7,
-                ),
+            response = await generate_for_node(
+                get_gemini_client(),
+                "steel_man",
+                prompt,
+                mode=state.get("analysis_mode"),
+                response_mime_type="application/json",
             )
+            print(f"[STEEL_MAN] Response: {response.text[:100]}...", flush=True)
+            result = extract_json(response.text)
+            if result:
+                steel_man = {
+                    "opposing_argument": result.get("opposingArgument", ""),
+                    "strengthened_argument": result.get("strengthenedArgument", ""),
+                    "refutation_points": result.get("refutationPoints", []),
+                }
+                print(f"[STEEL_MAN] Created with {len(steel_man.get('refutation_points', []))} points", flush=True)
+        except Exception as e:
+            print(f"[STEEL_MAN] ERROR: {e}", flush=True)
+    else:
+        print("[STEEL_MAN] No data for Steel Man", flush=True)
 
-            # Use Flash model with Google Search for related content
-            expanded_task = client.aio.models.generate_content(
-                model=settings.gemini_model_flash,
-                contents=expanded_prompt,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearch())],
-                    temperature=0.7,
-                ),
-            )
+    return {"steel_man": steel_man}
 
-            steel_man_response, expanded_response = await asyncio.gather(
-                steel_man_task, expanded_task, return_exceptions=True
-            )
 
-            # Process Steel Man response
-            if not isinstance(steel_man_response, Exception):
-                print(f"[AGGREGATE] Steel Man response: {steel_man_response.text[:100]}...", flush=True)
-                result = extract_json(steel_man_response.text)
-                if result:
-                    steel_man = {
-                        "opposing_argument": result.get("opposingArgument", ""),
-                        "strengthened_argument": result.get("strengthenedArgument", ""),
-                        "refutation_points": result.get("refutationPoints", []),
-                    }
-                    print(f"[AGGREGATE] Steel Man created with {len(steel_man.get('refutation_points', []))} points", flush=True)
-            else:
-                print(f"[AGGREGATE] Steel Man ERROR: {steel_man_response}", flush=True)
-
-            # Process Expanded Topics response
-            if not isinstance(expanded_response, Exception):
-                print(f"[AGGREGATE] Expanded Topics response: {expanded_response.text[:100]}...", flush=True)
-                expanded_result = extract_json(expanded_response.text)
-                if expanded_result:
-                    alternative_framing = expanded_result.get("alternativeFraming", "")
-                    expanded_topics = expanded_result.get("expandedTopics", [])
-                    related_content = expanded_result.get("relatedContent", [])
-                    print(f"[AGGREGATE] Expanded: {len(expanded_topics)} topics, {len(related_content)} content, framing={bool(alternative_framing)}", flush=True)
-            else:
-                print(f"[AGGREGATE] Expanded Topics ERROR: {expanded_response}", flush=True)
+async def expanded_topics_node(state: dict) -> dict:
+    """
+    Generates expanded topics, related content and an alternative framing.
+    Needs claims, biases and perspectives, not verified sources. Skipped
+    when the analysis mode disables the expanded_topics profile.
+    """
+    print("[EXPANDED] Node called!", flush=True)
+
+    reused = state.get("reused_result")
+    if reused:
+        print("[EXPANDED] Reusing expanded topics from a near-identical analysis", flush=True)
+        return {
+            "alternative_framing": reused.get("alternative_framing", ""),
+            "expanded_topics": reused.get("expanded_topics", []),
+            "related_content": reused.get("related_content", []),
+        }
+
+    mode = state.get("analysis_mode")
+    if not node_enabled("expanded_topics", mode):
+        print("[EXPANDED] Skipped (disabled in this analysis mode or near the budget)", flush=True)
+        return {}
+
+    state = await wait_for_inputs(state, *EXPANDED_TOPICS_INPUTS)
+    claims = state.get("claims", [])
+    detected_biases = state.get("detected_biases", [])
+    perspectives = state.get("perspectives", [])
 
+    expanded_topics = []
+    related_content = []
+    alternative_framing = ""
+    if claims or detected_biases or perspectives:
+        try:
+            print("[EXPANDED] Calling Gemini...", flush=True)
+            prompt = EXPANDED_TOPICS_TEMPLATE.render(
+                claims=state_json(state, "claims"),
+                biases=state_json(state, "detected_biases"),
+                perspectives=state_json(state, "perspectives", limit=3),
+            )
+            # Use Flash model with Google Search for related content
+            response = await generate_for_node(
+                get_gemini_client(),
+                "expanded_topics",
+                prompt,
+                mode=mode,
+                tools=[types.Tool(google_search=types.GoogleSearch())],
+            )
+            print(f"[EXPANDED] Response: {response.text[:100]}...", flush=True)
+            result = extract_json(response.text)
+            if result:
+                alternative_framing = result.get("alternativeFraming", "")
+                expanded_topics = result.get("expandedTopics", [])
+                related_content = result.get("relatedContent", [])
+                print(f"[EXPANDED] {len(expanded_topics)} topics, {len(related_content)} content, framing={bool(alternative_framing)}", flush=True)
         except Exception as e:
-            print(f"[AGGREGATE] ERROR: {e}", flush=True)
-            import traceback
-            traceback.print_exc()
-    else:
-        print("[AGGREGATE] No data for Steel Man", flush=True)
-
-    print(f"[AGGREGATE] Returning steel_man={steel_man is not None}, expanded={len(expanded_topics)}", flush=True)
+            print(f"[EXPANDED] ERROR: {e}", flush=True)
 
     return {
-        "steel_man": steel_man,
         "alternative_framing": alternative_framing,
         "expanded_topics": expanded_topics,
         "related_content": related_content,
+    }
+
+
+async def aggregate_results_node(state: dict) -> dict:
+    """
+    Final step once every agent and aggregate sub-task has finished.
+    """
+    print(
+        f"[AGGREGATE] Returning steel_man={state.get('steel_man') is not None}, "
+        f"expanded={len(state.get('expanded_topics', []))}",
+        flush=True,
+    )
+    return {
         "agent_statuses": [
             {
                 "agent_id": "system",
@@ -1,30 +1,79 @@
 """Agent A: Analyzer (Orchestrator)"""
 import re
+import json
 import asyncio
 import logging
+from dataclasses import dataclass
+from typing import Optional
 from google import genai
 from google.genai import types
+from PIL.Image import DecompressionBombError
 from app.core.config import settings
-from app.agents.prompts import ANALYZER_PROMPT
-from app.agents.utils import extract_json
+from app.core.gemini import generate_for_node, get_gemini_client, get_generation_profile, resolve_model
+from app.agents.prompts import (
+    ANALYZER_CLAIMS_TEMPLATE,
+    ANALYZER_BIAS_TEMPLATE,
+    ANALYZER_CHUNK_TEMPLATE,
+    ANALYZER_REDUCE_TEMPLATE,
+    CONTENT_PARSER_PROMPT,
+)
+from app.agents.progress import report_progress
+from app.agents.prompt_template import PromptTemplate
+from app.agents.utils import extract_json, is_youtube_url
+from app.services.blob_store import blob_store
+from app.services.cache import TTLCache
+from app.services.images import (
+    InvalidImageError,
+    PreparedImage,
+    decode_image_payload,
+    prepare_image,
+)
+from app.services.similarity import find_reusable_result
+from app.services.url_fetcher import FetchedArticle, fetch_article
 
 logger = logging.getLogger(__name__)
 
-_YOUTUBE_RE = re.compile(
-    r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/)([^&\s?#]+)'
+# Analyzer output for images, keyed by (stage, mode, SHA-256 of the upload):
+# re-uploads of the same screenshot skip the model calls entirely.
+_image_analysis_cache: TTLCache[dict] = TTLCache(
+    ttl=settings.image_analysis_cache_ttl_seconds,
+    max_entries=settings.image_analysis_cache_max_entries,
 )
 
+# Deep-stage (bias) analyses started by analyzer_node, keyed by session id and
+# awaited by bias_analyzer_node. Entries expire, cancelling their call, so a
+# run that never reaches bias_analyzer_node cannot leak one; its teardown
+# also calls cancel_bias_analysis.
+_bias_tasks: TTLCache[asyncio.Task] = TTLCache(ttl=10 * 60, max_entries=1000, on_evict=asyncio.Task.cancel)
+
+
+def cancel_bias_analysis(session_id: str):
+    """Cancel a session's deep-stage call nobody will await (the fast stage or the run failed)."""
+    task = _bias_tasks.pop(session_id)
+    if task is not None:
+        task.cancel()
+
 
 def _is_youtube_url(url: str) -> bool:
-    return bool(_YOUTUBE_RE.search(url))
+    return is_youtube_url(url)
 
 
 def _is_url(content_type: str) -> bool:
     return content_type == "url"
 
 
-def _build_contents(content: str, content_type: str, prompt_text: str):
-    """Build Gemini contents: multimodal Part for YouTube URLs, plain text otherwise."""
+def _build_contents(
+    content: str,
+    content_type: str,
+    prompt_text: str,
+    image: PreparedImage | None = None,
+):
+    """Build Gemini contents: multimodal Part for YouTube URLs and images, plain text otherwise."""
+    if image is not None:
+        return [
+            types.Part.from_bytes(data=image.data, mime_type=image.mime_type),
+            types.Part(text=prompt_text),
+        ]
     if content_type == "url" and _is_youtube_url(content):
         # Pass the YouTube URL as a file_data Part so Gemini can actually
         # watch/read the video instead of guessing from the URL string.
@@ -35,146 +84,539 @@ def _build_contents(content: str, content_type: str, prompt_text: str):
     return prompt_text
 
 
-async def analyzer_node(state: dict) -> dict:
-    """
-    Agent A: Analyzer
-    - Parses content (URL/text/image)
-    - Extracts 3 core claims with evidence
-    - Detects bias patterns
-    - Generates instructions for Agents B and C
+def _inline_article(url: str, article: FetchedArticle) -> str:
+    """Format pre-fetched article text for substitution into the analyzer prompts."""
+    header = f"URL: {url}"
+    if article.title:
+        header += f"\n제목: {article.title}"
+    return f"{header}\n\n{article.text}"
+
+
+def _load_image(content: str) -> PreparedImage:
+    return prepare_image(decode_image_payload(content))
+
+
+async def _extract_image_text(client: genai.Client, image: PreparedImage, mode: str) -> str:
+    """Cheap OCR pre-pass on Flash using CONTENT_PARSER_PROMPT ("" on failure)."""
+    try:
+        response = await generate_for_node(
+            client,
+            "image_ocr",
+            [
+                types.Part.from_bytes(data=image.data, mime_type=image.mime_type),
+                types.Part(text=CONTENT_PARSER_PROMPT),
+            ],
+            mode=mode,
+        )
+        return response.text or ""
+    except Exception as e:
+        logger.warning(f"[Analyzer] OCR pre-pass failed, continuing with image only: {e}")
+        return ""
+
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def _split_paragraph_chunks(text: str, chunk_chars: int, overlap_chars: int) -> list[str]:
+    """Split text on paragraph boundaries into chunks of about chunk_chars.
+
+    Each chunk after the first starts with the trailing paragraphs of the
+    previous chunk (up to overlap_chars) so claims that straddle a boundary
+    are seen whole at least once. Paragraphs longer than a chunk are cut.
     """
+    # Settings validation keeps overlap below chunk size; clamp anyway so the
+    # cut below always advances.
+    step = max(1, chunk_chars - overlap_chars)
+    paragraphs: list[str] = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        while len(paragraph) > chunk_chars:
+            paragraphs.append(paragraph[:chunk_chars])
+            paragraph = paragraph[step:]
+        if paragraph:
+            paragraphs.append(paragraph)
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for paragraph in paragraphs:
+        if current and size + len(paragraph) > chunk_chars:
+            chunks.append("\n\n".join(current))
+            # Carry trailing paragraphs over as overlap.
+            overlap: list[str] = []
+            overlap_size = 0
+            for prev in reversed(current):
+                if overlap_size + len(prev) > overlap_chars:
+                    break
+                overlap.insert(0, prev)
+                overlap_size += len(prev)
+            current, size = overlap, overlap_size
+        current.append(paragraph)
+        size += len(paragraph)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
 
-    client = genai.Client(api_key=settings.gemini_api_key)
 
+async def _generate_with_fallback(client: genai.Client, node: str, mode: str, contents, config_kwargs: dict):
+    """Call the node's profile model, falling back to Flash if it times out."""
+    # Prevent a single slow model call from blocking the whole graph.
+    try:
+        return await generate_for_node(client, node, contents, mode=mode, **config_kwargs)
+    except TimeoutError:
+        if resolve_model(get_generation_profile(node, mode).model) == settings.gemini_model_flash:
+            raise
+        # Pro model timed out – fall back to flash for faster response
+        logger.warning("[Analyzer] Pro model timed out, falling back to flash model")
+        return await generate_for_node(
+            client, node, contents, mode=mode, model=settings.gemini_model_flash, **config_kwargs
+        )
+
+
+async def _analyze_chunk(
+    client: genai.Client,
+    chunk: str,
+    index: int,
+    count: int,
+    semaphore: asyncio.Semaphore,
+    mode: str,
+) -> dict:
+    """Map step: extract claims and biases from one chunk on Flash ({} on failure)."""
+    prompt = ANALYZER_CHUNK_TEMPLATE.render(chunk_index=index, chunk_count=count, content=chunk)
+    async with semaphore:
+        try:
+            response = await generate_for_node(
+                client,
+                "analyzer_chunk",
+                prompt,
+                mode=mode,
+                response_mime_type="application/json",
+            )
+        except Exception as e:
+            logger.warning(f"[Analyzer] Chunk {index}/{count} failed: {e}")
+            return {}
+    return extract_json(response.text or "")
+
+
+def _merge_chunk_results(partials: list[dict]) -> dict:
+    """Local reduce used when the reduce call returns no parsable JSON."""
+    claims, seen_claims = [], set()
+    instincts, biases = {}, {}
+    sources, keywords = [], []
+    for partial in partials:
+        for claim in partial.get("claims", []):
+            text = claim.get("text", "")
+            if text and text not in seen_claims:
+                seen_claims.add(text)
+                claims.append(claim)
+        for item in partial.get("user_instincts", []):
+            key = item.get("instinct_type")
+            if key and item.get("confidence", 0) > instincts.get(key, {}).get("confidence", -1):
+                instincts[key] = item
+        for item in partial.get("information_biases", []):
+            key = item.get("bias_type")
+            if key and item.get("confidence", 0) > biases.get(key, {}).get("confidence", -1):
+                biases[key] = item
+        sources.extend(s for s in partial.get("cited_sources", []) if s not in sources)
+        keywords.extend(k for k in partial.get("keywords", []) if k not in keywords)
+
+    top_claims = [{**c, "id": i + 1} for i, c in enumerate(claims[:3])]
+    return {
+        "claims": top_claims,
+        "logic_structure": "",
+        "user_instincts": list(instincts.values()),
+        "information_biases": list(biases.values()),
+        "agent_instructions": {
+            "source_verifier": {"sources": sources[:10], "check_for": [c["text"] for c in top_claims]},
+            "perspective_explorer": {
+                "topic": top_claims[0]["text"] if top_claims else "",
+                "keywords": keywords[:8],
+            },
+        },
+    }
+
+
+async def _map_reduce_analysis(client: genai.Client, text: str, mode: str) -> dict:
+    """Chunked analysis for long content: parallel Flash map, single reduce call."""
+    chunks = _split_paragraph_chunks(
+        text,
+        settings.analyzer_chunk_chars,
+        settings.analyzer_chunk_overlap_chars,
+    )
+    logger.info(f"[Analyzer] Long content ({len(text)} chars) – map-reduce over {len(chunks)} chunks")
+
+    semaphore = asyncio.Semaphore(settings.analyzer_max_parallel_chunks)
+    completed = 0
+
+    async def analyze(index: int, chunk: str) -> dict:
+        nonlocal completed
+        partial = await _analyze_chunk(client, chunk, index, len(chunks), semaphore, mode)
+        completed += 1
+        report_progress(
+            "analyzer", "analyzing", f"Analyzed {completed}/{len(chunks)} sections", 20 + 60 * completed // len(chunks)
+        )
+        return partial
+
+    partials = await asyncio.gather(*(analyze(i + 1, chunk) for i, chunk in enumerate(chunks)))
+    partials = [p for p in partials if p]
+    if not partials:
+        raise RuntimeError("All chunk analyses failed")
+
+    chunk_results = json.dumps(
+        [{"chunk": i + 1, **p} for i, p in enumerate(partials)],
+        ensure_ascii=False,
+    )
+    report_progress("analyzer", "thinking", "Merging section results...", 85)
+    response = await _generate_with_fallback(
+        client,
+        "analyzer_reduce",
+        mode,
+        ANALYZER_REDUCE_TEMPLATE.render(chunk_results=chunk_results),
+        {"response_mime_type": "application/json"},
+    )
+    result = extract_json(response.text or "")
+    if not result or not result.get("claims"):
+        logger.warning("[Analyzer] Reduce step returned no claims, merging chunk results locally")
+        result = _merge_chunk_results(partials)
+    return result
+
+
+def _image_prompt_content(ocr_text: str) -> str:
+    if ocr_text:
+        return f"(첨부된 이미지 – 아래는 이미지에서 추출한 텍스트입니다)\n{ocr_text}"
+    return "(첨부된 이미지의 내용을 직접 읽고 분석하세요)"
+
+
+@dataclass
+class AnalyzerInput:
+    """Content prepared once per session and shared by both analyzer stages."""
+
+    content: str  # text (loaded from the blob store if needed) or the URL
+    content_type: str
+    content_key: str  # fingerprint for cache lookups (blob ids are content hashes)
+    prompt_content: str
+    mode: str  # analysis mode selecting the generation profiles
+    image: Optional[PreparedImage] = None
+    article: Optional[FetchedArticle] = None
+    use_url_context: bool = False
+    use_map_reduce: bool = False
+
+    def contents(self, template: PromptTemplate):
+        return _build_contents(
+            self.content,
+            self.content_type,
+            template.render(content=self.prompt_content),
+            self.image,
+        )
+
+    def config_kwargs(self) -> dict:
+        # When tools (url_context) are active, response_mime_type may conflict,
+        # so we only force JSON output when no tools are in use.
+        if self.use_url_context:
+            return {"tools": [types.Tool(url_context=types.UrlContext)]}
+        return {"response_mime_type": "application/json"}
+
+
+async def _prepare_input(state: dict, client: genai.Client) -> AnalyzerInput:
+    """Load, decode and pre-fetch the content (raises InvalidImageError/OSError/DecompressionBombError for bad images)."""
     content = state["content"]
     content_type = state.get("content_type", "text")
+    content_ref = state.get("content_ref")
+    mode = state.get("analysis_mode") or settings.analysis_default_mode
 
-    # Avoid str.format on JSON examples inside the prompt template.
-    prompt_text = ANALYZER_PROMPT.replace("{content}", content)
-    contents = _build_contents(content, content_type, prompt_text)
+    # Large payloads live in the blob store; blob ids are content hashes,
+    # so they double as the fingerprint for cache lookups.
+    content_key = f"blob:{content_ref}" if content_ref else content
+    if content_ref and content_type != "image":
+        content = (await blob_store.read(content_ref)).decode("utf-8")
 
-    logger.info(f"[Analyzer] Starting analysis for content (type={content_type}): {content[:100]}...")
-    logger.debug(f"[Analyzer] Using model: {settings.gemini_model_pro}")
-    if content_type == "url" and _is_youtube_url(content):
-        logger.info("[Analyzer] YouTube URL detected – passing as multimodal Part")
+    # Images are decoded once, downscaled and sent as an inline Part rather
+    # than pasting the base64 payload into the prompt.
+    if content_type == "image":
+        if content_ref:
+            image = await asyncio.to_thread(prepare_image, await blob_store.read(content_ref))
+        else:
+            image = await asyncio.to_thread(_load_image, content)
+        logger.info(f"[Analyzer] Image prepared: {image.width}x{image.height} {image.mime_type}, phash={image.phash}")
+        ocr_text = await _extract_image_text(client, image, mode) if settings.image_ocr_prepass else ""
+        return AnalyzerInput(
+            content=content,
+            content_type=content_type,
+            content_key=content_key,
+            prompt_content=_image_prompt_content(ocr_text),
+            mode=mode,
+            image=image,
+        )
 
-    # For non-YouTube URLs, enable url_context so Gemini actually fetches
+    # Non-YouTube URLs are pre-fetched (usually already in flight since the
+    # session was created) and passed inline as readable article text.
+    is_youtube = _is_url(content_type) and _is_youtube_url(content)
+    article = None
+    if _is_url(content_type) and not is_youtube:
+        article = await fetch_article(content)
+        if article:
+            logger.info(f"[Analyzer] Using pre-fetched article text ({len(article.text)} chars)")
+    prompt_content = _inline_article(content, article) if article else content
+
+    # If pre-fetching failed, fall back to url_context so Gemini fetches
     # and reads the page content instead of guessing from the URL string.
-    use_url_context = _is_url(content_type) and not _is_youtube_url(content)
+    use_url_context = _is_url(content_type) and not is_youtube and article is None
     if use_url_context:
-        logger.info("[Analyzer] Non-YouTube URL detected – enabling url_context tool")
+        logger.info("[Analyzer] Pre-fetch unavailable – enabling url_context tool")
+    if is_youtube:
+        logger.info("[Analyzer] YouTube URL detected – passing as multimodal Part")
+
+    return AnalyzerInput(
+        content=content,
+        content_type=content_type,
+        content_key=content_key,
+        prompt_content=prompt_content,
+        mode=mode,
+        article=article,
+        use_url_context=use_url_context,
+        # Long plain-text content (pasted text or pre-fetched articles) is
+        # analyzed in chunks so latency depends on chunk size, not document size.
+        use_map_reduce=(
+            not use_url_context
+            and not is_youtube
+            and len(prompt_content) > settings.analyzer_chunked_threshold_chars
+        ),
+    )
+
+
+def _analyzer_error(message: str, error: str) -> dict:
+    return {
+        "claims": [],
+        "source_verifier_instructions": {},
+        "perspective_instructions": {},
+        "agent_statuses": [
+            {
+                "agent_id": "analyzer",
+                "status": "error",
+                "message": message,
+                "progress": 0,
+            }
+        ],
+        "errors": [{"agent": "analyzer", "error": error}],
+    }
+
 
-    tools = [types.Tool(url_context=types.UrlContext)] if use_url_context else None
-    # When tools (url_context) are active, response_mime_type may conflict,
-    # so we only force JSON output when no tools are in use.
-    config_kwargs: dict = {"temperature": 0.7}
-    if tools:
-        config_kwargs["tools"] = tools
-    else:
-        config_kwargs["response_mime_type"] = "application/json"
+def _bias_error(message: str, error: str) -> dict:
+    return {
+        "logic_structure": "",
+        "user_instincts": [],
+        "information_biases": [],
+        "detected_biases": [],
+        "agent_statuses": [
+            {
+                "agent_id": "analyzer",
+                "status": "error",
+                "message": message,
+                "progress": 0,
+            }
+        ],
+        "errors": [{"agent": "bias_analyzer", "error": error}],
+    }
+
+
+def _bias_fields(result: dict) -> dict:
+    return {
+        "logic_structure": result.get("logic_structure", ""),
+        "user_instincts": result.get("user_instincts", []),
+        "information_biases": result.get("information_biases", []),
+        # Legacy support: detected_biases for backward compatibility
+        "detected_biases": result.get("detected_biases", []),
+    }
+
+
+async def analyzer_node(state: dict) -> dict:
+    """
+    Agent A: Analyzer (fast stage)
+    - Parses content (URL/text/image)
+    - Extracts 3 core claims with evidence on Flash
+    - Generates instructions for Agents B and C, unblocking B, C and D
+
+    Bias detection runs in parallel in bias_analyzer_node. Long content is
+    the exception: its map-reduce pass yields claims and biases together.
+    """
+
+    client = get_gemini_client()
+    session_id = state.get("session_id", "")
+
+    try:
+        prepared = await _prepare_input(state, client)
+    except (InvalidImageError, OSError, DecompressionBombError) as e:
+        logger.error(f"[Analyzer] Invalid image content: {e}")
+        return _analyzer_error(f"Analyzer failed: {str(e)}", str(e))
+    content = prepared.content
+    image = prepared.image
+
+    # The deep stage starts now, concurrently with the fast call below, and is
+    # cancelled again if the fast stage fails.
+    if not prepared.use_map_reduce:
+        _bias_tasks.set(session_id, asyncio.create_task(_analyze_biases(client, prepared)))
+
+    if image is not None:
+        cached = _image_analysis_cache.get(("claims", prepared.mode, image.digest))
+        if cached is not None:
+            logger.info("[Analyzer] Image analysis cache hit")
+            match = await find_reusable_result(prepared.content_key, cached.get("claims", []))
+            return {
+                **cached,
+                "reused_result": match.result if match else None,
+                "agent_statuses": [
+                    {
+                        "agent_id": "analyzer",
+                        "status": "done",
+                        "message": "Claims extracted (cached)",
+                        "progress": 100,
+                    },
+                ],
+            }
+
+    logger.info(f"[Analyzer] Starting claim extraction (type={prepared.content_type}): {content[:100]}...")
+    logger.debug(f"[Analyzer] Mode: {prepared.mode}")
 
     try:
-        # Prevent a single slow model call from blocking the whole graph.
         logger.info("[Analyzer] Calling Gemini API...")
-        try:
-            response = await asyncio.wait_for(
-                client.aio.models.generate_content(
-                    model=settings.gemini_model_pro,
-                    contents=contents,
-                    config=types.GenerateContentConfig(**config_kwargs),
-                ),
-                timeout=120,
+        report_progress("analyzer", "thinking", "Extracting claims...", 20)
+        if prepared.use_map_reduce:
+            result = await _map_reduce_analysis(client, prepared.prompt_content, prepared.mode)
+        else:
+            response = await generate_for_node(
+                client,
+                "analyzer",
+                prepared.contents(ANALYZER_CLAIMS_TEMPLATE),
+                mode=prepared.mode,
+                **prepared.config_kwargs(),
             )
-        except TimeoutError:
-            # Pro model timed out – fall back to flash for faster response
-            logger.warning("[Analyzer] Pro model timed out, falling back to flash model")
-            response = await asyncio.wait_for(
-                client.aio.models.generate_content(
-                    model=settings.gemini_model_flash,
-                    contents=contents,
-                    config=types.GenerateContentConfig(**config_kwargs),
-                ),
-                timeout=60,
+            logger.info(f"[Analyzer] Gemini API response received, length: {len(response.text)}")
+            logger.debug(f"[Analyzer] Raw response: {response.text[:500]}...")
+            # Fallback to empty claims if JSON parsing fails
+            result = extract_json(response.text) or {"claims": [], "agent_instructions": {}}
+
+        claims = result.get("claims", [])
+        match = await find_reusable_result(prepared.content_key, claims)
+        if match:
+            logger.info(
+                f"[Analyzer] Near-duplicate of session {match.session_id} "
+                f"(score={match.score:.3f}) – downstream results will be reused"
             )
-        logger.info(f"[Analyzer] Gemini API response received, length: {len(response.text)}")
-        logger.debug(f"[Analyzer] Raw response: {response.text[:500]}...")
-        result = extract_json(response.text)
-        if not result:
-            # Fallback if JSON parsing fails
-            result = {
-                "claims": [],
-                "logic_structure": response.text,
-                "user_instincts": [],
-                "information_biases": [],
-                "detected_biases": [],
-                "agent_instructions": {},
-            }
 
-        return {
-            "claims": result.get("claims", []),
-            "logic_structure": result.get("logic_structure", ""),
-            "user_instincts": result.get("user_instincts", []),
-            "information_biases": result.get("information_biases", []),
-            # Legacy support: detected_biases for backward compatibility
-            "detected_biases": result.get("detected_biases", []),
+        analysis = {
+            "claims": claims,
             "source_verifier_instructions": result.get("agent_instructions", {}).get(
                 "source_verifier", {}
             ),
             "perspective_instructions": result.get("agent_instructions", {}).get(
                 "perspective_explorer", {}
             ),
+        }
+        if prepared.use_map_reduce:
+            analysis.update(_bias_fields(result))
+        if image is not None and claims:
+            _image_analysis_cache.set(("claims", prepared.mode, image.digest), analysis)
+
+        return {
+            **analysis,
+            "reused_result": match.result if match else None,
             "agent_statuses": [
-                {
-                    "agent_id": "analyzer",
-                    "status": "thinking",
-                    "message": "Analyzing content...",
-                    "progress": 50,
-                },
                 {
                     "agent_id": "analyzer",
                     "status": "done",
-                    "message": "Analysis complete",
+                    "message": "Claims extracted",
                     "progress": 100,
                 },
             ],
         }
     except TimeoutError:
-        logger.error("[Analyzer] Request timed out after 60 seconds")
-        return {
-            "claims": [],
-            "logic_structure": "",
-            "user_instincts": [],
-            "information_biases": [],
-            "detected_biases": [],
-            "source_verifier_instructions": {},
-            "perspective_instructions": {},
-            "agent_statuses": [
-                {
-                    "agent_id": "analyzer",
-                    "status": "error",
-                    "message": "Analyzer timed out",
-                    "progress": 0,
-                }
-            ],
-            "errors": [{"agent": "analyzer", "error": "timeout"}],
-        }
+        logger.error("[Analyzer] Request timed out")
+        cancel_bias_analysis(session_id)
+        return _analyzer_error("Analyzer timed out", "timeout")
     except Exception as e:
         logger.exception(f"[Analyzer] Unexpected error: {str(e)}")
+        cancel_bias_analysis(session_id)
+        return _analyzer_error(f"Analyzer failed: {str(e)}", str(e))
+
+
+async def _analyze_biases(client: genai.Client, prepared: AnalyzerInput) -> dict:
+    """Deep stage (Pro in deep mode): logic structure, user instincts and information biases."""
+    image = prepared.image
+    if image is not None:
+        cached = _image_analysis_cache.get(("bias", prepared.mode, image.digest))
+        if cached is not None:
+            logger.info("[BiasAnalyzer] Image analysis cache hit")
+            return {
+                **cached,
+                "agent_statuses": [
+                    {
+                        "agent_id": "analyzer",
+                        "status": "done",
+                        "message": "Bias analysis complete (cached)",
+                        "progress": 100,
+                    },
+                ],
+            }
+
+    logger.debug(f"[BiasAnalyzer] Mode: {prepared.mode}")
+    try:
+        response = await _generate_with_fallback(
+            client,
+            "bias_analyzer",
+            prepared.mode,
+            prepared.contents(ANALYZER_BIAS_TEMPLATE),
+            prepared.config_kwargs(),
+        )
+        logger.info(f"[BiasAnalyzer] Gemini API response received, length: {len(response.text)}")
+        result = extract_json(response.text)
+        if not result:
+            # Fallback if JSON parsing fails
+            result = {"logic_structure": response.text}
+
+        bias = _bias_fields(result)
+        if image is not None and (bias["user_instincts"] or bias["information_biases"]):
+            _image_analysis_cache.set(("bias", prepared.mode, image.digest), bias)
+
         return {
-            "claims": [],
-            "logic_structure": "",
-            "user_instincts": [],
-            "information_biases": [],
-            "detected_biases": [],
-            "source_verifier_instructions": {},
-            "perspective_instructions": {},
+            **bias,
             "agent_statuses": [
                 {
                     "agent_id": "analyzer",
-                    "status": "error",
-                    "message": f"Analyzer failed: {str(e)}",
-                    "progress": 0,
-                }
+                    "status": "done",
+                    "message": "Bias analysis complete",
+                    "progress": 100,
+                },
             ],
-            "errors": [{"agent": "analyzer", "error": str(e)}],
         }
+    except TimeoutError:
+        logger.error("[BiasAnalyzer] Request timed out")
+        return _bias_error("Bias analysis timed out", "timeout")
+    except Exception as e:
+        logger.exception(f"[BiasAnalyzer] Unexpected error: {str(e)}")
+        return _bias_error(f"Bias analysis failed: {str(e)}", str(e))
+
+
+async def bias_analyzer_node(state: dict) -> dict:
+    """
+    Agent A: Analyzer (deep stage)
+    - Logic structure, user instincts and information biases on Pro
+    - The model call is started by analyzer_node at the same time as the
+      fast stage; this node runs next to B, C and D and awaits it, feeding
+      the bias panel and aggregate when done
+    """
+    task = _bias_tasks.pop(state.get("session_id", ""), None)
+    if task is not None:
+        return await task
+
+    # No running task: the analyzer failed, used map-reduce (which already
+    # yields the bias fields), or this run resumed from a checkpoint.
+    if state.get("errors"):
+        return {"agent_statuses": []}
+    client = get_gemini_client()
+    try:
+        prepared = await _prepare_input(state, client)
+    except (InvalidImageError, OSError, DecompressionBombError) as e:
+        return _bias_error(f"Bias analysis failed: {str(e)}", str(e))
+    if prepared.use_map_reduce:
+        return {"agent_statuses": []}
+    return await _analyze_biases(client, prepared)
@@ -1,16 +1,191 @@
 """Agent C: Perspective Explorer"""
 import json
+import re
 import asyncio
 import logging
-from google import genai
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
 from google.genai import types
 from app.core.config import settings
-from app.core.gemini import generate_perspective_spectrum_image
-from app.agents.prompts import PERSPECTIVE_EXPLORER_PROMPT
-from app.agents.utils import extract_json
+from app.core.gemini import (
+    extract_search_sources,
+    generate_for_node,
+    generate_perspective_spectrum_image,
+    get_gemini_client,
+)
+from app.agents.progress import report_progress, with_progress
+from app.agents.prompts import PERSPECTIVE_EXPLORER_TEMPLATE
+from app.agents.utils import (
+    extract_json,
+    extract_keywords,
+    is_youtube_url,
+    keyword_tokens,
+    leading_sentences,
+    state_json,
+)
+from app.services.blob_store import BlobExpiredError, blob_store
+from app.services.cache import TTLCache
+from app.services.url_fetcher import fetch_article
 
 logger = logging.getLogger(__name__)
 
+_NON_WORD_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+# Transformed (camelCase) perspective results keyed by topic + keyword set.
+# Many sessions on the same news event produce near-identical topics.
+_perspective_cache: TTLCache[dict] = TTLCache(
+    ttl=settings.perspective_cache_ttl_seconds,
+    max_entries=settings.perspective_cache_max_entries,
+)
+
+
+def _normalize_term(term: str) -> str:
+    return " ".join(_NON_WORD_RE.sub(" ", term.lower()).split())
+
+
+def perspective_cache_key(topic: str, keywords: list[str]) -> tuple[str, tuple[str, ...]]:
+    """Cache key: normalized topic plus the sorted, de-duplicated keyword set."""
+    normalized_keywords = {_normalize_term(str(k)) for k in keywords}
+    normalized_keywords.discard("")
+    return _normalize_term(topic), tuple(sorted(normalized_keywords))
+
+
+def _parse_published(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        published = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+def perspective_cache_ttl(perspectives: list[dict], now: Optional[datetime] = None) -> float:
+    """Cache TTL for a result: short for breaking stories, long for settled ones.
+
+    Scales with the age of the newest cited source (a story whose coverage is
+    hours old is still moving), bounded by the configured min and max TTL.
+    """
+    dates = [_parse_published(p.get("source", {}).get("publishedDate")) for p in perspectives]
+    dates = [d for d in dates if d is not None]
+    if not dates:
+        return settings.perspective_cache_ttl_seconds
+    age = ((now or datetime.now(timezone.utc)) - max(dates)).total_seconds()
+    ttl = max(age, 0.0) * settings.perspective_cache_ttl_age_ratio
+    return min(max(ttl, settings.perspective_cache_min_ttl_seconds), settings.perspective_cache_ttl_seconds)
+
+
+@dataclass
+class _Speculation:
+    """A perspective search started from locally extracted topic and keywords."""
+
+    task: Optional[asyncio.Task] = None
+    topic: str = ""
+    keywords: list[str] = field(default_factory=list)
+
+
+def _cancel(speculation: _Speculation):
+    if speculation.task is not None:
+        speculation.task.cancel()
+
+
+# Speculative searches in flight, keyed by session id (consumed by
+# perspective_explorer_node). Entries expire, cancelling their search, so a
+# run that never reaches the explorer cannot leak one; its teardown also
+# calls cancel_speculation.
+_speculations: TTLCache[_Speculation] = TTLCache(ttl=10 * 60, max_entries=1000, on_evict=_cancel)
+
+# Raw text considered by the local keyword extractor.
+_SPECULATION_MAX_CHARS = 20_000
+
+
+def speculation_overlap(speculation: _Speculation, topic: str, keywords: list[str]) -> float:
+    """Share of the analyzer's topic/keyword tokens covered by the speculative terms."""
+    expected = set(keyword_tokens(" ".join([topic, *map(str, keywords)])))
+    guessed = set(keyword_tokens(" ".join([speculation.topic, *speculation.keywords])))
+    if not expected or not guessed:
+        return 0.0
+    return len(expected & guessed) / len(expected)
+
+
+def cancel_speculation(session_id: str):
+    """Cancel a speculative search its run left unconsumed (the run failed or was cancelled)."""
+    speculation = _speculations.pop(session_id)
+    if speculation is not None:
+        _cancel(speculation)
+
+
+async def _speculation_text(state: dict) -> str:
+    content = state.get("content", "")
+    content_type = state.get("content_type")
+    if state.get("content_ref"):
+        try:
+            content = (await blob_store.read(state["content_ref"])).decode("utf-8", errors="replace")
+        except BlobExpiredError:
+            return ""  # the analyzer reports the expired upload
+    if content_type == "url":
+        if not settings.url_prefetch_enabled:
+            return ""
+        article = await fetch_article(content)
+        return f"{article.title}\n{article.text}" if article else ""
+    return content
+
+
+async def perspective_speculator_node(state: dict) -> dict:
+    """
+    Start the perspective search at START, in parallel with the analyzer.
+
+    Topic and keywords come from a local keyword extractor over the raw text
+    (or the pre-fetched article), so no model call is spent on guessing.
+    """
+    content_type = state.get("content_type")
+    if (
+        not settings.perspective_speculation_enabled
+        or content_type == "image"
+        or (content_type == "url" and is_youtube_url(state.get("content", "")))
+    ):
+        return {"agent_statuses": []}
+
+    speculation = _Speculation()
+
+    async def speculate() -> Optional[dict]:
+        text = (await _speculation_text(state))[:_SPECULATION_MAX_CHARS]
+        sentences = leading_sentences(text)
+        if not sentences:
+            return None
+        speculation.topic = sentences[0]
+        speculation.keywords = extract_keywords(text)
+        logger.info(f"[PerspectiveSpeculator] Searching ahead for: {speculation.keywords}")
+        pseudo_claims = json.dumps([{"text": s} for s in sentences], ensure_ascii=False)
+        return await explore_perspectives(
+            speculation.topic, speculation.keywords, pseudo_claims, state.get("analysis_mode")
+        )
+
+    report_progress("perspective", "searching", "Searching for perspectives ahead of the analysis...", 10)
+    speculation.task = asyncio.create_task(speculate())
+    _speculations.set(state.get("session_id", ""), speculation)
+    return {"agent_statuses": []}
+
+
+async def _resolve_speculation(speculation: _Speculation, topic: str, keywords: list[str]) -> Optional[dict]:
+    """Return the speculative output if the analyzer confirms its topic, else cancel it (None)."""
+    overlap = speculation_overlap(speculation, topic, keywords)
+    if overlap < settings.perspective_speculation_min_overlap:
+        speculation.task.cancel()
+        logger.info(f"[PerspectiveExplorer] Discarding speculative search (overlap={overlap:.2f})")
+        return None
+
+    try:
+        result = await speculation.task
+    except Exception:
+        logger.exception("[PerspectiveExplorer] Speculative search failed")
+        return None
+    if not result or result.get("errors"):
+        return None
+    logger.info(f"[PerspectiveExplorer] Keeping speculative search (overlap={overlap:.2f})")
+    return result
+
 
 async def perspective_explorer_node(state: dict) -> dict:
     """
@@ -18,9 +193,34 @@ async def perspective_explorer_node(state: dict) -> dict:
     - Uses Google Search to find alternative viewpoints
     - Analyzes different frames on the same facts
     - Creates perspective spectrum map
+
+    If perspective_speculator started a search from locally extracted
+    keywords, its result is kept when the analyzer's topic and keywords
+    confirm it, and discarded otherwise.
     """
+    speculation = _speculations.pop(state.get("session_id", ""), None)
 
-    client = genai.Client(api_key=settings.gemini_api_key)
+    reused = state.get("reused_result")
+    if reused:
+        if speculation is not None:
+            speculation.task.cancel()
+        logger.info("[PerspectiveExplorer] Reusing perspectives from a near-identical analysis")
+        return {
+            "perspectives": reused.get("perspectives", []),
+            "common_facts": reused.get("common_facts", []),
+            "divergence_points": reused.get("divergence_points", []),
+            "perspective_summary": reused.get("perspective_summary", ""),
+            # The image is not kept for reuse (see similarity.REUSABLE_FIELDS).
+            "perspective_image": None,
+            "agent_statuses": [
+                {
+                    "agent_id": "perspective",
+                    "status": "done",
+                    "message": "Perspective exploration reused",
+                    "progress": 100,
+                },
+            ],
+        }
 
     instructions = state.get("perspective_instructions", {})
     topic = instructions.get("topic", "")
@@ -31,32 +231,63 @@ async def perspective_explorer_node(state: dict) -> dict:
     if not topic and claims:
         topic = claims[0].get("text", "") if claims else ""
 
-    # Avoid str.format on JSON examples inside the prompt template.
-    prompt = (
-        PERSPECTIVE_EXPLORER_PROMPT
-        .replace("{topic}", topic)
-        .replace("{keywords}", json.dumps(keywords, ensure_ascii=False))
-        .replace("{claims}", json.dumps(claims, ensure_ascii=False))
+    if speculation is not None:
+        speculative = await _resolve_speculation(speculation, topic, keywords)
+        if speculative is not None:
+            return speculative
+
+    return await explore_perspectives(topic, keywords, state_json(state, "claims"), state.get("analysis_mode"))
+
+
+async def explore_perspectives(
+    topic: str,
+    keywords: list[str],
+    claims_json: str,
+    mode: Optional[str] = None,
+) -> dict:
+    """Search for alternative perspectives on a topic; returns the node output."""
+    client = get_gemini_client()
+
+    prompt = PERSPECTIVE_EXPLORER_TEMPLATE.render(
+        topic=topic,
+        keywords=json.dumps(keywords, ensure_ascii=False),
+        claims=claims_json,
     ) + "\n\nYou must respond in valid JSON format only."
 
+    topic_key = perspective_cache_key(topic, keywords)
+    # Modes differ in depth and optional work (e.g. the spectrum image).
+    cache_key = (mode or settings.analysis_default_mode, *topic_key)
+    if settings.perspective_cache_enabled and topic_key[0]:
+        cached = _perspective_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"[PerspectiveExplorer] Cache hit for topic: {topic[:50]}")
+            return {
+                **cached,
+                "agent_statuses": [
+                    {
+                        "agent_id": "perspective",
+                        "status": "done",
+                        "message": "Perspective exploration complete (cached)",
+                        "progress": 100,
+                    },
+                ],
+            }
+
     logger.info(f"[PerspectiveExplorer] Starting exploration for topic: {topic[:50]}...")
     logger.debug(f"[PerspectiveExplorer] Keywords: {keywords}")
 
     # Use Flash model with Google Search Grounding (fast search tasks)
+    report_progress("perspective", "searching", "Exploring alternative perspectives...", 20)
     try:
-        response = await asyncio.wait_for(
-            client.aio.models.generate_content(
-                model=settings.gemini_model_flash,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearch())],
-                    temperature=0.7,
-                ),
-            ),
-            timeout=60,
+        response = await generate_for_node(
+            client,
+            "perspective_explorer",
+            prompt,
+            mode=mode,
+            tools=[types.Tool(google_search=types.GoogleSearch())],
         )
     except asyncio.TimeoutError:
-        logger.error("[PerspectiveExplorer] Request timed out after 60 seconds")
+        logger.error("[PerspectiveExplorer] Request timed out")
         return {
             "perspectives": [],
             "common_facts": [],
@@ -73,6 +304,10 @@ async def perspective_explorer_node(state: dict) -> dict:
             "errors": [{"agent": "perspective", "error": "timeout"}],
         }
 
+    found = len(extract_search_sources(response))
+    report_progress(
+        "perspective", "analyzing", f"Comparing {found} sources found by search..." if found else "Comparing perspectives...", 60
+    )
     try:
         logger.info(f"[PerspectiveExplorer] Response received, length: {len(response.text)}")
         logger.debug(f"[PerspectiveExplorer] Raw response: {response.text[:500]}...")
@@ -131,26 +366,30 @@ async def perspective_explorer_node(state: dict) -> dict:
         perspective_image = None
         if perspectives:
             try:
-                perspective_image = await generate_perspective_spectrum_image(
-                    topic=topic,
-                    perspectives=perspectives,
+                perspective_image = await with_progress(
+                    generate_perspective_spectrum_image(topic=topic, perspectives=perspectives, mode=mode),
+                    "perspective",
+                    "analyzing",
+                    "Drawing the perspective spectrum...",
+                    start=70,
+                    end=95,
                 )
             except Exception:
                 logger.exception("[PerspectiveExplorer] Image generation failed")
 
-        return {
+        explored = {
             "perspectives": perspectives,
             "common_facts": result.get("common_facts", []),
             "divergence_points": result.get("divergence_points", []),
             "perspective_summary": result.get("summary", ""),
             "perspective_image": perspective_image,
+        }
+        if settings.perspective_cache_enabled and topic_key[0] and perspectives:
+            _perspective_cache.set(cache_key, explored, ttl=perspective_cache_ttl(perspectives))
+
+        return {
+            **explored,
             "agent_statuses": [
-                {
-                    "agent_id": "perspective",
-                    "status": "searching",
-                    "message": "Exploring alternative perspectives...",
-                    "progress": 50,
-                },
                 {
                     "agent_id": "perspective",
                     "status": "done",
@@ -1,11 +1,10 @@
 """Agent D: Socrates (Dynamic Question Generation)"""
 import json
 import logging
-from google import genai
-from google.genai import types
-from app.core.config import settings
-from app.agents.prompts import SOCRATES_QUESTION_GENERATOR_PROMPT
-from app.agents.utils import extract_json
+from app.core.gemini import generate_for_node, get_gemini_client
+from app.agents.progress import report_progress
+from app.agents.prompts import SOCRATES_QUESTION_GENERATOR_TEMPLATE
+from app.agents.utils import extract_json, state_json
 
 logger = logging.getLogger(__name__)
 
@@ -48,21 +47,21 @@ async def socrates_init_node(state: dict) -> dict:
     # Only generate dynamic questions if we have analysis data
     if claims or detected_biases or perspectives:
         try:
-            client = genai.Client(api_key=settings.gemini_api_key)
+            report_progress("socrates", "thinking", "Preparing dialogue questions...", 30)
+            client = get_gemini_client()
 
-            prompt = SOCRATES_QUESTION_GENERATOR_PROMPT.format(
-                claims=json.dumps(claims, ensure_ascii=False),
-                biases=json.dumps(detected_biases, ensure_ascii=False),
+            prompt = SOCRATES_QUESTION_GENERATOR_TEMPLATE.render(
+                claims=state_json(state, "claims"),
+                biases=state_json(state, "detected_biases"),
                 perspectives=json.dumps(perspectives_summary, ensure_ascii=False),
             )
 
-            response = await client.aio.models.generate_content(
-                model=settings.gemini_model_pro,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    temperature=0.7,
-                ),
+            response = await generate_for_node(
+                client,
+                "socrates_init",
+                prompt,
+                mode=state.get("analysis_mode"),
+                response_mime_type="application/json",
             )
 
             result = extract_json(response.text)
@@ -92,12 +91,6 @@ async def socrates_init_node(state: dict) -> dict:
         "socrates_ready": True,
         "conversation_context": conversation_context,
         "agent_statuses": [
-            {
-                "agent_id": "socrates",
-                "status": "thinking",
-                "message": "Preparing dialogue questions...",
-                "progress": 50,
-            },
             {
                 "agent_id": "socrates",
                 "status": "done",
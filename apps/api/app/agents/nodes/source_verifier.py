@@ -2,11 +2,11 @@
 import json
 import asyncio
 import logging
-from google import genai
 from google.genai import types
-from app.core.config import settings
-from app.agents.prompts import SOURCE_VERIFIER_PROMPT
-from app.agents.utils import extract_json
+from app.core.gemini import extract_search_sources, generate_for_node, get_gemini_client
+from app.agents.progress import report_progress
+from app.agents.prompts import SOURCE_VERIFIER_TEMPLATE
+from app.agents.utils import extract_json, state_json
 
 logger = logging.getLogger(__name__)
 
@@ -19,36 +19,48 @@ async def source_verifier_node(state: dict) -> dict:
     - Calculates trust scores
     """
 
-    client = genai.Client(api_key=settings.gemini_api_key)
+    reused = state.get("reused_result")
+    if reused:
+        logger.info("[SourceVerifier] Reusing verified sources from a near-identical analysis")
+        return {
+            "verified_sources": reused.get("verified_sources", []),
+            "overall_trust_score": reused.get("overall_trust_score", 0),
+            "source_summary": reused.get("source_summary", ""),
+            "agent_statuses": [
+                {
+                    "agent_id": "source",
+                    "status": "done",
+                    "message": "Source verification reused",
+                    "progress": 100,
+                },
+            ],
+        }
+
+    client = get_gemini_client()
 
     sources_to_verify = state.get("source_verifier_instructions", {}).get("sources", [])
     claims = state.get("claims", [])
 
-    # Avoid str.format on JSON examples inside the prompt template.
-    prompt = (
-        SOURCE_VERIFIER_PROMPT
-        .replace("{sources}", json.dumps(sources_to_verify, ensure_ascii=False))
-        .replace("{claims}", json.dumps(claims, ensure_ascii=False))
+    prompt = SOURCE_VERIFIER_TEMPLATE.render(
+        sources=json.dumps(sources_to_verify, ensure_ascii=False),
+        claims=state_json(state, "claims"),
     ) + "\n\nYou must respond in valid JSON format only."
 
     logger.info(f"[SourceVerifier] Starting verification for {len(sources_to_verify)} sources")
     logger.debug(f"[SourceVerifier] Sources: {sources_to_verify}")
 
     # Use Flash model with Google Search Grounding (fast search tasks)
+    report_progress("source", "searching", "Searching for original sources...", 20)
     try:
-        response = await asyncio.wait_for(
-            client.aio.models.generate_content(
-                model=settings.gemini_model_flash,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    tools=[types.Tool(google_search=types.GoogleSearch())],
-                    temperature=0.3,
-                ),
-            ),
-            timeout=60,
+        response = await generate_for_node(
+            client,
+            "source_verifier",
+            prompt,
+            mode=state.get("analysis_mode"),
+            tools=[types.Tool(google_search=types.GoogleSearch())],
         )
     except asyncio.TimeoutError:
-        logger.error("[SourceVerifier] Request timed out after 60 seconds")
+        logger.error("[SourceVerifier] Request timed out")
         return {
             "verified_sources": [],
             "overall_trust_score": 0,
@@ -64,6 +76,10 @@ async def source_verifier_node(state: dict) -> dict:
             "errors": [{"agent": "source", "error": "timeout"}],
         }
 
+    found = len(extract_search_sources(response))
+    report_progress(
+        "source", "analyzing", f"Checking {found} sources found by search..." if found else "Checking sources...", 80
+    )
     try:
         logger.info(f"[SourceVerifier] Response received, length: {len(response.text)}")
         logger.debug(f"[SourceVerifier] Raw response: {response.text[:500]}...")
@@ -80,12 +96,6 @@ async def source_verifier_node(state: dict) -> dict:
             "overall_trust_score": result.get("overall_trust_score", 0),
             "source_summary": result.get("summary", ""),
             "agent_statuses": [
-                {
-                    "agent_id": "source",
-                    "status": "searching",
-                    "message": "Searching for original sources...",
-                    "progress": 50,
-                },
                 {
                     "agent_id": "source",
                     "status": "done",
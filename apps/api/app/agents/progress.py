@@ -0,0 +1,63 @@
+"""Live agent progress reported from inside nodes.
+
+A node's returned agent_statuses only reach the stream when the node
+finishes, so they carry the final status ("done", "error"). Progress while
+a node works (a model call started, grounding returned, an image being
+drawn) is written through LangGraph's stream writer instead; /api/stream
+runs the graph with stream_mode=["updates", "custom"] and forwards each
+report as an agent_status frame as it happens.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, TypeVar
+
+from langgraph.config import get_stream_writer
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def report_progress(agent_id: str, status: str, message: str, progress: int):
+    """Send an agent_status update now; a no-op outside a graph run."""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return  # called outside a node (e.g. a direct call in a script)
+    writer({
+        "agent_status": {
+            "agent_id": agent_id,
+            "status": status,
+            "message": message,
+            "progress": progress,
+        }
+    })
+
+
+async def with_progress(
+    work: Awaitable[T],
+    agent_id: str,
+    status: str,
+    message: str,
+    *,
+    start: int,
+    end: int,
+) -> T:
+    """Await work of unknown duration, reporting progress that creeps from
+    start toward (never reaching) end every settings.progress_tick_seconds."""
+    task = asyncio.ensure_future(work)
+    progress = float(start)
+    report_progress(agent_id, status, message, start)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=settings.progress_tick_seconds)
+            if done:
+                return task.result()
+            progress += (end - progress) / 3
+            report_progress(agent_id, status, message, int(progress))
+    finally:
+        if not task.done():
+            task.cancel()
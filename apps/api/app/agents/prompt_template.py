@@ -0,0 +1,63 @@
+"""Precompiled prompt templates.
+
+Prompt strings are several kilobytes long. Rendering them with chained
+str.replace copies the whole prompt once per placeholder (and re-scans
+text that was already substituted); str.format re-parses the template on
+every call. PromptTemplate splits a template into literal segments and
+field slots once at import time, so rendering is a single join.
+"""
+
+import re
+
+
+class PromptTemplate:
+    """A prompt compiled into literal segments and named field slots.
+
+    Two placeholder styles are supported, matching how the prompts are written:
+    - replace style (default): only the declared "{field}" placeholders are
+      substituted and every other brace is literal (prompts with JSON examples).
+    - format style (escaped=True): str.format syntax, i.e. "{{" / "}}" are
+      literal braces and every "{field}" must be declared.
+    """
+
+    def __init__(self, template: str, fields: tuple[str, ...], *, escaped: bool = False):
+        self.template = template
+        self.fields = tuple(fields)
+        self._parts: list[str] = []
+        self._slots: list[str] = []
+
+        names = "|".join(re.escape(field) for field in self.fields)
+        if escaped:
+            pattern = re.compile(r"\{\{|\}\}|\{(\w*)\}")
+        else:
+            pattern = re.compile(r"\{(" + names + r")\}")
+
+        literal: list[str] = []
+        position = 0
+        for match in pattern.finditer(template):
+            literal.append(template[position:match.start()])
+            position = match.end()
+            token = match.group(0)
+            if token in ("{{", "}}"):
+                literal.append(token[0])
+                continue
+            field = match.group(1)
+            if field not in self.fields:
+                raise ValueError(f"Undeclared prompt field: {{{field}}}")
+            self._parts.append("".join(literal))
+            self._slots.append(field)
+            literal = []
+        literal.append(template[position:])
+        self._parts.append("".join(literal))
+
+        missing = set(self.fields) - set(self._slots)
+        if missing:
+            raise ValueError(f"Prompt fields not found in template: {sorted(missing)}")
+
+    def render(self, **values) -> str:
+        """Substitute every field in one pass; values are converted with str()."""
+        pieces = [self._parts[0]]
+        for slot, part in zip(self._slots, self._parts[1:]):
+            pieces.append(str(values[slot]))
+            pieces.append(part)
+        return "".join(pieces)
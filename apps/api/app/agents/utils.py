@@ -2,6 +2,90 @@
 import json
 import re
 
+from app.services.cache import TTLCache
+
+_YOUTUBE_RE = re.compile(
+    r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/)([^&\s?#]+)'
+)
+
+
+_WORD_RE = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+# Common Korean particles, stripped from the end of tokens (longest first).
+_KOREAN_PARTICLES = (
+    "에서는", "으로는", "에게서", "이라는", "라는", "에서", "으로", "에게", "까지", "부터", "보다",
+    "처럼", "이며", "한다고", "했다고", "하는", "했다", "한다", "은", "는", "이", "가", "을", "를", "의", "에", "로",
+    "와", "과", "도", "만",
+)
+_STOPWORDS = frozenset({
+    "그리고", "하지만", "그러나", "또한", "이번", "지난", "대한", "위한", "통해", "따르면", "것으로",
+    "있다", "없다", "있는", "없는", "했다", "한다", "밝혔다", "말했다", "이라고", "라고", "the", "and",
+    "for", "that", "with", "this", "from", "are", "was", "were", "has", "have",
+})
+
+
+def is_youtube_url(url: str) -> bool:
+    return bool(_YOUTUBE_RE.search(url))
+
+
+def keyword_tokens(text: str) -> list[str]:
+    """Lowercased word tokens with trailing Korean particles and stopwords removed."""
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        for particle in _KOREAN_PARTICLES:
+            if word.endswith(particle) and len(word) - len(particle) >= 2:
+                word = word[: -len(particle)]
+                break
+        if word not in _STOPWORDS:
+            tokens.append(word)
+    return tokens
+
+
+def extract_keywords(text: str, limit: int = 8) -> list[str]:
+    """Local keyword extraction: most frequent tokens, earlier mentions weighted higher."""
+    scores: dict[str, float] = {}
+    tokens = keyword_tokens(text)
+    for position, token in enumerate(tokens):
+        scores[token] = scores.get(token, 0.0) + 1.0 + 1.0 / (1 + position / 50)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [token for token, _ in ranked[:limit]]
+
+
+def leading_sentences(text: str, count: int = 3, max_chars: int = 200) -> list[str]:
+    """The first non-empty sentences of a text, each truncated to max_chars."""
+    sentences = [s.strip() for s in _SENTENCE_END_RE.split(text) if s.strip()]
+    return [s[:max_chars] for s in sentences[:count]]
+
+
+# Per-session memo of serialized state fragments: session_id -> {(key, limit): (value, json)}
+_state_json_memo: TTLCache[dict] = TTLCache(ttl=60 * 60, max_entries=1000)
+
+
+def state_json(state: dict, key: str, *, limit: int | None = None) -> str:
+    """json.dumps(state[key][:limit], ensure_ascii=False), memoized per session.
+
+    Parallel nodes receive the same state value objects, so the text is
+    reused for as long as the stored object is the identical one. State
+    values are replaced, never mutated in place, which keeps this safe.
+    """
+    value = state.get(key, [])
+    session_id = state.get("session_id")
+    if not session_id:
+        return json.dumps(value[:limit] if limit else value, ensure_ascii=False)
+
+    memo = _state_json_memo.get(session_id)
+    if memo is None:
+        memo = {}
+        _state_json_memo.set(session_id, memo)
+    cached = memo.get((key, limit))
+    if cached is not None and cached[0] is value:
+        return cached[1]
+
+    text = json.dumps(value[:limit] if limit else value, ensure_ascii=False)
+    memo[(key, limit)] = (value, text)
+    return text
+
 
 def extract_json(text: str) -> dict:
     """Extract JSON from text that may contain markdown code blocks or extra text."""
@@ -1,141 +1,77 @@
 """Analysis API endpoints with SSE streaming"""
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Form, Header, HTTPException, Request, UploadFile, File
+from fastapi.responses import Response, StreamingResponse
 from uuid import uuid4
+import asyncio
 import json
+import logging
 
 from app.schemas.analyze import AnalyzeRequest, AnalyzeResponse
-from app.services.session import session_store
-from app.agents.graph import get_flipside_graph, get_initial_state
+from app.services.admission import AdmissionQueueFull, AdmissionTicket, admission, client_id_of
+from app.services.analysis_result import AnalysisResult, convert_keys
+from app.services.session import AnalysisSession, session_store
+from app.services.event_log import EventLog, parse_last_event_id
+from app.services.blob_store import BlobTooLargeError, blob_store
+from app.agents.utils import is_youtube_url
+from app.core.config import AnalysisMode, settings
+
+# The graph (langgraph, google-genai), Pillow, numpy and httpx are imported
+# where they are used: the lifespan warm-up loads them (see app.main), so
+# importing the app stays cheap.
 
 router = APIRouter(prefix="/api", tags=["analyze"])
 
+logger = logging.getLogger(__name__)
 
-def to_camel_case(snake_str: str) -> str:
-    parts = snake_str.split('_')
-    return parts[0] + ''.join(p.capitalize() for p in parts[1:])
-
-
-def convert_keys(obj):
-    if isinstance(obj, dict):
-        return {to_camel_case(k): convert_keys(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [convert_keys(i) for i in obj]
-    return obj
-
-
-def build_source_panel(verified_sources: list, trust_score: int, summary: str) -> dict:
-    """Build SourcePanelData matching frontend type."""
-    converted = convert_keys(verified_sources)
-    overall_status = "verified"
-    if converted:
-        statuses = [s.get("verification", {}).get("status", "verified") for s in converted]
-        if "distorted" in statuses:
-            overall_status = "distorted"
-        elif "context_missing" in statuses:
-            overall_status = "context_missing"
-    return {
-        "originalSources": converted,
-        "verificationStatus": overall_status,
-        "trustScore": trust_score,
-        "summary": summary,
-    }
-
-
-def build_perspective_panel(
-    perspectives: list,
-    common_facts: list,
-    divergence_points: list,
-    perspective_image: dict | None = None,
-) -> dict:
-    """Build PerspectivePanelData matching frontend type."""
-    panel = {
-        "perspectives": convert_keys(perspectives),
-        "commonFacts": common_facts,
-        "divergencePoints": convert_keys(divergence_points),
-    }
-    if perspective_image:
-        panel["spectrumVisualization"] = {
-            "imageDataUrl": (
-                f"data:{perspective_image.get('mime_type', 'image/png')};base64,"
-                f"{perspective_image.get('base64_data', '')}"
-            ),
-            "caption": perspective_image.get("caption", ""),
-            "chartType": "auto",
-        }
-    return panel
-
-
-def build_bias_panel(
-    detected_biases: list,
-    claims: list,
-    expanded_topics: list = None,
-    related_content: list = None,
-    alternative_framing: str = None,
-    user_instincts: list = None,
-    information_biases: list = None,
-) -> dict:
-    """Build BiasPanelData matching frontend type."""
-    bias_scores = []
-    dominant_biases = []
-    text_examples = []
-
-    for bias in detected_biases:
-        bias_type = bias.get("type", "")
-        confidence = bias.get("confidence", 0)
-        example = bias.get("example", "")
-
-        bias_scores.append({"type": bias_type, "score": confidence})
-        if confidence >= 0.5:
-            dominant_biases.append(bias_type)
-        if example:
-            text_examples.append({
-                "text": example,
-                "biasType": bias_type,
-                "explanation": f"Detected {bias_type.replace('_', ' ')} with {confidence:.0%} confidence",
-            })
 
-    result = {
-        "biasScores": bias_scores,
-        "dominantBiases": dominant_biases,
-        "textExamples": text_examples,
-    }
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-    # Add new Agent A structure: user instincts (Hans Rosling 10)
-    if user_instincts:
-        result["userInstincts"] = convert_keys(user_instincts)
+# Strong references to running analyses (asyncio only keeps weak ones).
+_analysis_tasks: set[asyncio.Task] = set()
 
-    # Add new Agent A structure: information/media biases
-    if information_biases:
-        result["informationBiases"] = convert_keys(information_biases)
 
-    # Add alternative framing only if AI generated it (no boilerplate fallback)
-    if alternative_framing:
-        result["alternativeFraming"] = alternative_framing
+def _payload_too_large(limit: int, unit: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Content exceeds the limit of {limit} {unit}")
 
-    # Add expanded topics if available
-    if expanded_topics:
-        result["expandedTopics"] = convert_keys(expanded_topics)
 
-    # Add related content if available
-    if related_content:
-        result["relatedContent"] = convert_keys(related_content)
+def _queue_full(e: AdmissionQueueFull) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
-    return result
 
+def _check_admission():
+    """Shed new analyses early while the admission queue is full."""
+    try:
+        admission.check_capacity()
+    except AdmissionQueueFull as e:
+        raise _queue_full(e)
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-async def start_analysis(request: AnalyzeRequest):
-    """Start a new analysis session."""
+
+def _start_session(
+    content_type: str,
+    content: str = "",
+    content_ref: str | None = None,
+    mode: str | None = None,
+    client_id: str = "",
+) -> AnalyzeResponse:
     session_id = str(uuid4())
 
     # Create session
     session_store.create(
         session_id=session_id,
-        content_type=request.type,
-        content=request.content
+        content_type=content_type,
+        content=content,
+        content_ref=content_ref,
+        mode=mode or settings.analysis_default_mode,
+        client_id=client_id,
     )
 
+    # Start fetching article pages now so the download overlaps with the
+    # client opening the stream; the analyzer awaits the same task.
+    if settings.url_prefetch_enabled and content_type == "url" and not is_youtube_url(content):
+        from app.services.url_fetcher import prefetch_url
+
+        prefetch_url(content)
+
     return AnalyzeResponse(
         session_id=session_id,
         status="started",
@@ -143,304 +79,417 @@ async def start_analysis(request: AnalyzeRequest):
     )
 
 
-@router.get("/stream/{session_id}")
-async def stream_analysis(session_id: str, request: Request):
-    """
-    SSE endpoint for streaming analysis progress.
-    Uses LangGraph's async streaming.
-    """
-    session = session_store.get(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    async def event_generator():
-        graph = get_flipside_graph()
-        stream_open = True
-
-        # Aggregate and persist final analysis output for /api/result.
-        result_payload = {
-            "session_id": session_id,
-            "status": "analyzing",
-            "claims": [],
-            "detected_biases": [],
-            "user_instincts": [],
-            "information_biases": [],
-            "verified_sources": [],
-            "overall_trust_score": 0,
-            "source_summary": "",
-            "perspectives": [],
-            "common_facts": [],
-            "divergence_points": [],
-            "perspective_summary": "",
-            "perspective_image": None,
-            "steel_man": None,
-            "alternative_framing": "",
-            "expanded_topics": [],
-            "related_content": [],
-        }
-        conversation_context = dict(session.conversation_context or {})
-
-        # Panel ordering buffer: ensure panels are sent in order
-        # Layer 1 (source) -> Layer 2 (perspective) -> Layer 3 (bias)
-        panel_buffer = {
-            "source": None,       # Layer 1
-            "perspective": None,   # Layer 2
-            "bias": None,          # Layer 3
-        }
-        panels_sent = {"source": False, "perspective": False, "bias": False}
-        PANEL_ORDER = ["source", "perspective", "bias"]
-
-        def flush_panels():
-            """Yield buffered panels in guaranteed order."""
-            flushed = []
-            for panel_name in PANEL_ORDER:
-                if panels_sent[panel_name]:
-                    continue
-                if panel_buffer[panel_name] is not None:
-                    panels_sent[panel_name] = True
-                    flushed.append(panel_buffer[panel_name])
-                else:
-                    break  # Stop at first missing panel to preserve order
-            return flushed
-
-        # Initial state
-        initial_state = get_initial_state(
-            session_id=session_id,
-            content_type=session.content_type,
-            content=session.content
+@router.post("/analyze", response_model=AnalyzeResponse)
+async def start_analysis(request: AnalyzeRequest, http_request: Request):
+    """Start a new analysis session."""
+    _check_admission()
+    content = request.content
+    mode = request.mode
+    client_id = client_id_of(http_request)
+
+    if request.type == "url":
+        if len(content) > settings.max_url_chars:
+            raise _payload_too_large(settings.max_url_chars, "characters")
+        return _start_session("url", content, mode=mode, client_id=client_id)
+
+    if request.type == "image":
+        from app.services.images import InvalidImageError, decode_image_payload
+
+        # Base64 inflates by 4/3; check the decoded size before decoding.
+        if len(content) * 3 // 4 > settings.max_image_bytes:
+            raise _payload_too_large(settings.max_image_bytes, "bytes")
+        try:
+            raw = await asyncio.to_thread(decode_image_payload, content)
+        except InvalidImageError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _start_session("image", content_ref=await blob_store.put_bytes(raw), mode=mode, client_id=client_id)
+
+    if len(content) > settings.max_text_chars:
+        raise _payload_too_large(settings.max_text_chars, "characters")
+    if len(content) > settings.blob_inline_max_chars:
+        return _start_session(
+            "text",
+            content_ref=await blob_store.put_bytes(content.encode("utf-8")),
+            mode=mode,
+            client_id=client_id,
         )
+    return _start_session("text", content, mode=mode, client_id=client_id)
 
-        # Update session status
-        session_store.update(session_id, status="analyzing")
 
-        try:
-            # Stream using 'updates' mode to get incremental state changes
-            async for event in graph.astream(initial_state, stream_mode="updates"):
-                # Keep running analysis even after disconnect so /result can be fetched.
-                if stream_open and await request.is_disconnected():
-                    stream_open = False
-
-                for _, node_output in event.items():
-                    # Accumulate result fields for final storage.
-                    if "claims" in node_output:
-                        result_payload["claims"] = node_output["claims"]
-                    if "detected_biases" in node_output:
-                        result_payload["detected_biases"] = node_output["detected_biases"]
-                    if "user_instincts" in node_output:
-                        result_payload["user_instincts"] = node_output["user_instincts"]
-                    if "information_biases" in node_output:
-                        result_payload["information_biases"] = node_output["information_biases"]
-                    if "verified_sources" in node_output:
-                        result_payload["verified_sources"] = node_output["verified_sources"]
-                    if "overall_trust_score" in node_output:
-                        result_payload["overall_trust_score"] = node_output["overall_trust_score"]
-                    if "perspectives" in node_output:
-                        result_payload["perspectives"] = node_output["perspectives"]
-                    if "common_facts" in node_output:
-                        result_payload["common_facts"] = node_output["common_facts"]
-                    if "divergence_points" in node_output:
-                        result_payload["divergence_points"] = node_output["divergence_points"]
-                    if "source_summary" in node_output:
-                        result_payload["source_summary"] = node_output["source_summary"]
-                    if "perspective_summary" in node_output:
-                        result_payload["perspective_summary"] = node_output["perspective_summary"]
-                    if "perspective_image" in node_output:
-                        result_payload["perspective_image"] = node_output["perspective_image"]
-                    if "steel_man" in node_output and node_output["steel_man"]:
-                        result_payload["steel_man"] = node_output["steel_man"]
-                    if "expanded_topics" in node_output:
-                        result_payload["expanded_topics"] = node_output["expanded_topics"]
-                    if "related_content" in node_output:
-                        result_payload["related_content"] = node_output["related_content"]
-                    if "alternative_framing" in node_output:
-                        result_payload["alternative_framing"] = node_output["alternative_framing"]
-
-                    # Merge conversation context from parallel nodes for /api/chat.
-                    if "conversation_context" in node_output:
-                        conversation_context = {
-                            **conversation_context,
-                            **node_output["conversation_context"],
-                        }
-                    if "source_summary" in node_output:
-                        conversation_context["source_summary"] = node_output["source_summary"]
-                    if "perspective_summary" in node_output:
-                        conversation_context["perspective_summary"] = node_output["perspective_summary"]
-                    if "detected_biases" in node_output:
-                        conversation_context["detected_biases"] = node_output["detected_biases"]
-                    if "claims" in node_output:
-                        conversation_context["claims"] = node_output["claims"]
-
-                    # Send agent status updates
-                    if "agent_statuses" in node_output:
-                        for status in node_output["agent_statuses"]:
-                            sse_data = {
-                                "type": "agent_status",
-                                "payload": convert_keys(status)
-                            }
-                            if stream_open:
-                                yield f"data: {json.dumps(sse_data)}\n\n"
-
-                    # Buffer panel updates (sent in guaranteed order below)
-                    if "verified_sources" in node_output and node_output["verified_sources"]:
-                        panel_buffer["source"] = {
-                            "type": "panel_update",
-                            "panel": "source",
-                            "payload": build_source_panel(
-                                node_output["verified_sources"],
-                                node_output.get("overall_trust_score", 0),
-                                node_output.get("source_summary", "")
-                            )
-                        }
+@router.post("/analyze/upload", response_model=AnalyzeResponse)
+async def start_upload_analysis(
+    http_request: Request,
+    file: UploadFile = File(...),
+    mode: AnalysisMode | None = Form(None),
+):
+    """Start an image analysis from a multipart upload, streamed into the blob store."""
+    _check_admission()
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=415, detail="Only image uploads are supported")
 
-                    if "perspectives" in node_output and node_output["perspectives"]:
-                        panel_buffer["perspective"] = {
-                            "type": "panel_update",
-                            "panel": "perspective",
-                            "payload": build_perspective_panel(
-                                node_output["perspectives"],
-                                node_output.get("common_facts", []),
-                                node_output.get("divergence_points", []),
-                                node_output.get("perspective_image"),
-                            )
-                        }
+    async def chunks():
+        while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+            yield chunk
 
-                    if "perspective_image" in node_output and node_output["perspective_image"]:
-                        # Update perspective panel with image (overwrite buffer)
-                        panel_buffer["perspective"] = {
-                            "type": "panel_update",
-                            "panel": "perspective",
-                            "payload": build_perspective_panel(
-                                result_payload.get("perspectives", []),
-                                result_payload.get("common_facts", []),
-                                result_payload.get("divergence_points", []),
-                                result_payload.get("perspective_image"),
-                            )
-                        }
+    try:
+        blob_id, _ = await blob_store.put_stream(chunks(), max_bytes=settings.max_image_bytes)
+    except BlobTooLargeError:
+        raise _payload_too_large(settings.max_image_bytes, "bytes")
+    finally:
+        await file.close()
 
-                    # Buffer bias panel update when any bias-related data arrives
-                    has_bias_data = (
-                        ("detected_biases" in node_output and node_output["detected_biases"]) or
-                        ("user_instincts" in node_output and node_output["user_instincts"]) or
-                        ("information_biases" in node_output and node_output["information_biases"])
-                    )
-                    if has_bias_data:
-                        panel_buffer["bias"] = {
-                            "type": "panel_update",
-                            "panel": "bias",
-                            "payload": build_bias_panel(
-                                node_output.get("detected_biases", result_payload.get("detected_biases", [])),
-                                node_output.get("claims", result_payload.get("claims", [])),
-                                user_instincts=node_output.get("user_instincts", []),
-                                information_biases=node_output.get("information_biases", []),
-                            )
-                        }
+    return _start_session("image", content_ref=blob_id, mode=mode, client_id=client_id_of(http_request))
 
-                    # Update bias buffer with expanded topics/related content/framing
-                    if "expanded_topics" in node_output or "related_content" in node_output or "alternative_framing" in node_output:
-                        expanded = node_output.get("expanded_topics", [])
-                        related = node_output.get("related_content", [])
-                        framing = node_output.get("alternative_framing", "")
-                        if expanded or related or framing:
-                            panel_buffer["bias"] = {
-                                "type": "panel_update",
-                                "panel": "bias",
-                                "payload": build_bias_panel(
-                                    result_payload.get("detected_biases", []),
-                                    result_payload.get("claims", []),
-                                    expanded,
-                                    related,
-                                    framing,
-                                    user_instincts=result_payload.get("user_instincts", []),
-                                    information_biases=result_payload.get("information_biases", []),
-                                )
-                            }
-
-                    # Flush buffered panels in guaranteed order: source → perspective → bias
-                    if stream_open:
-                        for panel_sse in flush_panels():
-                            yield f"data: {json.dumps(panel_sse)}\n\n"
-
-                    # Persist incremental state for result/chat recovery.
-                    session_store.update(
-                        session_id,
-                        result=result_payload,
-                        conversation_context=conversation_context
-                    )
-
-            # Flush any remaining buffered panels before completion
-            if stream_open:
-                for panel_name in PANEL_ORDER:
-                    if not panels_sent[panel_name] and panel_buffer[panel_name] is not None:
-                        panels_sent[panel_name] = True
-                        yield f"data: {json.dumps(panel_buffer[panel_name])}\n\n"
-
-            # Mark session as done
-            result_payload["status"] = "done"
-            session_store.update(
-                session_id,
-                status="done",
-                result=result_payload,
-                conversation_context=conversation_context
-            )
 
-            # Send completion event
-            if stream_open:
-                analysis_result = {
-                    "source": build_source_panel(
-                        result_payload.get("verified_sources", []),
-                        result_payload.get("overall_trust_score", 0),
-                        result_payload.get("source_summary", "")
-                    ),
-                    "perspective": build_perspective_panel(
-                        result_payload.get("perspectives", []),
-                        result_payload.get("common_facts", []),
-                        result_payload.get("divergence_points", []),
-                        result_payload.get("perspective_image"),
-                    ),
-                    "bias": build_bias_panel(
-                        result_payload.get("detected_biases", []),
-                        result_payload.get("claims", []),
-                        result_payload.get("expanded_topics", []),
-                        result_payload.get("related_content", []),
-                        result_payload.get("alternative_framing", ""),
-                        user_instincts=result_payload.get("user_instincts", []),
-                        information_biases=result_payload.get("information_biases", []),
-                    ),
-                    "steelMan": convert_keys(result_payload.get("steel_man", {})) or {
-                        "opposingArgument": "",
-                        "strengthenedArgument": "",
-                        "refutationPoints": [],
-                    },
-                }
-                complete_data = {
-                    "type": "analysis_complete",
-                    "payload": {
-                        "sessionId": session_id,
-                        "result": analysis_result,
-                    }
-                }
-                yield f"data: {json.dumps(complete_data)}\n\n"
+async def _run_analysis(session_id: str, session: AnalysisSession, log: EventLog):
+    """
+    Run the analysis graph for a session, appending every SSE frame to its event log.
 
-        except Exception as e:
-            result_payload["status"] = "error"
-            session_store.update(
+    Runs as a background task independent of any stream connection, so
+    clients can drop and reconnect (Last-Event-ID) without restarting it.
+    """
+    from app.agents.dataflow import publish_completed_tasks, reset_node_outputs
+    from app.agents.graph import get_flipside_graph, get_initial_state, get_thread_config, release_checkpoints, retain_checkpoints
+    from app.agents.nodes.analyzer import cancel_bias_analysis
+    from app.agents.nodes.perspective import cancel_speculation
+    from app.services.similarity import remember_analysis
+    from app.services.socrates_prefetch import schedule_prefetch
+    from app.services.usage import bind_session
+
+    bind_session(session_id)
+    graph = get_flipside_graph()
+    failed = False
+
+    # Aggregate and persist final analysis output for /api/result.
+    result = AnalysisResult(session_id=session_id)
+    # Chat context fields produced by this run, merged into the session's
+    # context so concurrent chat turns keep their messages.
+    conversation_context = {}
+    session_store.update(session_id, result=result)
+
+    # Panel ordering: panels are sent in order, each once its data exists.
+    # Layer 1 (source) -> Layer 2 (perspective) -> Layer 3 (bias)
+    PANEL_ORDER = ["source", "perspective", "bias"]
+    panels_ready = {"source": False, "perspective": False, "bias": False}
+    panels_sent = {"source": False, "perspective": False, "bias": False}
+
+    def panel_event(panel_name: str) -> str:
+        return f'{{"type": "panel_update", "panel": "{panel_name}", "payload": {result.panel_json(panel_name)}}}'
+
+    def flush_panels():
+        """Send ready panels in guaranteed order."""
+        for panel_name in PANEL_ORDER:
+            if panels_sent[panel_name]:
+                continue
+            if not panels_ready[panel_name]:
+                break  # Stop at first missing panel to preserve order
+            panels_sent[panel_name] = True
+            log.append_json(panel_event(panel_name))
+
+    # Initial state
+    initial_state = get_initial_state(
+        session_id=session_id,
+        content_type=session.content_type,
+        content=session.content,
+        content_ref=session.content_ref,
+        analysis_mode=session.mode,
+    )
+
+    # Update session status
+    session_store.update(session_id, status="analyzing")
+
+    try:
+        # Resume from the session's checkpoint if an earlier run got that far:
+        # completed nodes are replayed from the saved state, not re-executed.
+        thread_config = get_thread_config(session_id)
+        graph_input = initial_state
+        restored_state = {}
+        run_graph = True
+        reset_node_outputs(session_id)
+        if graph.checkpointer is not None:
+            snapshot = await graph.aget_state(thread_config)
+            if snapshot.values:
+                restored_state = snapshot.values
+                graph_input = None  # None continues from the checkpoint
+                run_graph = bool(snapshot.next)
+                publish_completed_tasks(session_id, snapshot)
+
+        async def graph_updates():
+            if restored_state:
+                yield "updates", {"checkpoint": restored_state}
+            if run_graph:
+                # 'updates' carries node outputs as each node finishes; 'custom'
+                # carries progress the nodes report while they run (app.agents.progress).
+                async for mode, chunk in graph.astream(graph_input, thread_config, stream_mode=["updates", "custom"]):
+                    yield mode, chunk
+
+        async for stream_mode, event in graph_updates():
+            if stream_mode == "custom":
+                if "agent_status" in event:
+                    log.append({"type": "agent_status", "payload": convert_keys(event["agent_status"])})
+                continue
+            for _, node_output in event.items():
+                # Accumulate result fields for final storage.
+                changed_panels = result.apply(node_output)
+
+                # Merge conversation context from parallel nodes for /api/chat.
+                if "conversation_context" in node_output:
+                    conversation_context = {
+                        **conversation_context,
+                        **node_output["conversation_context"],
+                    }
+                if "source_summary" in node_output:
+                    conversation_context["source_summary"] = node_output["source_summary"]
+                if "perspective_summary" in node_output:
+                    conversation_context["perspective_summary"] = node_output["perspective_summary"]
+                if "detected_biases" in node_output:
+                    conversation_context["detected_biases"] = node_output["detected_biases"]
+                if "claims" in node_output:
+                    conversation_context["claims"] = node_output["claims"]
+
+                # Send agent status updates
+                if "agent_statuses" in node_output:
+                    for status in node_output["agent_statuses"]:
+                        sse_data = {
+                            "type": "agent_status",
+                            "payload": convert_keys(status)
+                        }
+                        log.append(sse_data)
+
+                # Mark panels ready once they have data (sent in guaranteed order below)
+                if node_output.get("verified_sources"):
+                    panels_ready["source"] = True
+                if node_output.get("perspectives") or node_output.get("perspective_image"):
+                    panels_ready["perspective"] = True
+
+                # Bias panel: claims, the bias stage and expanded topics come
+                # from different nodes in any order.
+                has_bias_data = (
+                    node_output.get("detected_biases")
+                    or node_output.get("user_instincts")
+                    or node_output.get("information_biases")
+                    or node_output.get("expanded_topics")
+                    or node_output.get("related_content")
+                    or node_output.get("alternative_framing")
+                )
+                if has_bias_data:
+                    panels_ready["bias"] = True
+                # Expanded topics no longer wait for the whole analysis, so bias
+                # panel data may change after the panel was first sent.
+                if "bias" in changed_panels and panels_sent["bias"]:
+                    log.append_json(panel_event("bias"))
+
+                # Flush ready panels in guaranteed order: source → perspective → bias
+                flush_panels()
+
+                # Persist incremental state for result/chat recovery.
+                session_store.update_context(session_id, conversation_context)
+
+        # Flush any remaining ready panels before completion
+        for panel_name in PANEL_ORDER:
+            if not panels_sent[panel_name] and panels_ready[panel_name]:
+                panels_sent[panel_name] = True
+                log.append_json(panel_event(panel_name))
+
+        # Mark session as done
+        result.set_status("done")
+        session_store.update(session_id, status="done")
+        # A finished run is never resumed, so its checkpoints can go.
+        await release_checkpoints(session_id)
+        # Fast-mode results skip optional work, so they are not offered for reuse.
+        if session.mode != "fast":
+            await remember_analysis(
                 session_id,
-                status="error",
-                result=result_payload,
-                conversation_context=conversation_context
+                session.content_key,
+                result.claims,
+                result.to_dict(),
             )
-            error_data = {
-                "type": "error",
-                "payload": {
-                    "code": "ANALYSIS_FAILED",
-                    "message": str(e)
-                }
+
+        # Send completion event (the same serialized projection /api/result serves)
+        log.append_json(
+            f'{{"type": "analysis_complete", "payload": {{"sessionId": {json.dumps(session_id)}, '
+            f'"result": {result.projection_json()}}}}}'
+        )
+        # The first Socrates turn is prepared while the user reads the result;
+        # scheduled last, so a run cancelled before completing never leaves one behind.
+        schedule_prefetch(session_id)
+
+    except Exception as e:
+        failed = True
+        retain_checkpoints(session_id)
+        result.set_status("error")
+        session_store.update(session_id, status="error")
+        error_data = {
+            "type": "error",
+            "payload": {
+                "code": "ANALYSIS_FAILED",
+                "message": str(e)
             }
-            if stream_open:
-                yield f"data: {json.dumps(error_data)}\n\n"
+        }
+        log.append(error_data)
+    finally:
+        # Work started ahead for later nodes that the run never consumed
+        # (it failed or was cancelled first).
+        cancel_bias_analysis(session_id)
+        cancel_speculation(session_id)
+        log.close(failed=failed)
+
+
+async def _admitted_run(session_id: str, session: AnalysisSession, log: EventLog, ticket: AdmissionTicket):
+    """Wait for a run slot, reporting the queue position as SSE events, then run the analysis."""
+
+    def report_position(position: int):
+        log.append({
+            "type": "queued",
+            "payload": {
+                "position": position,
+                "queueLength": admission.queued,
+                "estimatedWaitSeconds": admission.estimated_wait(position),
+            },
+        })
+
+    try:
+        await admission.wait(ticket, report_position)
+        await _run_analysis(session_id, session, log)
+    except asyncio.CancelledError:
+        log.close(failed=True)
+        from app.agents.graph import retain_checkpoints
+
+        retain_checkpoints(session_id)
+        raise
+    finally:
+        admission.release(ticket)
+
+
+async def _cancel_when_abandoned(session_id: str, log: EventLog, run: asyncio.Task):
+    """Cancel the run (and with it its in-flight model calls) once no client
+    has listened to or read the session for abandoned_run_cancel_seconds.
+
+    The run's checkpoint is kept, so a client coming back starts a new
+    stream that resumes where the cancelled run stopped.
+    """
+    limit = settings.abandoned_run_cancel_seconds
+    while not run.done():
+        unattended = session_store.unattended_seconds(session_id)
+        if unattended >= limit:
+            logger.info(f"[Analyze] Cancelling run nobody listened to for {unattended:.0f}s (session={session_id})")
+            log.append({
+                "type": "error",
+                "payload": {"code": "ANALYSIS_ABANDONED", "message": "Analysis cancelled: no client was listening"},
+            })
+            session_store.update(session_id, status="cancelled")
+            run.cancel()
+            return
+        await asyncio.wait({run}, timeout=limit - unattended)
+
+
+def _track_task(task: asyncio.Task):
+    _analysis_tasks.add(task)
+    task.add_done_callback(_analysis_tasks.discard)
+
+
+def _ensure_analysis(session_id: str, session: AnalysisSession, last_event_id: int) -> EventLog:
+    """Return the session's event log, starting the analysis run if needed.
+
+    A new run takes an admission ticket first (503 when the queue is full);
+    a session whose blob has been swept gets 410.
+    """
+    log = session_store.get_event_log(session_id)
+    # A fresh connection to a failed run retries it (resuming from the checkpoint),
+    # and so does any connection to a run cancelled while nobody listened;
+    # reconnects (Last-Event-ID) to a run that failed on its own just drain the log.
+    retry = log is not None and log.failed and (last_event_id == 0 or session.status == "cancelled")
+    if log is not None and not retry:
+        return log
+    if session.content_ref and not blob_store.exists(session.content_ref):
+        # The sweeper removed the payload (blob_ttl_seconds); a new run could only fail.
+        session_store.update(session_id, status="error")
+        raise HTTPException(status_code=410, detail="The uploaded content has expired; start a new analysis")
+
+    try:
+        ticket = admission.enqueue(session.client_id)
+    except AdmissionQueueFull as e:
+        raise _queue_full(e)
+
+    # Ids keep increasing across retries (and past the Last-Event-ID of a
+    # client that saw a run before a restart) so Last-Event-ID stays unambiguous.
+    log = EventLog(first_id=max(log.last_id if log else 0, last_event_id) + 1)
+    session_store.set_event_log(session_id, log)
+    run = asyncio.create_task(_admitted_run(session_id, session, log, ticket))
+    _track_task(run)
+    if settings.abandoned_run_cancel_seconds is not None:
+        _track_task(asyncio.create_task(_cancel_when_abandoned(session_id, log, run)))
+    return log
+
+
+async def _restore_session(session_id: str, client_id: str) -> AnalysisSession | None:
+    """Rebuild a session lost with a worker restart from its graph checkpoint.
+
+    Only a persistent checkpointer (sqlite) has one; the reconnecting client
+    becomes the session's client id.
+    """
+    from app.agents.graph import get_flipside_graph, get_thread_config
+
+    graph = get_flipside_graph()
+    if graph.checkpointer is None:
+        return None
+    snapshot = await graph.aget_state(get_thread_config(session_id))
+    values = snapshot.values
+    if not values or not values.get("content_type"):
+        return None
+    logger.info(f"[Analyze] Restoring session {session_id} from its checkpoint")
+    return session_store.create(
+        session_id,
+        values["content_type"],
+        values.get("content", ""),
+        content_ref=values.get("content_ref"),
+        mode=values.get("analysis_mode") or settings.analysis_default_mode,
+        client_id=client_id,
+    )
+
+
+@router.get("/stream/{session_id}")
+async def stream_analysis(
+    http_request: Request,
+    session_id: str,
+    last_event_id: str | None = Header(default=None),
+):
+    """
+    SSE endpoint for streaming analysis progress.
+
+    The first connection starts the analysis; every frame carries an id, and
+    reconnecting with a Last-Event-ID header replays only the missed frames
+    before following the live run. A reconnect that already has every frame
+    of a finished (or failed) run gets 204 No Content, which stops EventSource. While the run waits for an admission slot
+    the stream carries `queued` events with the queue position.
+
+    Comment heartbeats keep idle streams open through proxies. A run nobody
+    follows (no stream, no /api/result read) for abandoned_run_cancel_seconds
+    is cancelled; a new connection resumes it from its checkpoint.
+
+    With the sqlite checkpointer a session lost with a worker restart is
+    rebuilt from its checkpoint, so its stream resumes too.
+    """
+    session = session_store.get(session_id) or await _restore_session(session_id, client_id_of(http_request))
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    after_id = parse_last_event_id(last_event_id)
+    session_store.mark_seen(session_id)
+    log = session_store.get_event_log(session_id)
+    if log is not None and log.closed and after_id >= log.last_id and session.status != "cancelled":
+        # The client already has every frame of the finished run. 204 is the
+        # SSE signal that stops EventSource from reconnecting to it forever.
+        return Response(status_code=204)
+    log = _ensure_analysis(session_id, session, after_id)
+
+    async def frames():
+        with session_store.listening(session_id):
+            async for frame in log.follow(after_id, heartbeat=settings.sse_heartbeat_seconds):
+                yield frame
 
     return StreamingResponse(
-        event_generator(),
+        frames(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
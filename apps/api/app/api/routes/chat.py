@@ -1,20 +1,54 @@
 """Socrates dialogue endpoint"""
+import hashlib
 import json
-from fastapi import APIRouter, HTTPException
-from google import genai
-from google.genai import types
-
+import logging
+from fastapi import APIRouter, Header, HTTPException
 from app.schemas.chat import ChatRequest, ChatResponse
 from app.services.session import session_store
-from app.agents.prompts import SOCRATES_PROMPT
-from app.core.config import settings
+from app.services.session_actor import session_actors
+from app.services.socrates_prefetch import (
+    prefetch_status,
+    schedule_prefetch,
+    socrates_context_prefix,
+    take_prefetched_candidates,
+)
+from app.agents.prompts import SOCRATES_FOLLOWUP_TEMPLATE, SOCRATES_TURN_TEMPLATE
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
 
 @router.post("/chat", response_model=ChatResponse)
-async def socrates_chat(request: ChatRequest):
-    """Socrates dialogue endpoint."""
+async def socrates_chat(
+    request: ChatRequest,
+    idempotency_key: str | None = Header(default=None),
+):
+    """
+    Socrates dialogue endpoint.
+
+    Turns of one session run one at a time, in arrival order. Resubmits with
+    the same Idempotency-Key header, or without one, of the same message at
+    the same point of the dialogue, share a single reply.
+    """
+    session = session_store.get(request.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if idempotency_key:
+        key = f"key:{idempotency_key}"
+    else:
+        position = len((session.conversation_context or {}).get("messages", []))
+        key = f"turn:{position}:{hashlib.sha256(request.message.encode('utf-8')).hexdigest()}"
+    return await session_actors.run(request.session_id, lambda: _chat_turn(request), key=key)
+
+
+async def _chat_turn(request: ChatRequest) -> ChatResponse:
+    """One dialogue turn; runs inside the session's actor."""
+    from app.core.gemini import generate_for_node, get_gemini_client
+    from app.services.usage import bind_session
+
+    bind_session(request.session_id)
     session = session_store.get(request.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -23,26 +57,45 @@ async def socrates_chat(request: ChatRequest):
     current_step = context.get("step", 0)
     messages = context.get("messages", [])
 
-    client = genai.Client(api_key=settings.gemini_api_key)
+    client = get_gemini_client()
 
-    # Build prompt with context
-    prompt = SOCRATES_PROMPT.format(
-        source_result=context.get("source_summary", ""),
-        perspectives=context.get("perspective_summary", ""),
-        biases=json.dumps(context.get("detected_biases", []), ensure_ascii=False),
-        current_step=current_step + 1,
-        previous_messages=json.dumps(messages, ensure_ascii=False),
-        user_message=request.message
-    )
+    # Session-constant prefix first, so turns share the model's prefix cache.
+    prefix = socrates_context_prefix(context)
+    previous_messages = json.dumps(messages, ensure_ascii=False)
 
-    # Use Pro model for high-quality Socratic dialogue
-    response = await client.aio.models.generate_content(
-        model=settings.gemini_model_pro,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            temperature=0.8,
+    async def from_candidates():
+        """Reply finished from the prefetched candidates (short Flash call), or None."""
+        candidates = await take_prefetched_candidates(request.session_id, current_step, len(messages))
+        if not candidates:
+            return None
+        turn = SOCRATES_FOLLOWUP_TEMPLATE.render(
+            current_step=current_step + 1,
+            previous_messages=previous_messages,
+            user_message=request.message,
+            candidates=json.dumps(candidates, ensure_ascii=False),
         )
-    )
+        try:
+            response = await generate_for_node(client, "socrates_followup", [prefix, turn], mode=session.mode)
+        except Exception as e:
+            logger.warning(f"[Socrates] Follow-up from prefetched candidates failed: {e}")
+            return None
+        return response if response.text else None
+
+    async def full_turn():
+        turn = SOCRATES_TURN_TEMPLATE.render(
+            current_step=current_step + 1,
+            previous_messages=previous_messages,
+            user_message=request.message,
+        )
+        # Pro model for high-quality Socratic dialogue (Flash in faster modes)
+        return await generate_for_node(client, "socrates_chat", [prefix, turn], mode=session.mode)
+
+    # A prefetch still running is waited for (up to socrates_prefetch_wait_seconds)
+    # before the full call starts, so a turn never pays for both paths at once.
+    if prefetch_status(request.session_id, current_step, len(messages)) is not None:
+        response = await from_candidates() or await full_turn()
+    else:
+        response = await full_turn()
 
     # Update conversation context
     new_step = min(current_step + 1, 4)
@@ -51,14 +104,10 @@ async def socrates_chat(request: ChatRequest):
         {"role": "assistant", "content": response.text}
     ]
 
-    session_store.update(
-        request.session_id,
-        conversation_context={
-            **context,
-            "step": new_step,
-            "messages": new_messages
-        }
-    )
+    session_store.update_context(request.session_id, {"step": new_step, "messages": new_messages})
+
+    # Prepare the next turn while the user reads this reply.
+    schedule_prefetch(request.session_id)
 
     return ChatResponse(
         response=response.text,
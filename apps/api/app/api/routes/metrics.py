@@ -0,0 +1,55 @@
+"""Prometheus metrics endpoint (model usage, spend and admission)"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.admission import admission
+from app.services.usage import NodeUsage, usage_metrics
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+# Metric name, help text and NodeUsage field of the per (node, model) counters.
+_USAGE_COUNTERS = (
+    ("flipside_model_calls_total", "Model calls", "calls"),
+    ("flipside_model_input_tokens_total", "Input tokens (including tool use prompts)", "input_tokens"),
+    ("flipside_model_output_tokens_total", "Output tokens", "output_tokens"),
+    ("flipside_model_thinking_tokens_total", "Thinking tokens", "thinking_tokens"),
+    ("flipside_model_cached_tokens_total", "Input tokens served from the context cache", "cached_tokens"),
+    ("flipside_model_grounding_calls_total", "Calls grounded with Google Search", "grounding_calls"),
+    ("flipside_model_cost_usd_total", "Estimated cost in USD", "cost_usd"),
+    ("flipside_model_downgraded_calls_total", "Pro calls run on Flash near a budget", "downgraded_calls"),
+    ("flipside_model_skipped_calls_total", "Optional calls skipped near a budget", "skipped_calls"),
+)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _usage_lines(name: str, help_text: str, field: str, usage: dict[tuple[str, str], NodeUsage]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for (node, model), counters in sorted(usage.items()):
+        lines.append(f'{name}{{node="{_label(node)}",model="{_label(model)}"}} {getattr(counters, field)}')
+    return lines
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> str:
+    """Model usage per node and model, tenant spend this month and admission state
+    of this worker, in the Prometheus text format."""
+    lines: list[str] = []
+    for name, help_text, field in _USAGE_COUNTERS:
+        lines += _usage_lines(name, help_text, field, usage_metrics.by_node_model)
+
+    lines += ["# HELP flipside_tenant_spend_usd Estimated spend per tenant and month", "# TYPE flipside_tenant_spend_usd gauge"]
+    for (tenant, month), spend in sorted(usage_metrics.tenant_spend.items()):
+        lines.append(f'flipside_tenant_spend_usd{{tenant="{_label(tenant)}",month="{month}"}} {spend}')
+
+    lines += [
+        "# HELP flipside_admission_active_runs Graph runs holding a run slot",
+        "# TYPE flipside_admission_active_runs gauge",
+        f"flipside_admission_active_runs {admission.active}",
+        "# HELP flipside_admission_queued_runs Graph runs waiting for a run slot",
+        "# TYPE flipside_admission_queued_runs gauge",
+        f"flipside_admission_queued_runs {admission.queued}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -1,20 +1,137 @@
 """Result retrieval endpoint"""
-from fastapi import APIRouter, HTTPException
-from app.services.session import session_store
+import json
+from typing import Literal
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response
+
+from app.core.config import settings
+from app.services.cache import TTLCache
+from app.services.analysis_result import PANEL_FIELDS
+from app.services.session import AnalysisSession, session_store
 
 router = APIRouter(prefix="/api", tags=["result"])
 
+# Serialized response bodies keyed by (session id, selected sections), valid
+# for one session version; conversation contexts are cached the same way.
+_bodies: TTLCache[tuple[int, str]] = TTLCache(ttl=10 * 60, max_entries=4000)
+_contexts: TTLCache[tuple[int, str]] = TTLCache(ttl=10 * 60, max_entries=1000)
+
+# Selectable sections: the result panels, the list-view summary, the chat context
+# and the model usage ledger.
+RESULT_SECTIONS = (*PANEL_FIELDS, "summary", "conversation_context", "usage")
+
+VIEWS: dict[str, tuple[str, ...]] = {
+    "summary": ("summary",),
+    "panels": tuple(PANEL_FIELDS),
+    "full": (*PANEL_FIELDS, "conversation_context", "usage"),
+}
+
+
+def _etag(session: AnalysisSession) -> str:
+    return f'"{session.version}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def _parse_sections(view: str, fields: str | None) -> tuple[str, ...]:
+    """Sections selected by ?fields= (comma separated, "result" = all panels) or ?view=."""
+    if not fields:
+        return VIEWS[view]
+    sections: list[str] = []
+    for name in (f.strip() for f in fields.split(",")):
+        if name in ("", "session_id", "status"):
+            continue  # always included
+        expanded = tuple(PANEL_FIELDS) if name == "result" else (name,)
+        for section in expanded:
+            if section not in RESULT_SECTIONS:
+                raise HTTPException(status_code=400, detail=f"Unknown result field: {section}")
+            if section not in sections:
+                sections.append(section)
+    return tuple(sections)
+
+
+def _context_json(session: AnalysisSession) -> str:
+    cached = _contexts.get(session.id)
+    if cached is not None and cached[0] == session.version:
+        return cached[1]
+    context_json = json.dumps(session.conversation_context)
+    _contexts.set(session.id, (session.version, context_json))
+    return context_json
+
+
+def _result_body(session: AnalysisSession, sections: tuple[str, ...]) -> str:
+    cached = _bodies.get((session.id, sections))
+    if cached is not None and cached[0] == session.version:
+        return cached[1]
+
+    parts = [f'"session_id": {json.dumps(session.id)}', f'"status": {json.dumps(session.status)}']
+    result = session.result
+    if "summary" in sections:
+        parts.append(f'"summary": {result.panel_json("summary") if result else "null"}')
+    panels = tuple(name for name in sections if name in PANEL_FIELDS)
+    if panels:
+        full = panels == tuple(PANEL_FIELDS)
+        result_json = "null" if result is None else result.projection_json(None if full else panels)
+        parts.append(f'"result": {result_json}')
+    if "conversation_context" in sections:
+        parts.append(f'"conversation_context": {_context_json(session)}')
+    if "usage" in sections:
+        parts.append(f'"usage": {session.usage.model_dump_json()}')
+
+    body = "{" + ", ".join(parts) + "}"
+    _bodies.set((session.id, sections), (session.version, body))
+    return body
+
 
 @router.get("/result/{session_id}")
-async def get_result(session_id: str):
-    """Get the analysis result for a session."""
+async def get_result(
+    session_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for a change when If-None-Match matches"),
+    view: Literal["summary", "panels", "full"] = Query("full", description="Preset section selection"),
+    fields: str | None = Query(
+        None,
+        description="Comma separated sections (overrides view): "
+        "source, perspective, bias, steelMan, result (all panels), summary, conversation_context, usage",
+    ),
+    if_none_match: str | None = Header(default=None),
+):
+    """Get the analysis result for a session.
+
+    `result` is the frontend AnalysisResult projection, served from the same
+    cached JSON as the stream's panel updates and analysis_complete event.
+
+    view=summary returns only a compact summary (trust score, top claim,
+    counts), view=panels the panels without the chat context; fields=
+    picks individual sections. `usage` is the session's model usage ledger
+    (calls, tokens and cost per node, budget). Each section is serialized once per change
+    and shared by every view.
+
+    Responses carry the session version as ETag; a matching If-None-Match
+    returns 304. With ?wait=N such a request instead blocks until the
+    session changes or N seconds (capped) pass.
+    """
     session = session_store.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
+    sections = _parse_sections(view, fields)
+
+    if wait > 0 and _etag_matches(if_none_match, _etag(session)):
+        timeout = min(wait, settings.result_long_poll_max_seconds)
+        with session_store.listening(session_id):
+            session = await session_store.wait_for_change(session_id, session.version, timeout)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+    session_store.mark_seen(session_id)
 
-    return {
-        "session_id": session_id,
-        "status": session.status,
-        "result": session.result,
-        "conversation_context": session.conversation_context
-    }
+    etag = _etag(session)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=_result_body(session, sections), media_type="application/json", headers=headers)
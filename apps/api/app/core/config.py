@@ -1,5 +1,96 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+AnalysisMode = Literal["fast", "balanced", "deep"]
+
+
+class GenerationProfile(BaseModel):
+    """Model call settings for one node in one analysis mode."""
+
+    model: str = "flash"  # "pro" | "flash" | "image" (the gemini_model_* settings) or a model name
+    temperature: Optional[float] = None  # None keeps the model default
+    thinking_budget: Optional[int] = None  # None keeps the model default, 0 disables thinking
+    max_output_tokens: Optional[int] = None
+    timeout_seconds: Optional[float] = None
+    enabled: bool = True  # optional work (e.g. spectrum_image, expanded_topics) can be switched off
+    optional: bool = False  # skipped once the session or tenant nears its budget
+
+
+def _profiles(**nodes: dict) -> dict[str, GenerationProfile]:
+    return {node: GenerationProfile(**values) for node, values in nodes.items()}
+
+
+# "deep" is the full-quality pipeline and the fallback for nodes a mode does not list.
+DEFAULT_GENERATION_PROFILES: dict[str, dict[str, GenerationProfile]] = {
+    "deep": _profiles(
+        analyzer=dict(model="flash", temperature=0.5, timeout_seconds=60),
+        bias_analyzer=dict(model="pro", temperature=0.7, timeout_seconds=120),
+        analyzer_chunk=dict(model="flash", temperature=0.3, timeout_seconds=60),
+        analyzer_reduce=dict(model="pro", temperature=0.7, timeout_seconds=120),
+        image_ocr=dict(model="flash", temperature=0.2, timeout_seconds=30),
+        source_verifier=dict(model="flash", temperature=0.3, timeout_seconds=60),
+        perspective_explorer=dict(model="flash", temperature=0.7, timeout_seconds=60),
+        spectrum_image=dict(model="image", optional=True),
+        socrates_init=dict(model="pro", temperature=0.7),
+        steel_man=dict(model="pro", temperature=0.7),
+        expanded_topics=dict(model="flash", temperature=0.7, optional=True),
+        socrates_chat=dict(model="pro", temperature=0.8),
+        # Next-turn candidates are prepared off the critical path, so they keep Pro;
+        # finishing a turn from them is a short Flash call.
+        socrates_prefetch=dict(model="pro", temperature=0.8, timeout_seconds=60, optional=True),
+        socrates_followup=dict(model="flash", temperature=0.7, thinking_budget=0, max_output_tokens=512, timeout_seconds=15),
+    ),
+    "balanced": _profiles(
+        bias_analyzer=dict(model="pro", temperature=0.7, thinking_budget=1024, max_output_tokens=4096, timeout_seconds=60),
+        analyzer_reduce=dict(model="pro", temperature=0.7, thinking_budget=1024, max_output_tokens=4096, timeout_seconds=60),
+        socrates_init=dict(model="flash", temperature=0.7, thinking_budget=512, max_output_tokens=2048, timeout_seconds=30),
+        steel_man=dict(model="pro", temperature=0.7, thinking_budget=1024, max_output_tokens=4096, timeout_seconds=60),
+        expanded_topics=dict(
+            model="flash", temperature=0.7, thinking_budget=512, max_output_tokens=2048, timeout_seconds=30, optional=True
+        ),
+        socrates_chat=dict(model="flash", temperature=0.8, thinking_budget=512, max_output_tokens=1024),
+        socrates_prefetch=dict(
+            model="flash", temperature=0.8, thinking_budget=512, max_output_tokens=1024, timeout_seconds=30, optional=True
+        ),
+    ),
+    # Sub-10-second answers: Flash without thinking everywhere, optional work skipped.
+    "fast": _profiles(
+        analyzer=dict(model="flash", temperature=0.5, thinking_budget=0, max_output_tokens=2048, timeout_seconds=8),
+        bias_analyzer=dict(model="flash", temperature=0.5, thinking_budget=0, max_output_tokens=2048, timeout_seconds=8),
+        analyzer_chunk=dict(model="flash", temperature=0.3, thinking_budget=0, max_output_tokens=2048, timeout_seconds=8),
+        analyzer_reduce=dict(model="flash", temperature=0.5, thinking_budget=0, max_output_tokens=2048, timeout_seconds=8),
+        image_ocr=dict(model="flash", temperature=0.2, thinking_budget=0, max_output_tokens=2048, timeout_seconds=8),
+        source_verifier=dict(model="flash", temperature=0.3, thinking_budget=0, max_output_tokens=2048, timeout_seconds=8),
+        perspective_explorer=dict(model="flash", temperature=0.7, thinking_budget=0, max_output_tokens=3072, timeout_seconds=8),
+        spectrum_image=dict(enabled=False),
+        socrates_init=dict(model="flash", temperature=0.7, thinking_budget=0, max_output_tokens=1024, timeout_seconds=8),
+        steel_man=dict(model="flash", temperature=0.7, thinking_budget=0, max_output_tokens=2048, timeout_seconds=8),
+        expanded_topics=dict(enabled=False),
+        socrates_chat=dict(model="flash", temperature=0.8, thinking_budget=0, max_output_tokens=1024),
+        socrates_prefetch=dict(
+            model="flash", temperature=0.8, thinking_budget=0, max_output_tokens=1024, timeout_seconds=8, optional=True
+        ),
+    ),
+}
+
+
+class ModelPrice(BaseModel):
+    """List price of a model in USD per million tokens."""
+
+    input_per_million: float
+    output_per_million: float  # also charged for thinking tokens
+    cached_input_per_million: Optional[float] = None  # None = input price
+
+
+# Keyed by profile alias ("pro", "flash", "image") or full model name.
+DEFAULT_MODEL_PRICES: dict[str, ModelPrice] = {
+    "pro": ModelPrice(input_per_million=2.0, output_per_million=12.0),
+    "flash": ModelPrice(input_per_million=0.5, output_per_million=3.0),
+    "image": ModelPrice(input_per_million=0.5, output_per_million=30.0),
+}
+
 
 class Settings(BaseSettings):
     app_name: str = "Flipside API"
@@ -21,11 +112,138 @@ class Settings(BaseSettings):
     # Image generation model (for perspective visualization)
     gemini_model_image: str = "gemini-3.1-flash-image-preview"
 
+    # Model backend: "live" | "fake" (offline cassette replay) | "record"
+    gemini_backend: str = "live"
+    gemini_cassette_path: str = ""  # JSONL cassette for "fake" / "record"
+    gemini_fake_latency: str = "fixed:0"  # e.g. "pro=lognormal:2.0,0.4;flash=uniform:0.5,2;default=fixed:0.2"
+    gemini_fake_error_rate: float = 0.0
+    gemini_fake_timeout_rate: float = 0.0
+    gemini_fake_seed: int = 0
+    gemini_fake_strict: bool = False  # fail on cassette misses instead of synthesizing
+    gemini_fake_keyword_overlap: float = 0.5  # share of synthetic analyzer keywords taken from the content
+
+    # Embedding model (used when similarity_embedding_backend="gemini")
+    gemini_model_embedding: str = "gemini-embedding-001"
+
+    # Near-duplicate reuse of source/perspective/aggregate results
+    similarity_reuse_enabled: bool = True
+    similarity_embedding_backend: str = "hashing"  # "hashing" | "gemini"
+    similarity_embedding_dim: int = 512
+    similarity_threshold: float = 0.85
+    similarity_index_max_entries: int = 5000
+
+    # Perspective result cache (keyed by normalized topic + keywords)
+    perspective_cache_enabled: bool = True
+    # TTL decays with how fresh the story is: age of the newest cited source
+    # times the ratio, between the min and max (max when no date is known).
+    perspective_cache_ttl_seconds: float = 6 * 60 * 60
+    perspective_cache_min_ttl_seconds: float = 30 * 60
+    perspective_cache_ttl_age_ratio: float = 0.5
+    perspective_cache_max_entries: int = 1000
+
+    # Speculative perspective search from locally extracted keywords at START
+    perspective_speculation_enabled: bool = True
+    perspective_speculation_min_overlap: float = 0.4  # share of analyzer keywords matched
+
+    # URL pre-fetching (readable article text passed inline to the analyzer)
+    url_prefetch_enabled: bool = True
+    url_fetch_timeout_seconds: float = 15.0
+    url_fetch_max_bytes: int = 5_000_000  # body cap; longer pages are truncated
+    url_fetch_max_redirects: int = 5
+    url_cache_dir: str = ".cache/url"
+    url_cache_fresh_seconds: float = 15 * 60
+    url_prefetch_min_chars: int = 200
+    url_prefetch_max_chars: int = 60_000
+
+    # Image ingestion (downscaled inline Part + perceptual-hash cache)
+    image_max_dimension: int = 1536
+    image_jpeg_quality: int = 85
+    image_ocr_prepass: bool = False
+    image_analysis_cache_ttl_seconds: float = 24 * 60 * 60
+    image_analysis_cache_max_entries: int = 500
+
+    # Request size limits (per content type) and blob storage
+    max_request_body_bytes: int = 16 * 1024 * 1024
+    max_url_chars: int = 2048
+    max_text_chars: int = 200_000
+    max_image_bytes: int = 10 * 1024 * 1024
+    blob_store_dir: str = ""  # defaults to <tmpdir>/flipside-blobs
+    blob_inline_max_chars: int = 16_000  # larger texts are kept as blobs
+    blob_ttl_seconds: float = 24 * 60 * 60  # swept when not written for this long
+    blob_sweep_interval_seconds: float = 60 * 60
+
+    # Map-reduce analysis for long articles and transcripts
+    analyzer_chunked_threshold_chars: int = 24_000
+    analyzer_chunk_chars: int = 8_000
+    analyzer_chunk_overlap_chars: int = 600
+    analyzer_max_parallel_chunks: int = 8
+
+    # Long-polling of /api/result (?wait=seconds, capped)
+    result_long_poll_max_seconds: float = 30.0
+
+    # /api/stream: SSE comment heartbeat while no event is sent (0 = off), and
+    # cancellation of runs nobody follows: no open stream or long poll and no
+    # /api/result read for this many seconds (None = never cancel).
+    sse_heartbeat_seconds: float = 15.0
+    abandoned_run_cancel_seconds: Optional[float] = 120.0
+
+    # Generation profiles per analysis mode and node (see DEFAULT_GENERATION_PROFILES)
+    analysis_default_mode: AnalysisMode = "deep"
+    generation_profiles: dict[str, dict[str, GenerationProfile]] = DEFAULT_GENERATION_PROFILES
+
+    # Graph checkpointing: "none" | "memory" | "sqlite" (thread id = session id)
+    graph_checkpointer: str = "memory"
+    graph_checkpoint_path: str = ".cache/checkpoints.sqlite"
+    graph_checkpoint_max_retained: int = 200  # failed/cancelled runs kept resumable; completed runs keep none
+
+    # Admission control: concurrent graph runs per worker and a fair wait queue
+    admission_max_active_runs: int = 32
+    admission_max_queued: int = 256
+    admission_client_weights: dict[str, float] = {}  # client id -> weight (default 1.0)
+    # Peer addresses/CIDRs (e.g. the web server, a load balancer) whose X-Client-Id
+    # and X-Forwarded-For are believed; anyone else is identified by the peer address.
+    # The web server forwards only the browser address its own proxies recorded
+    # (TRUSTED_PROXY_HOPS in apps/web)
+    trusted_proxies: list[str] = []
+    admission_expected_run_seconds: float = 30.0  # initial run time estimate for Retry-After
+
+    # Usage accounting (see app.services.usage) and budgets in USD (None = unlimited)
+    model_prices: dict[str, ModelPrice] = DEFAULT_MODEL_PRICES
+    grounding_price_per_call: float = 0.035
+    session_budget_usd: Optional[float] = None
+    # Tenant budgets are best-effort limits, not quotas: spend is tracked in memory
+    # per worker and lost on restart (see app.services.usage)
+    tenant_monthly_budgets_usd: dict[str, float] = {}  # client id -> monthly budget
+    tenant_default_monthly_budget_usd: Optional[float] = None
+    budget_degrade_ratio: float = 0.8  # from here on: Pro -> Flash, optional calls skipped
+    usage_chars_per_token: float = 2.0  # preflight estimate (Korean text runs ~2 chars/token)
+    usage_tokens_per_image: int = 1032
+    usage_default_output_tokens: int = 2048  # estimate when a profile has no max_output_tokens
+
+    # Socrates chat: prepare the next turn while the user reads the last reply
+    socrates_prefetch_enabled: bool = True
+    socrates_prefetch_wait_seconds: float = 1.0  # max wait for an unfinished prefetch before the full call starts
+
+    # Live agent progress (see app.agents.progress)
+    progress_tick_seconds: float = 2.0  # progress updates while a long call (image generation) runs
+
+    # Startup (FastAPI lifespan): compile the graph and load the node modules
+    # before serving; optionally open the model API connection pool as well.
+    startup_warmup_enabled: bool = True
+    startup_warm_connections: bool = False
+    startup_warm_timeout_seconds: float = 5.0
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore",
     )
 
+    @model_validator(mode="after")
+    def _check_chunking(self) -> "Settings":
+        if not 0 <= self.analyzer_chunk_overlap_chars < self.analyzer_chunk_chars:
+            raise ValueError("analyzer_chunk_overlap_chars must be >= 0 and smaller than analyzer_chunk_chars")
+        return self
+
 
 settings = Settings()
@@ -0,0 +1,567 @@
+"""Offline Gemini backend: cassette replay, latency models and fault injection.
+
+Drop-in replacement for the subset of `genai.Client` the app uses
+(`client.aio.models.generate_content` / `embed_content`), selected with
+settings.gemini_backend or installed directly via
+app.core.gemini.set_gemini_client.
+
+- "fake": responses are replayed from a JSONL cassette keyed by prompt
+  fingerprint. Misses are answered with deterministic synthetic responses
+  shaped like each agent's expected JSON (or raise in strict mode).
+- "record": calls go to the live API and every response is appended to
+  the cassette for later replay.
+
+Every call is logged in `client.calls` with its node, model and timing so
+benchmarks can separate model time from orchestration overhead.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from google import genai
+from google.genai import types
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FakeModelError(RuntimeError):
+    """Injected model failure."""
+
+
+class CassetteMissError(LookupError):
+    """Raised in strict mode when no recorded response matches a prompt."""
+
+
+# ====================
+# Prompt fingerprints
+# ====================
+
+def _content_parts(contents) -> list[str]:
+    items = contents if isinstance(contents, list) else [contents]
+    parts = []
+    for item in items:
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        text = getattr(item, "text", None)
+        inline_data = getattr(item, "inline_data", None)
+        file_data = getattr(item, "file_data", None)
+        if text:
+            parts.append(text)
+        elif inline_data is not None and inline_data.data:
+            parts.append("inline:" + hashlib.sha256(inline_data.data).hexdigest())
+        elif file_data is not None:
+            parts.append("file:" + (file_data.file_uri or ""))
+        else:
+            parts.append(repr(item))
+    return parts
+
+
+def prompt_fingerprint(contents) -> str:
+    """Stable hash of request contents (text, inline data digests, file URIs)."""
+    payload = json.dumps(_content_parts(contents), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ====================
+# Latency models
+# ====================
+
+@dataclass
+class _Distribution:
+    kind: str
+    params: tuple[float, ...]
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        if self.kind == "lognormal":
+            # Parameters are the median latency in seconds and the log-space sigma.
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+
+class LatencyModel:
+    """Per-model-family latency distributions.
+
+    Spec format: "fixed:0.2" for every call, or a ";"-separated list of
+    family=distribution pairs, e.g.
+    "pro=lognormal:2.0,0.4;flash=uniform:0.5,2;image=fixed:3;default=fixed:0.2".
+    Supported distributions: fixed:s, uniform:a,b, normal:mean,std and
+    lognormal:median,sigma.
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        self.spec = spec
+        self._by_family: dict[str, _Distribution] = {}
+        for item in filter(None, (p.strip() for p in spec.split(";"))):
+            family, _, dist = item.rpartition("=")
+            kind, _, raw = dist.partition(":")
+            params = tuple(float(x) for x in raw.split(",") if x)
+            self._by_family[family or "default"] = _Distribution(kind.strip(), params)
+        self._by_family.setdefault("default", _Distribution("fixed", (0.0,)))
+
+    @staticmethod
+    def family(model: str) -> str:
+        name = (model or "").lower()
+        for family in ("image", "embedding", "pro", "flash"):
+            if family in name:
+                return family
+        return "default"
+
+    def sample(self, model: str, rng: random.Random) -> float:
+        dist = self._by_family.get(self.family(model), self._by_family["default"])
+        return dist.sample(rng)
+
+
+# ====================
+# Cassettes
+# ====================
+
+class Cassette:
+    """JSONL file of recorded responses keyed by prompt fingerprint.
+
+    A fingerprint recorded several times is replayed round-robin.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = Path(path) if path else None
+        self._entries: dict[str, list[str]] = {}
+        self._cursor: dict[str, int] = {}
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def load(self):
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._entries.setdefault(entry["fingerprint"], []).append(json.dumps(entry["response"]))
+
+    def lookup(self, fingerprint: str) -> Optional[types.GenerateContentResponse]:
+        recorded = self._entries.get(fingerprint)
+        if not recorded:
+            return None
+        index = self._cursor.get(fingerprint, 0)
+        self._cursor[fingerprint] = index + 1
+        return types.GenerateContentResponse.model_validate_json(recorded[index % len(recorded)])
+
+    def append(self, fingerprint: str, model: str, response: types.GenerateContentResponse):
+        data = response.model_dump(mode="json", exclude_none=True)
+        self._entries.setdefault(fingerprint, []).append(json.dumps(data))
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps({"fingerprint": fingerprint, "model": model, "response": data}, ensure_ascii=False) + "\n")
+
+
+# ====================
+# Synthetic responses
+# ====================
+
+# 1x1 transparent PNG used for synthetic image generations.
+_PNG_1X1 = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+# (marker substring, kind); checked in order, so more specific markers come first.
+_PROMPT_KINDS = (
+    ("Create a clean Korean infographic", "image"),
+    ("구간별 분석 결과", "analyzer_reduce"),
+    ("긴 콘텐츠의 일부 구간", "analyzer_chunk"),
+    ("핵심 주장을 빠르게 추출", "analyzer_claims"),
+    ("편향 분석 에이전트", "analyzer_bias"),
+    ("이미지/스크린샷을 분석하고", "content_parser"),
+    ("소스 검증 에이전트", "source"),
+    ("관점 탐색자(Perspective Explorer)", "perspective"),
+    ("질문 4개를 생성하세요", "socrates_questions"),
+    ("사용자가 답하기 전에", "socrates_prefetch"),
+    ("준비된 후보를 바탕으로", "socrates_followup"),
+    ("소크라테스식 방법", "socrates_chat"),
+    ("Steel Man 분석가", "steel_man"),
+    ("사고 확장 에이전트", "expanded_topics"),
+)
+
+
+def classify_prompt(contents) -> str:
+    text = "\n".join(_content_parts(contents))
+    for marker, kind in _PROMPT_KINDS:
+        if marker in text:
+            return kind
+    return "unknown"
+
+
+@lru_cache(maxsize=8)
+def _template_tokens(template: str) -> frozenset[str]:
+    from app.agents.utils import keyword_tokens
+
+    return frozenset(keyword_tokens(template))
+
+
+def _content_keywords(contents, limit: int = 4) -> list[str]:
+    """Keywords of the analyzed content: prompt keywords that aren't template vocabulary."""
+    from app.agents.prompts import ANALYZER_CLAIMS_PROMPT
+    from app.agents.utils import extract_keywords
+
+    template_tokens = _template_tokens(ANALYZER_CLAIMS_PROMPT)
+    text = " ".join(_content_parts(contents))
+    keywords = extract_keywords(text, limit=limit + len(template_tokens))
+    return [k for k in keywords if k not in template_tokens][:limit]
+
+
+def _analyzer_keywords(contents, tag: str, overlap: float, limit: int = 4) -> list[str]:
+    """Keywords a synthetic analyzer reports: `overlap` of them taken from the
+    content, the rest synthetic (a real analyzer rephrases part of them)."""
+    from_content = _content_keywords(contents, limit=round(limit * overlap)) if overlap > 0 else []
+    return from_content + [f"합성{tag}{i}" for i in range(limit - len(from_content))]
+
+
+def _synthetic_payload(kind: str, tag: str, keywords: Optional[list[str]] = None):
+    claims = [
+        {"id": i, "text": f"합성 주장 {i} ({tag})", "evidence": "합성 근거", "sources": [f"https://example.com/{tag}/{i}"]}
+        for i in range(1, 4)
+    ]
+    instincts = [{"instinct_type": "부정 본능", "confidence": 0.35, "reasoning": "합성", "example": "합성 사례"}]
+    biases = [{"bias_type": "프레이밍", "confidence": 0.45, "reasoning": "합성", "example": "합성 사례"}]
+    instructions = {
+        "source_verifier": {"sources": [c["sources"][0] for c in claims], "check_for": [c["text"] for c in claims]},
+        # Partly echo the content's own keywords, as a real analyzer would.
+        "perspective_explorer": {
+            "topic": " ".join(keywords[:2]) if keywords else f"합성 주제 {tag}",
+            "keywords": keywords or ["합성", tag],
+        },
+    }
+
+    if kind == "analyzer_reduce":
+        return {
+            "claims": claims,
+            "logic_structure": "합성 논리 구조",
+            "user_instincts": instincts,
+            "information_biases": biases,
+            "agent_instructions": instructions,
+        }
+    if kind == "analyzer_claims":
+        return {"claims": claims, "agent_instructions": instructions}
+    if kind == "analyzer_bias":
+        return {
+            "logic_structure": "합성 논리 구조",
+            "user_instincts": instincts,
+            "information_biases": biases,
+        }
+    if kind == "analyzer_chunk":
+        return {
+            "claims": claims[:2],
+            "user_instincts": instincts,
+            "information_biases": biases,
+            "cited_sources": instructions["source_verifier"]["sources"],
+            "keywords": ["합성", tag],
+        }
+    if kind == "source":
+        return {
+            "sources": [
+                {
+                    "original_claim": c["text"],
+                    "original_source": {
+                        "url": c["sources"][0], "title": "합성 출처", "publisher": "Example",
+                        "date": "2026-01-01", "relevant_quote": "합성 인용",
+                    },
+                    "verification": {
+                        "status": "verified", "explanation": "합성 검증",
+                        "comparison": {"claimed": c["text"], "actual": c["text"]},
+                    },
+                    "trust_score": 80,
+                }
+                for c in claims
+            ],
+            "overall_trust_score": 80,
+            "summary": "합성 소스 검증 요약",
+        }
+    if kind == "perspective":
+        return {
+            "perspectives": [
+                {
+                    "id": i,
+                    "source": {"url": f"https://example.com/p/{i}", "title": f"관점 {i}", "publisher": f"매체 {i}"},
+                    "main_claim": f"합성 관점 {i}",
+                    "frame": "경제",
+                    "key_points": ["요점"],
+                    "spectrum": {"political": (i - 2) / 2, "emotional": 0, "complexity": 0},
+                }
+                for i in range(1, 4)
+            ],
+            "common_facts": ["공통 사실"],
+            "divergence_points": [{"topic": "쟁점", "positions": {"left": "A", "right": "B"}}],
+            "summary": "합성 관점 요약",
+        }
+    if kind == "socrates_questions":
+        return {"questions": [{"step": i, "question": f"합성 질문 {i}", "context": "합성"} for i in range(1, 5)]}
+    if kind == "steel_man":
+        return {
+            "opposingArgument": "합성 반대 논거",
+            "strengthenedArgument": "합성 대응",
+            "refutationPoints": [{"point": "포인트", "counterArgument": "반박", "importance": "critical"}],
+        }
+    if kind == "expanded_topics":
+        return {
+            "alternativeFraming": "합성 대안 프레이밍",
+            "expandedTopics": [{"topic": "확장 주제", "description": "설명", "relevance": "high"}],
+            "relatedContent": [{"title": "관련 기사", "url": "https://example.com/r", "source": "Example", "type": "article"}],
+        }
+    if kind == "content_parser":
+        return "합성 이미지 텍스트: 헤드라인과 본문"
+    if kind == "socrates_prefetch":
+        return {
+            "candidates": [
+                {"stance": stance, "response": f"합성 후속 응답 ({stance}), 어떻게 생각하세요?"}
+                for stance in ("agree", "doubt", "unsure")
+            ]
+        }
+    if kind == "socrates_followup":
+        return "그렇게 보셨군요. 어떤 부분이 그런 생각을 하게 했나요?"
+    if kind == "socrates_chat":
+        return "궁금한데요, 어떤 부분이 가장 의심스러우셨어요?"
+    return {}
+
+
+def synthesize_response(contents, fingerprint: str, keyword_overlap: float = 0.5) -> types.GenerateContentResponse:
+    """Deterministic response shaped like the JSON the calling agent expects.
+
+    keyword_overlap is the share of the analyzer's perspective keywords taken
+    from the content (the rest are synthetic).
+    """
+    kind = classify_prompt(contents)
+    prompt_chars = sum(len(p) for p in _content_parts(contents))
+
+    if kind == "image":
+        parts = [
+            types.Part(text="합성 스펙트럼 이미지"),
+            types.Part(inline_data=types.Blob(mime_type="image/png", data=_PNG_1X1)),
+        ]
+        output_chars = 20
+    else:
+        keywords = None
+        if kind == "analyzer_claims":
+            keywords = _analyzer_keywords(contents, fingerprint[:8], keyword_overlap)
+        payload = _synthetic_payload(kind, fingerprint[:8], keywords)
+        text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        parts = [types.Part(text=text)]
+        output_chars = len(text)
+
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=parts))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_chars // 4,
+            candidates_token_count=output_chars // 4,
+            total_token_count=(prompt_chars + output_chars) // 4,
+        ),
+    )
+
+
+# ====================
+# Clients
+# ====================
+
+def _current_node() -> str:
+    """Name of the LangGraph node making the call ("" outside a graph run)."""
+    try:
+        from langgraph.config import get_config
+
+        return get_config().get("metadata", {}).get("langgraph_node", "")
+    except Exception:
+        return ""
+
+
+@dataclass
+class ModelCall:
+    """One logged model call."""
+
+    model: str
+    kind: str
+    node: str
+    fingerprint: str
+    started_at: float
+    ended_at: float = 0.0
+    source: str = ""  # "cassette" | "synthetic" | "live"
+    fault: str = ""  # "" | "error" | "timeout"
+
+    @property
+    def duration(self) -> float:
+        return self.ended_at - self.started_at
+
+
+@dataclass
+class FaultInjector:
+    """Randomly fails or hangs calls at the configured rates."""
+
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    hang_seconds: float = 300.0
+
+    def pick(self, rng: random.Random) -> str:
+        roll = rng.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.timeout_rate:
+            return "timeout"
+        return ""
+
+
+class _FakeModels:
+    def __init__(self, owner: "FakeGeminiClient"):
+        self._owner = owner
+
+    async def generate_content(self, *, model: str, contents, config=None) -> types.GenerateContentResponse:
+        owner = self._owner
+        fingerprint = prompt_fingerprint(contents)
+        call = ModelCall(
+            model=model,
+            kind=classify_prompt(contents),
+            node=_current_node(),
+            fingerprint=fingerprint,
+            started_at=time.perf_counter(),
+        )
+        owner.calls.append(call)
+        try:
+            call.fault = owner.faults.pick(owner.rng)
+            if call.fault == "timeout":
+                await asyncio.sleep(owner.faults.hang_seconds)
+            await asyncio.sleep(owner.latency.sample(model, owner.rng))
+            if call.fault == "error":
+                raise FakeModelError(f"Injected failure for {model}")
+
+            response = owner.cassette.lookup(fingerprint)
+            if response is not None:
+                call.source = "cassette"
+                return response
+            if owner.strict:
+                raise CassetteMissError(f"No recorded response for prompt {fingerprint[:12]} ({call.kind})")
+            call.source = "synthetic"
+            return synthesize_response(contents, fingerprint, owner.keyword_overlap)
+        finally:
+            call.ended_at = time.perf_counter()
+
+    async def embed_content(self, *, model: str, contents, config=None) -> types.EmbedContentResponse:
+        from app.services.similarity import HashingEmbedder
+
+        dim = getattr(config, "output_dimensionality", None) or settings.similarity_embedding_dim
+        texts = contents if isinstance(contents, list) else [contents]
+        vectors = await HashingEmbedder(dim=dim).embed([str(t) for t in texts])
+        return types.EmbedContentResponse(
+            embeddings=[types.ContentEmbedding(values=v.tolist()) for v in vectors]
+        )
+
+
+class FakeGeminiClient:
+    """Offline stand-in for genai.Client."""
+
+    def __init__(
+        self,
+        *,
+        cassette: Cassette | None = None,
+        latency: LatencyModel | None = None,
+        faults: FaultInjector | None = None,
+        seed: int = 0,
+        strict: bool = False,
+        keyword_overlap: float = 0.5,
+    ):
+        self.cassette = cassette or Cassette()
+        self.latency = latency or LatencyModel()
+        self.faults = faults or FaultInjector()
+        self.rng = random.Random(seed)
+        self.strict = strict
+        self.keyword_overlap = keyword_overlap
+        self.calls: list[ModelCall] = []
+        self.aio = type("Aio", (), {})()
+        self.aio.models = _FakeModels(self)
+
+
+class _RecordingModels:
+    def __init__(self, owner: "RecordingGeminiClient"):
+        self._owner = owner
+
+    async def generate_content(self, *, model: str, contents, config=None) -> types.GenerateContentResponse:
+        owner = self._owner
+        fingerprint = prompt_fingerprint(contents)
+        call = ModelCall(
+            model=model,
+            kind=classify_prompt(contents),
+            node=_current_node(),
+            fingerprint=fingerprint,
+            started_at=time.perf_counter(),
+            source="live",
+        )
+        owner.calls.append(call)
+        try:
+            response = await owner.live.aio.models.generate_content(model=model, contents=contents, config=config)
+        finally:
+            call.ended_at = time.perf_counter()
+        owner.cassette.append(fingerprint, model, response)
+        return response
+
+    async def embed_content(self, **kwargs):
+        return await self._owner.live.aio.models.embed_content(**kwargs)
+
+
+class RecordingGeminiClient:
+    """Live client that appends every response to a cassette."""
+
+    def __init__(self, live: genai.Client, cassette: Cassette):
+        self.live = live
+        self.cassette = cassette
+        self.calls: list[ModelCall] = []
+        self.aio = type("Aio", (), {})()
+        self.aio.models = _RecordingModels(self)
+
+
+_configured_client = None
+
+
+def get_configured_client():
+    """Client for settings.gemini_backend ("fake" or "record"), created once."""
+    global _configured_client
+    if _configured_client is not None:
+        return _configured_client
+
+    cassette = Cassette(settings.gemini_cassette_path or None)
+    if settings.gemini_backend == "record":
+        if not settings.gemini_cassette_path:
+            raise ValueError("gemini_cassette_path is required for the record backend")
+        _configured_client = RecordingGeminiClient(genai.Client(api_key=settings.gemini_api_key), cassette)
+    elif settings.gemini_backend == "fake":
+        _configured_client = FakeGeminiClient(
+            cassette=cassette,
+            latency=LatencyModel(settings.gemini_fake_latency),
+            faults=FaultInjector(
+                error_rate=settings.gemini_fake_error_rate,
+                timeout_rate=settings.gemini_fake_timeout_rate,
+            ),
+            seed=settings.gemini_fake_seed,
+            strict=settings.gemini_fake_strict,
+            keyword_overlap=settings.gemini_fake_keyword_overlap,
+        )
+    else:
+        raise ValueError(f"Unknown gemini_backend: {settings.gemini_backend}")
+    logger.info(f"[Gemini] Using {settings.gemini_backend} backend ({len(cassette)} recorded responses)")
+    return _configured_client
@@ -1,17 +1,157 @@
 """Gemini API client factory and utilities."""
 
+import asyncio
 import base64
 import json
 
 from google import genai
 from google.genai import types
 
-from app.core.config import settings
+from app.core.config import GenerationProfile, settings
+from app.services.usage import BudgetExceededError, optional_call_allowed, plan_call, record_call, release_call
+
+
+# Client installed by tests/benchmarks (see app.core.fake_gemini).
+_client_override = None
+
+# Shared live client: one connection pool for every node and request.
+_live_client: genai.Client | None = None
+
+
+def set_gemini_client(client) -> None:
+    """Install a client returned by get_gemini_client (None restores the default)."""
+    global _client_override
+    _client_override = client
 
 
 def get_gemini_client() -> genai.Client:
-    """Create and return a Gemini API client."""
-    return genai.Client(api_key=settings.gemini_api_key)
+    """Return the shared Gemini API client (created on first use).
+
+    settings.gemini_backend selects the implementation: "live" talks to the
+    API, "fake" replays recorded cassettes offline and "record" talks to the
+    API while recording cassettes (see app.core.fake_gemini).
+    """
+    if _client_override is not None:
+        return _client_override
+    if settings.gemini_backend != "live":
+        from app.core.fake_gemini import get_configured_client
+
+        return get_configured_client()
+    global _live_client
+    if _live_client is None:
+        _live_client = genai.Client(api_key=settings.gemini_api_key)
+    return _live_client
+
+
+async def warm_gemini_connections(timeout: float) -> bool:
+    """Open the live client's connection (DNS, TLS) with a cheap metadata call.
+
+    Returns False when the backend is not live or the call fails; the first
+    generation call then simply opens the connection itself.
+    """
+    if _client_override is not None or settings.gemini_backend != "live":
+        return False
+    try:
+        await asyncio.wait_for(
+            get_gemini_client().aio.models.get(model=settings.gemini_model_flash),
+            timeout=timeout,
+        )
+        return True
+    except Exception:
+        return False
+
+
+async def close_gemini_client():
+    """Close the shared live client (call on application shutdown)."""
+    global _live_client
+    if _live_client is not None:
+        await _live_client.aio.aclose()
+        _live_client.close()
+        _live_client = None
+
+
+def get_generation_profile(node: str, mode: str | None = None) -> GenerationProfile:
+    """Profile for a node in an analysis mode, falling back to the "deep" profile."""
+    profiles = settings.generation_profiles
+    profile = profiles.get(mode or settings.analysis_default_mode, {}).get(node)
+    if profile is None:
+        profile = profiles.get("deep", {}).get(node)
+    if profile is None:
+        raise KeyError(f"No generation profile for node: {node}")
+    return profile
+
+
+def resolve_model(name: str) -> str:
+    """Map a profile model alias ("pro", "flash", "image") to the configured model name."""
+    aliases = {
+        "pro": settings.gemini_model_pro,
+        "flash": settings.gemini_model_flash,
+        "image": settings.gemini_model_image,
+    }
+    return aliases.get(name, name)
+
+
+async def generate_for_node(
+    client: genai.Client,
+    node: str,
+    contents,
+    *,
+    mode: str | None = None,
+    model: str | None = None,
+    **config_kwargs,
+) -> types.GenerateContentResponse:
+    """Run one model call with the node's generation profile for the analysis mode.
+
+    The profile supplies the model, temperature, thinking budget, output token
+    limit and timeout (asyncio.TimeoutError when exceeded); config_kwargs add
+    call-specific options such as tools or response_mime_type.
+
+    Usage is recorded for the session bound with app.services.usage.bind_session.
+    Near the session's or tenant's budget, Pro calls run on Flash and optional
+    calls raise BudgetExceededError.
+
+    Args:
+        client: Client returned by get_gemini_client.
+        node: Profile name, e.g. "bias_analyzer" or "steel_man".
+        contents: Prompt string or list of Parts.
+        mode: Analysis mode ("fast" | "balanced" | "deep"); defaults to
+            settings.analysis_default_mode.
+        model: Optional model name override (e.g. a timeout fallback).
+    """
+    profile = get_generation_profile(node, mode)
+    plan = plan_call(node, profile, model or resolve_model(profile.model), contents)
+    config = types.GenerateContentConfig(
+        temperature=profile.temperature,
+        max_output_tokens=profile.max_output_tokens,
+        **config_kwargs,
+    )
+    if profile.thinking_budget is not None:
+        config.thinking_config = types.ThinkingConfig(thinking_budget=profile.thinking_budget)
+
+    call = client.aio.models.generate_content(
+        model=plan.model,
+        contents=contents,
+        config=config,
+    )
+    try:
+        if profile.timeout_seconds:
+            response = await asyncio.wait_for(call, timeout=profile.timeout_seconds)
+        else:
+            response = await call
+    except BaseException:
+        release_call(plan)
+        raise
+    record_call(plan, response)
+    return response
+
+
+def node_enabled(node: str, mode: str | None = None) -> bool:
+    """Whether a node's work should run: its profile is enabled and, for optional
+    work, the session or tenant is not near its budget."""
+    profile = get_generation_profile(node, mode)
+    if not profile.enabled:
+        return False
+    return not profile.optional or optional_call_allowed(node)
 
 
 async def generate_content(
@@ -117,6 +257,7 @@ async def generate_perspective_spectrum_image(
     perspectives: list[dict],
     *,
     model: str | None = None,
+    mode: str | None = None,
 ) -> dict | None:
     """Generate a linear-spectrum infographic image for perspective positions.
 
@@ -124,7 +265,7 @@ async def generate_perspective_spectrum_image(
         A dictionary with image metadata and base64 payload, or None on failure.
         Example: {"mime_type": "image/png", "base64_data": "...", "caption": "..."}
     """
-    if not perspectives:
+    if not perspectives or not node_enabled("spectrum_image", mode):
         return None
 
     client = get_gemini_client()
@@ -148,13 +289,17 @@ async def generate_perspective_spectrum_image(
         f"Data: {json.dumps(compact_points, ensure_ascii=False)}"
     )
 
-    response = await client.aio.models.generate_content(
-        model=model or settings.gemini_model_image,
-        contents=prompt,
-        config=types.GenerateContentConfig(
+    try:
+        response = await generate_for_node(
+            client,
+            "spectrum_image",
+            prompt,
+            mode=mode,
+            model=model,
             response_modalities=["TEXT", "IMAGE"],
-        ),
-    )
+        )
+    except BudgetExceededError:
+        return None
 
     caption = response.text or ""
     if not response.candidates:
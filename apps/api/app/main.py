@@ -1,12 +1,64 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.api.routes import api_router
 
+logger = logging.getLogger(__name__)
+
+
+async def warm_up():
+    """Load the analysis stack before the first request needs it.
+
+    Routes import the graph, model SDK, Pillow and numpy lazily so the app
+    module itself imports quickly; this compiles the graph (importing every
+    node), opens the shared model client and loads the services requests use.
+    """
+    started_at = time.perf_counter()
+    from app.agents.graph import get_flipside_graph
+    from app.core.gemini import get_gemini_client, warm_gemini_connections
+    import app.services.images  # noqa: F401
+    import app.services.similarity  # noqa: F401
+    from app.services.url_fetcher import get_http_client
+
+    get_flipside_graph()
+    get_gemini_client()
+    get_http_client()
+    logger.info(f"[Startup] Graph compiled and clients opened in {time.perf_counter() - started_at:.3f}s")
+
+    if settings.startup_warm_connections:
+        warmed = await warm_gemini_connections(settings.startup_warm_timeout_seconds)
+        logger.info(f"[Startup] Model API connection warm-up {'done' if warmed else 'skipped'}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.services.blob_store import run_blob_sweeper
+
+    if settings.startup_warmup_enabled:
+        await warm_up()
+    sweeper = asyncio.create_task(run_blob_sweeper())
+    yield
+    sweeper.cancel()
+    from app.agents.graph import close_flipside_graph
+    from app.core.gemini import close_gemini_client
+    from app.services.url_fetcher import close_http_client
+
+    await close_gemini_client()
+    await close_http_client()
+    await close_flipside_graph()
+
+
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -18,5 +70,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class RequestBodyLimitMiddleware:
+    """Reject request bodies over settings.max_request_body_bytes.
+
+    A declared Content-Length is checked before anything is read; bodies
+    without one (chunked transfer encoding) are counted while the app reads
+    them and fail with 413 once they pass the limit.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = settings.max_request_body_bytes
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(status_code=413, content={"detail": "Request body too large"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Route handlers turn this into a 413 response.
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+# Reject oversized bodies before they are read into memory.
+app.add_middleware(RequestBodyLimitMiddleware)
+
+
 # Include all API routes
 app.include_router(api_router)
@@ -1,9 +1,11 @@
 """Analysis request and response schemas."""
 
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
+from app.core.config import AnalysisMode
+
 
 class AnalyzeRequest(BaseModel):
     """Request to start content analysis."""
@@ -12,6 +14,11 @@ class AnalyzeRequest(BaseModel):
         ..., description="Type of content being analyzed"
     )
     content: str = Field(..., description="The content to analyze (URL, text, or base64 image)")
+    mode: Optional[AnalysisMode] = Field(
+        None,
+        description="Analysis depth: fast (sub-10s, optional work skipped), balanced, or deep "
+        "(defaults to the server's analysis_default_mode)",
+    )
 
 
 class AnalyzeResponse(BaseModel):
@@ -110,7 +117,7 @@ class AnalysisResult(BaseModel):
     """Complete analysis result."""
 
     session_id: str = Field(..., description="Session identifier")
-    status: Literal["analyzing", "done", "error"] = Field(
+    status: Literal["analyzing", "done", "error", "cancelled"] = Field(
         ..., description="Analysis status"
     )
     claims: list[Claim] = Field(default_factory=list, description="Extracted claims")
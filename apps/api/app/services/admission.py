@@ -0,0 +1,198 @@
+"""Admission control for analysis graph runs.
+
+Every graph run fans out into several concurrent model calls, so a spike of
+sessions started together would otherwise all slow down and time out
+together. Runs are capped per worker (admission_max_active_runs); runs
+beyond the cap wait in a bounded queue and are admitted in weighted fair
+order across clients, so one client starting many analyses cannot starve
+the others. When the queue is full new work is shed with 503 + Retry-After.
+
+Fairness uses virtual finish tags (weighted fair queuing): a client's next
+ticket is tagged max(its previous tag, tag of the last admitted ticket) +
+1 / weight, and the smallest tag is admitted first.
+"""
+
+import asyncio
+import bisect
+import functools
+import ipaddress
+import itertools
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from fastapi import Request
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionQueueFull(RuntimeError):
+    """Raised when no run slot is free and the wait queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Analysis queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass(eq=False)
+class AdmissionTicket:
+    """One graph run's place in the queue, then its run slot."""
+
+    client_id: str
+    tag: float
+    seq: int
+    admitted: bool = False
+    released: bool = False
+    admitted_at: float = field(default=0.0, repr=False)
+
+    @property
+    def order(self) -> tuple[float, int]:
+        return (self.tag, self.seq)
+
+
+@functools.lru_cache(maxsize=4)
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_networks(tuple(settings.trusted_proxies)))
+
+
+def client_id_of(request: Request) -> str:
+    """Fair-queuing identity.
+
+    Client headers are only believed from settings.trusted_proxies: behind
+    one, X-Client-Id, else the nearest forwarded address that is not itself
+    a trusted proxy. Anyone else is identified by the peer address.
+    """
+    peer = request.client.host if request.client else ""
+    if not _is_trusted_proxy(peer):
+        return peer or "anonymous"
+    client_id = request.headers.get("x-client-id")
+    if client_id:
+        return client_id
+    # Each proxy appends the address it received from, so only the right end
+    # of the list is trustworthy.
+    forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(forwarded):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return forwarded[0] if forwarded else peer
+
+
+class AdmissionController:
+    """Run slots per worker plus a weighted fair wait queue."""
+
+    def __init__(self):
+        self._active = 0
+        self._waiting: list[AdmissionTicket] = []  # sorted by (tag, seq)
+        self._client_tags: dict[str, float] = {}
+        self._clock = 0.0  # tag of the last admitted ticket
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+        self._avg_run_seconds = settings.admission_expected_run_seconds
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def _has_slot(self) -> bool:
+        return self._active < settings.admission_max_active_runs
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has likely drained by one more run."""
+        waves = (len(self._waiting) + 1) / max(1, settings.admission_max_active_runs)
+        return max(1, math.ceil(self._avg_run_seconds * waves))
+
+    def estimated_wait(self, position: int) -> int:
+        """Seconds until the ticket at this queue position is likely admitted."""
+        return math.ceil(self._avg_run_seconds * position / max(1, settings.admission_max_active_runs))
+
+    def check_capacity(self):
+        """Raise AdmissionQueueFull if a run enqueued now would be rejected."""
+        if not self._has_slot() and len(self._waiting) >= settings.admission_max_queued:
+            raise AdmissionQueueFull(self.retry_after())
+
+    def enqueue(self, client_id: str) -> AdmissionTicket:
+        """Take a run slot, or a place in the queue; raises AdmissionQueueFull."""
+        weight = max(settings.admission_client_weights.get(client_id, 1.0), 0.01)
+        tag = max(self._client_tags.get(client_id, 0.0), self._clock) + 1 / weight
+        ticket = AdmissionTicket(client_id=client_id, tag=tag, seq=next(self._seq))
+
+        if self._has_slot() and not self._waiting:
+            self._client_tags[client_id] = tag
+            self._admit(ticket)
+            return ticket
+        if len(self._waiting) >= settings.admission_max_queued:
+            raise AdmissionQueueFull(self.retry_after())
+
+        self._client_tags[client_id] = tag
+        bisect.insort(self._waiting, ticket, key=lambda t: t.order)
+        logger.info(
+            f"[Admission] Queued run for client {client_id} "
+            f"(position={self.position(ticket)}, active={self._active}, queued={len(self._waiting)})"
+        )
+        self._notify()
+        return ticket
+
+    def position(self, ticket: AdmissionTicket) -> int:
+        """1-based queue position (0 once admitted)."""
+        if ticket.admitted or ticket.released:
+            return 0
+        return bisect.bisect_left(self._waiting, ticket.order, key=lambda t: t.order) + 1
+
+    async def wait(self, ticket: AdmissionTicket, on_queued: Callable[[int], None]):
+        """Wait until the ticket is admitted, calling on_queued(position) whenever it changes."""
+        reported = None
+        while not ticket.admitted:
+            position = self.position(ticket)
+            if position != reported:
+                on_queued(position)
+                reported = position
+            changed = self._changed
+            await changed.wait()
+
+    def release(self, ticket: AdmissionTicket):
+        """Give back the run slot (or leave the queue) and admit the next tickets."""
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket.admitted:
+            self._active -= 1
+            run_seconds = time.monotonic() - ticket.admitted_at
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * run_seconds
+        else:
+            self._waiting.pop(bisect.bisect_left(self._waiting, ticket.order, key=lambda t: t.order))
+        while self._waiting and self._has_slot():
+            self._admit(self._waiting.pop(0))
+        self._notify()
+
+    def _admit(self, ticket: AdmissionTicket):
+        ticket.admitted = True
+        ticket.admitted_at = time.monotonic()
+        self._active += 1
+        self._clock = max(self._clock, ticket.tag)
+        # A client's tag only matters while it is ahead of the clock.
+        if self._client_tags.get(ticket.client_id, 0.0) <= self._clock:
+            self._client_tags.pop(ticket.client_id, None)
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+# Global admission controller (per worker process)
+admission = AdmissionController()
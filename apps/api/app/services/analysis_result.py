@@ -0,0 +1,301 @@
+"""Canonical analysis result and its frontend projection.
+
+AnalysisResult holds the accumulated graph output in the backend's
+snake_case shape. The frontend shape (source / perspective / bias panels and
+the Steel Man, camelCase keys) is projected from it per panel, only when one
+of the panel's fields changed, and serialized once per version: SSE panel
+updates, the analysis_complete event and /api/result all reuse the same
+JSON text.
+"""
+
+import functools
+import json
+from typing import Optional
+
+from pydantic import BaseModel, PrivateAttr
+
+
+@functools.lru_cache(maxsize=4096)
+def to_camel_case(snake_str: str) -> str:
+    parts = snake_str.split('_')
+    return parts[0] + ''.join(p.capitalize() for p in parts[1:])
+
+
+def convert_keys(obj):
+    if isinstance(obj, dict):
+        return {to_camel_case(k): convert_keys(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [convert_keys(i) for i in obj]
+    return obj
+
+
+def build_source_panel(verified_sources: list, trust_score: int, summary: str) -> dict:
+    """Build SourcePanelData matching frontend type."""
+    converted = convert_keys(verified_sources)
+    overall_status = "verified"
+    if converted:
+        statuses = [s.get("verification", {}).get("status", "verified") for s in converted]
+        if "distorted" in statuses:
+            overall_status = "distorted"
+        elif "context_missing" in statuses:
+            overall_status = "context_missing"
+    return {
+        "originalSources": converted,
+        "verificationStatus": overall_status,
+        "trustScore": trust_score,
+        "summary": summary,
+    }
+
+
+def build_perspective_panel(
+    perspectives: list,
+    common_facts: list,
+    divergence_points: list,
+    perspective_image: dict | None = None,
+) -> dict:
+    """Build PerspectivePanelData matching frontend type."""
+    panel = {
+        "perspectives": convert_keys(perspectives),
+        "commonFacts": common_facts,
+        "divergencePoints": convert_keys(divergence_points),
+    }
+    if perspective_image:
+        panel["spectrumVisualization"] = {
+            "imageDataUrl": (
+                f"data:{perspective_image.get('mime_type', 'image/png')};base64,"
+                f"{perspective_image.get('base64_data', '')}"
+            ),
+            "caption": perspective_image.get("caption", ""),
+            "chartType": "auto",
+        }
+    return panel
+
+
+def build_bias_panel(
+    detected_biases: list,
+    claims: list,
+    expanded_topics: list = None,
+    related_content: list = None,
+    alternative_framing: str = None,
+    user_instincts: list = None,
+    information_biases: list = None,
+) -> dict:
+    """Build BiasPanelData matching frontend type."""
+    bias_scores = []
+    dominant_biases = []
+    text_examples = []
+
+    for bias in detected_biases:
+        bias_type = bias.get("type", "")
+        confidence = bias.get("confidence", 0)
+        example = bias.get("example", "")
+
+        bias_scores.append({"type": bias_type, "score": confidence})
+        if confidence >= 0.5:
+            dominant_biases.append(bias_type)
+        if example:
+            text_examples.append({
+                "text": example,
+                "biasType": bias_type,
+                "explanation": f"Detected {bias_type.replace('_', ' ')} with {confidence:.0%} confidence",
+            })
+
+    result = {
+        "biasScores": bias_scores,
+        "dominantBiases": dominant_biases,
+        "textExamples": text_examples,
+    }
+
+    # Add new Agent A structure: user instincts (Hans Rosling 10)
+    if user_instincts:
+        result["userInstincts"] = convert_keys(user_instincts)
+
+    # Add new Agent A structure: information/media biases
+    if information_biases:
+        result["informationBiases"] = convert_keys(information_biases)
+
+    # Add alternative framing only if AI generated it (no boilerplate fallback)
+    if alternative_framing:
+        result["alternativeFraming"] = alternative_framing
+
+    # Add expanded topics if available
+    if expanded_topics:
+        result["expandedTopics"] = convert_keys(expanded_topics)
+
+    # Add related content if available
+    if related_content:
+        result["relatedContent"] = convert_keys(related_content)
+
+    return result
+
+
+def build_summary(
+    claims: list,
+    trust_score: int,
+    verification_status: str,
+    perspectives: list,
+    detected_biases: list,
+) -> dict:
+    """Build the compact summary used by list views."""
+    return {
+        "trustScore": trust_score,
+        "verificationStatus": verification_status,
+        "topClaim": claims[0].get("text", "") if claims else "",
+        "claimCount": len(claims),
+        "perspectiveCount": len(perspectives),
+        "dominantBiases": [b.get("type", "") for b in detected_biases if b.get("confidence", 0) >= 0.5],
+    }
+
+
+def build_steel_man(steel_man: dict | None) -> dict:
+    """Build SteelManOutput matching frontend type (empty fields when missing)."""
+    return convert_keys(steel_man or {}) or {
+        "opposingArgument": "",
+        "strengthenedArgument": "",
+        "refutationPoints": [],
+    }
+
+
+# Frontend AnalysisResult sections and the canonical fields each is built from.
+PANEL_FIELDS: dict[str, tuple[str, ...]] = {
+    "source": ("verified_sources", "overall_trust_score", "source_summary"),
+    "perspective": ("perspectives", "common_facts", "divergence_points", "perspective_image"),
+    "bias": (
+        "detected_biases",
+        "claims",
+        "expanded_topics",
+        "related_content",
+        "alternative_framing",
+        "user_instincts",
+        "information_biases",
+    ),
+    "steelMan": ("steel_man",),
+}
+
+# Every cached section: the panels plus the list-view summary.
+SECTION_FIELDS: dict[str, tuple[str, ...]] = {
+    **PANEL_FIELDS,
+    "summary": ("claims", "overall_trust_score", "verified_sources", "perspectives", "detected_biases"),
+}
+
+_FIELD_PANELS: dict[str, tuple[str, ...]] = {}
+for _panel, _fields in SECTION_FIELDS.items():
+    for _field in _fields:
+        _FIELD_PANELS[_field] = _FIELD_PANELS.get(_field, ()) + (_panel,)
+
+
+class AnalysisResult(BaseModel):
+    """Canonical (snake_case) result of one analysis, updated from graph outputs."""
+
+    session_id: str
+    status: str = "analyzing"  # "analyzing" | "done" | "error"
+    claims: list = []
+    detected_biases: list = []
+    user_instincts: list = []
+    information_biases: list = []
+    verified_sources: list = []
+    overall_trust_score: int = 0
+    source_summary: str = ""
+    perspectives: list = []
+    common_facts: list = []
+    divergence_points: list = []
+    perspective_summary: str = ""
+    perspective_image: Optional[dict] = None
+    steel_man: Optional[dict] = None
+    alternative_framing: str = ""
+    expanded_topics: list = []
+    related_content: list = []
+
+    # Bumped on every change; panels remember the version they were built at.
+    version: int = 0
+
+    _panel_versions: dict[str, int] = PrivateAttr(default_factory=dict)
+    _panels: dict[str, tuple[int, dict, str]] = PrivateAttr(default_factory=dict)
+    _projection: Optional[tuple[int, str]] = PrivateAttr(default=None)
+
+    def apply(self, node_output: dict) -> set[str]:
+        """Copy the result fields present in a node output; returns the changed panels."""
+        changed: set[str] = set()
+        touched = False
+        for field in node_output.keys() & _RESULT_FIELDS:
+            value = node_output[field]
+            if field == "steel_man" and not value:
+                continue  # a failed Steel Man does not overwrite an earlier one
+            setattr(self, field, value)
+            touched = True
+            changed.update(_FIELD_PANELS.get(field, ()))
+        if touched:
+            self.version += 1
+            for panel in changed:
+                self._panel_versions[panel] = self.version
+        return changed
+
+    def set_status(self, status: str):
+        self.status = status
+        self.version += 1
+
+    def _built_panel(self, name: str) -> tuple[int, dict, str]:
+        version = self._panel_versions.get(name, 0)
+        cached = self._panels.get(name)
+        if cached is not None and cached[0] == version:
+            return cached
+        if name == "source":
+            panel = build_source_panel(self.verified_sources, self.overall_trust_score, self.source_summary)
+        elif name == "perspective":
+            panel = build_perspective_panel(
+                self.perspectives, self.common_facts, self.divergence_points, self.perspective_image
+            )
+        elif name == "bias":
+            panel = build_bias_panel(
+                self.detected_biases,
+                self.claims,
+                self.expanded_topics,
+                self.related_content,
+                self.alternative_framing,
+                user_instincts=self.user_instincts,
+                information_biases=self.information_biases,
+            )
+        elif name == "steelMan":
+            panel = build_steel_man(self.steel_man)
+        elif name == "summary":
+            panel = build_summary(
+                self.claims,
+                self.overall_trust_score,
+                self.panel("source")["verificationStatus"],
+                self.perspectives,
+                self.detected_biases,
+            )
+        else:
+            raise KeyError(f"Unknown result panel: {name}")
+        built = (version, panel, json.dumps(panel))
+        self._panels[name] = built
+        return built
+
+    def panel(self, name: str) -> dict:
+        """Frontend data for one section ("source" | "perspective" | "bias" | "steelMan" | "summary")."""
+        return self._built_panel(name)[1]
+
+    def panel_json(self, name: str) -> str:
+        """Serialized panel(name), rebuilt only after one of its fields changed."""
+        return self._built_panel(name)[2]
+
+    def projection_json(self, sections: Optional[tuple[str, ...]] = None) -> str:
+        """Serialized frontend AnalysisResult, composed from the cached panel JSON.
+
+        `sections` selects a subset of panels (all of PANEL_FIELDS by default).
+        """
+        if sections is not None:
+            return "{" + ", ".join(f'"{name}": {self.panel_json(name)}' for name in sections) + "}"
+        if self._projection is not None and self._projection[0] == self.version:
+            return self._projection[1]
+        projection = self.projection_json(tuple(PANEL_FIELDS))
+        self._projection = (self.version, projection)
+        return projection
+
+    def to_dict(self) -> dict:
+        """Canonical fields as a plain dict (e.g. for near-duplicate reuse)."""
+        return self.model_dump(exclude={"version"})
+
+
+# Fields filled from graph node outputs.
+_RESULT_FIELDS = frozenset(AnalysisResult.model_fields) - {"session_id", "status", "version"}
@@ -0,0 +1,132 @@
+"""Temporary on-disk blob store for large analysis payloads.
+
+Uploaded images and long pasted texts are written here once and sessions
+keep only a reference, instead of the raw payload being copied into the
+session, the graph state and the request model. Blobs are content
+addressed (the id is the SHA-256 of the bytes), which also makes the id a
+stable fingerprint for caches.
+
+A periodic sweep removes blobs (and abandoned partial uploads) not written
+for blob_ttl_seconds, whether or not a session still references them;
+reading a swept blob raises BlobExpiredError, which /api/stream turns into
+410 Gone. SessionStore.delete also removes a blob no other session shares.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BlobTooLargeError(ValueError):
+    """Raised when a streamed blob exceeds its size limit."""
+
+
+class BlobExpiredError(FileNotFoundError):
+    """Raised when a referenced blob is gone (swept after blob_ttl_seconds)."""
+
+
+class BlobStore:
+    """Content-addressed blob files under a temporary directory."""
+
+    def __init__(self, root: str | None = None):
+        self.root = Path(root or os.path.join(tempfile.gettempdir(), "flipside-blobs"))
+
+    def _path(self, blob_id: str) -> Path:
+        if not blob_id.isalnum():
+            raise ValueError(f"Invalid blob id: {blob_id}")
+        return self.root / blob_id
+
+    def _commit(self, tmp_path: Path, blob_id: str):
+        path = self._path(blob_id)
+        if path.exists():
+            tmp_path.unlink(missing_ok=True)
+            os.utime(path)  # stored again: restart its TTL
+        else:
+            tmp_path.replace(path)
+
+    async def put_stream(self, chunks: AsyncIterator[bytes], *, max_bytes: int) -> tuple[str, int]:
+        """Write a stream of chunks to a blob; returns (blob_id, size)."""
+        await asyncio.to_thread(self.root.mkdir, parents=True, exist_ok=True)
+        tmp_path = self.root / f".upload-{uuid.uuid4().hex}"
+        digest = hashlib.sha256()
+        size = 0
+        handle = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise BlobTooLargeError(f"Payload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                await asyncio.to_thread(handle.write, chunk)
+        except BaseException:
+            handle.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        handle.close()
+
+        blob_id = digest.hexdigest()
+        await asyncio.to_thread(self._commit, tmp_path, blob_id)
+        return blob_id, size
+
+    async def put_bytes(self, data: bytes) -> str:
+        """Store an in-memory payload; returns the blob id."""
+        async def single_chunk():
+            yield data
+
+        blob_id, _ = await self.put_stream(single_chunk(), max_bytes=len(data))
+        return blob_id
+
+    async def read(self, blob_id: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self._path(blob_id).read_bytes)
+        except FileNotFoundError as e:
+            raise BlobExpiredError(f"Uploaded content {blob_id[:12]} has expired") from e
+
+    def exists(self, blob_id: str) -> bool:
+        return self._path(blob_id).is_file()
+
+    def delete(self, blob_id: str):
+        self._path(blob_id).unlink(missing_ok=True)
+
+    def sweep(self, max_age_seconds: float) -> int:
+        """Delete blobs and partial uploads last written more than max_age_seconds ago."""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        try:
+            paths = list(self.root.iterdir())
+        except FileNotFoundError:
+            return 0
+        for path in paths:
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+# Global blob store instance
+blob_store = BlobStore(settings.blob_store_dir or None)
+
+
+async def run_blob_sweeper():
+    """Sweep expired blobs every blob_sweep_interval_seconds (run for the app's lifetime)."""
+    while True:
+        try:
+            removed = await asyncio.to_thread(blob_store.sweep, settings.blob_ttl_seconds)
+            if removed:
+                logger.info(f"[BlobStore] Swept {removed} expired blobs")
+        except OSError:
+            logger.exception("[BlobStore] Sweep failed")
+        await asyncio.sleep(settings.blob_sweep_interval_seconds)
@@ -0,0 +1,75 @@
+"""Small in-process caches shared by agent nodes."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """LRU cache whose entries expire `ttl` seconds after they were stored
+    (or after the ttl given to set for that entry).
+
+    Expired entries are dropped on access and, from the least recently used
+    end, on every set; the least recently used entry is evicted once
+    max_entries is reached. on_evict is called with every value dropped that
+    way or overwritten by set (not with values taken out with pop), e.g. to
+    cancel a task nobody will await.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[V], None]] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._on_evict = on_evict
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()  # (expires_at, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if self._clock() > expires_at:
+            del self._entries[key]
+            self._evicted(value)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None):
+        """Store a value, evicting expired entries and, if full, the least recently used one."""
+        now = self._clock()
+        replaced = self._entries.get(key)
+        self._entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        if replaced is not None and replaced[1] is not value:
+            self._evicted(replaced[1])
+        while self._entries:
+            oldest_key, (expires_at, oldest) = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and now <= expires_at:
+                break
+            del self._entries[oldest_key]
+            self._evicted(oldest)
+
+    def _evicted(self, value: V):
+        if self._on_evict is not None:
+            self._on_evict(value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._entries.clear()
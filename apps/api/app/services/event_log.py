@@ -0,0 +1,85 @@
+"""Per-session SSE event log.
+
+The analysis run appends every frame here once, already serialized with a
+monotonically increasing event id. Stream connections replay the frames
+after the client's Last-Event-ID and then follow live appends, so a dropped
+connection resumes where it stopped instead of re-running the graph.
+While no frame is appended (e.g. during a long model call), followers send
+SSE comment lines as heartbeats so proxies do not cut the idle stream.
+"""
+
+import asyncio
+import bisect
+import json
+from typing import AsyncIterator, Optional
+
+HEARTBEAT_FRAME = ": keep-alive\n\n"
+
+
+class EventLog:
+    """Append-only list of serialized SSE frames for one analysis run."""
+
+    def __init__(self, first_id: int = 1):
+        self._ids: list[int] = []
+        self._frames: list[str] = []
+        self._next_id = first_id
+        self._appended = asyncio.Event()
+        self.closed = False
+        self.failed = False
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    def append(self, data: dict) -> int:
+        """Serialize and store a frame; wakes up every follower."""
+        return self.append_json(json.dumps(data))
+
+    def append_json(self, data_json: str) -> int:
+        """Store a frame whose data is already serialized (e.g. a cached projection)."""
+        event_id = self._next_id
+        self._next_id += 1
+        self._ids.append(event_id)
+        self._frames.append(f"id: {event_id}\ndata: {data_json}\n\n")
+        self._wake()
+        return event_id
+
+    def close(self, failed: bool = False):
+        """Mark the run finished; followers drain the log and stop."""
+        self.closed = True
+        self.failed = failed
+        self._wake()
+
+    def _wake(self):
+        self._appended.set()
+        self._appended = asyncio.Event()
+
+    async def follow(self, after_id: int = 0, heartbeat: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield frames with id > after_id, then live frames until the log is closed.
+
+        With `heartbeat`, a comment frame is yielded after that many seconds
+        without a new frame.
+        """
+        index = bisect.bisect_right(self._ids, after_id)
+        while True:
+            while index < len(self._frames):
+                yield self._frames[index]
+                index += 1
+            if self.closed:
+                return
+            appended = self._appended
+            if not heartbeat:
+                await appended.wait()
+                continue
+            try:
+                await asyncio.wait_for(appended.wait(), heartbeat)
+            except TimeoutError:
+                yield HEARTBEAT_FRAME
+
+
+def parse_last_event_id(value: str | None) -> int:
+    """Parse a Last-Event-ID header value (0 when missing or malformed)."""
+    try:
+        return max(0, int(value)) if value else 0
+    except ValueError:
+        return 0
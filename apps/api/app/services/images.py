@@ -0,0 +1,91 @@
+"""Image ingestion: decode, bound the resolution, and fingerprint uploads.
+
+Screenshots arrive as base64 strings. They are decoded once, downscaled to
+settings.image_max_dimension and re-encoded, so the analyzer can send them
+as a compact inline image Part instead of pasting the base64 text into the
+prompt. Analysis results are cached by the SHA-256 of the decoded upload:
+a perceptual hash (dHash) is too coarse for that, since text screenshots
+with different wording often share one.
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.core.config import settings
+
+
+class InvalidImageError(ValueError):
+    """Raised when image content cannot be decoded."""
+
+
+@dataclass
+class PreparedImage:
+    """A downscaled, re-encoded image ready to send to Gemini."""
+
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    phash: str  # perceptual hash, for logs and near-duplicate diagnostics only
+    digest: str  # SHA-256 of the decoded upload, the cache key
+
+
+def decode_image_payload(content: str) -> bytes:
+    """Decode base64 image content, accepting an optional data URL prefix."""
+    if content.startswith("data:"):
+        _, _, content = content.partition(",")
+    try:
+        return base64.b64decode(content, validate=False)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidImageError("Image content is not valid base64") from e
+
+
+def perceptual_hash(image: Image.Image, hash_size: int = 8) -> str:
+    """Difference hash: compares adjacent pixels of a tiny grayscale thumbnail."""
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
+
+def prepare_image(raw: bytes) -> PreparedImage:
+    """Downscale to the configured bound and re-encode (CPU-bound; run in a thread)."""
+    try:
+        image = Image.open(io.BytesIO(raw))
+        image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError("Image content could not be decoded") from e
+
+    image = ImageOps.exif_transpose(image)
+    phash = perceptual_hash(image)
+
+    max_dim = settings.image_max_dimension
+    if max(image.size) > max_dim:
+        image.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if has_alpha:
+        image.save(buffer, format="PNG", optimize=True)
+        mime_type = "image/png"
+    else:
+        image.convert("RGB").save(buffer, format="JPEG", quality=settings.image_jpeg_quality, optimize=True)
+        mime_type = "image/jpeg"
+
+    return PreparedImage(
+        data=buffer.getvalue(),
+        mime_type=mime_type,
+        width=image.width,
+        height=image.height,
+        phash=phash,
+        digest=hashlib.sha256(raw).hexdigest(),
+    )
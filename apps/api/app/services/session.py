@@ -1,11 +1,19 @@
 """Session management service for Flipside analysis sessions."""
 
-from typing import Optional
+from typing import Iterator, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import asyncio
+import contextlib
+import time
 from collections import defaultdict
 
+from app.core.config import settings
+from app.services.analysis_result import AnalysisResult
+from app.services.blob_store import blob_store
+from app.services.event_log import EventLog
+from app.services.usage import UsageLedger
+
 
 class AnalysisSession(BaseModel):
     """Represents an analysis session for content verification."""
@@ -14,9 +22,19 @@ class AnalysisSession(BaseModel):
     created_at: datetime
     content_type: str  # "url" | "text" | "image"
     content: str
-    status: str = "pending"  # "pending" | "analyzing" | "done" | "error"
-    result: Optional[dict] = None
+    content_ref: Optional[str] = None  # blob id when the payload lives in the blob store
+    mode: str = "deep"  # analysis mode: "fast" | "balanced" | "deep"
+    client_id: str = ""  # fair-queuing identity of the client that started it
+    status: str = "pending"  # "pending" | "analyzing" | "done" | "error" | "cancelled"
+    result: Optional[AnalysisResult] = None
     conversation_context: Optional[dict] = None
+    usage: UsageLedger = Field(default_factory=UsageLedger)  # model calls, tokens and cost per node
+    version: int = 0  # bumped on every update (ETag of /api/result)
+
+    @property
+    def content_key(self) -> str:
+        """Stable fingerprint source for caches (blob ids are content hashes)."""
+        return f"blob:{self.content_ref}" if self.content_ref else self.content
 
 
 class SessionStore:
@@ -25,16 +43,34 @@ class SessionStore:
     def __init__(self):
         self._sessions: dict[str, AnalysisSession] = {}
         self._subscribers: dict[str, list[asyncio.Queue]] = defaultdict(list)
-
-    def create(self, session_id: str, content_type: str, content: str) -> AnalysisSession:
+        self._event_logs: dict[str, EventLog] = {}
+        self._changed: dict[str, asyncio.Event] = {}
+        # Open streams / long polls per session and when one was last seen.
+        self._listeners: dict[str, int] = defaultdict(int)
+        self._last_seen: dict[str, float] = {}
+
+    def create(
+        self,
+        session_id: str,
+        content_type: str,
+        content: str = "",
+        content_ref: Optional[str] = None,
+        mode: str = "deep",
+        client_id: str = "",
+    ) -> AnalysisSession:
         """Create a new analysis session."""
         session = AnalysisSession(
             id=session_id,
             created_at=datetime.now(),
             content_type=content_type,
-            content=content
+            content=content,
+            content_ref=content_ref,
+            mode=mode,
+            client_id=client_id,
+            usage=UsageLedger(budget_usd=settings.session_budget_usd),
         )
         self._sessions[session_id] = session
+        self._last_seen[session_id] = time.monotonic()
         return session
 
     def get(self, session_id: str) -> Optional[AnalysisSession]:
@@ -42,13 +78,65 @@ class SessionStore:
         return self._sessions.get(session_id)
 
     def update(self, session_id: str, **kwargs) -> Optional[AnalysisSession]:
-        """Update session attributes."""
+        """Update session attributes, bump its version and wake up long-pollers."""
         session = self._sessions.get(session_id)
         if session:
             for key, value in kwargs.items():
                 setattr(session, key, value)
+            session.version += 1
+            changed = self._changed.pop(session_id, None)
+            if changed is not None:
+                changed.set()
         return session
 
+    def update_context(self, session_id: str, fields: dict) -> Optional[AnalysisSession]:
+        """Merge fields into the session's conversation context.
+
+        The current context is read and replaced without awaiting in between,
+        so writers that own different fields (the analysis run, chat turns)
+        never overwrite each other's.
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        return self.update(session_id, conversation_context={**(session.conversation_context or {}), **fields})
+
+    async def wait_for_change(self, session_id: str, version: int, timeout: float) -> Optional[AnalysisSession]:
+        """Wait until the session's version differs from `version` or the timeout passes."""
+        session = self._sessions.get(session_id)
+        if session is None or session.version != version:
+            return session
+        changed = self._changed.get(session_id)
+        if changed is None:
+            changed = self._changed[session_id] = asyncio.Event()
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except TimeoutError:
+            pass
+        return self._sessions.get(session_id)
+
+    def mark_seen(self, session_id: str):
+        """Record that a client just read the session (e.g. fetched its result)."""
+        self._last_seen[session_id] = time.monotonic()
+
+    @contextlib.contextmanager
+    def listening(self, session_id: str) -> Iterator[None]:
+        """Count a client as listening to the session (an SSE stream, a long poll) while inside."""
+        self._listeners[session_id] += 1
+        try:
+            yield
+        finally:
+            self._listeners[session_id] -= 1
+            if not self._listeners[session_id]:
+                del self._listeners[session_id]
+            self.mark_seen(session_id)
+
+    def unattended_seconds(self, session_id: str) -> float:
+        """Seconds since the last client listened to or read the session (0 while one listens)."""
+        if self._listeners.get(session_id):
+            return 0.0
+        return time.monotonic() - self._last_seen.get(session_id, 0.0)
+
     def subscribe(self, session_id: str) -> asyncio.Queue:
         """Subscribe to session events (for SSE)."""
         queue: asyncio.Queue = asyncio.Queue()
@@ -69,10 +157,32 @@ class SessionStore:
             for queue in self._subscribers[session_id]:
                 await queue.put(event)
 
+    def get_event_log(self, session_id: str) -> Optional[EventLog]:
+        """Get the SSE event log of the session's latest analysis run."""
+        return self._event_logs.get(session_id)
+
+    def set_event_log(self, session_id: str, log: EventLog):
+        """Attach the SSE event log of a new analysis run."""
+        self._event_logs[session_id] = log
+
     def delete(self, session_id: str):
-        """Delete a session."""
-        self._sessions.pop(session_id, None)
+        """Delete a session, and its blob unless another session shares it.
+
+        A pending Socrates prefetch of the session is cancelled.
+        """
+        from app.services.socrates_prefetch import cancel_prefetch
+
+        cancel_prefetch(session_id)
+        session = self._sessions.pop(session_id, None)
+        if session is not None and session.content_ref:
+            if not any(s.content_ref == session.content_ref for s in self._sessions.values()):
+                blob_store.delete(session.content_ref)
         self._subscribers.pop(session_id, None)
+        self._event_logs.pop(session_id, None)
+        self._last_seen.pop(session_id, None)
+        changed = self._changed.pop(session_id, None)
+        if changed is not None:
+            changed.set()
 
 
 # Global session store instance
@@ -0,0 +1,98 @@
+"""Per-session serialized execution of chat turns.
+
+A chat turn reads the conversation context, awaits the model and writes the
+extended message list back. Two turns of one session running at once (a
+double submit, two tabs) would both read the same messages and the slower
+one would overwrite the other's. Each session therefore gets a mailbox
+drained by a single worker: turns run one at a time, in arrival order.
+
+Submits carrying the same idempotency key are coalesced: a duplicate that
+arrives while the original is queued or running awaits the same result, and
+one that arrives later gets the stored result, without another model call.
+
+The actor lives in the worker process that owns the in-memory session
+store; deployments with several workers keep that property by routing a
+session's requests to one worker (as the in-memory store already requires).
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+Work = Callable[[], Awaitable[Any]]
+
+
+class SessionActors:
+    """Mailbox and worker per session, created on demand and dropped when idle."""
+
+    def __init__(self, *, results_ttl: float = 10 * 60, max_results: int = 5000):
+        self._mailboxes: dict[str, asyncio.Queue] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self._inflight: dict[tuple[str, Hashable], asyncio.Future] = {}
+        # (result,) per (session id, idempotency key); the tuple keeps None results cacheable.
+        self._results: TTLCache[tuple[Any]] = TTLCache(ttl=results_ttl, max_entries=max_results)
+
+    async def run(self, session_id: str, work: Work, *, key: Optional[Hashable] = None):
+        """Run `work` after the session's earlier submits; returns its result.
+
+        The work keeps running if the caller goes away (e.g. the client
+        disconnects), so a retry with the same key picks up its result.
+        Failures are not remembered: a retry runs the work again.
+        """
+        if key is not None:
+            done = self._results.get((session_id, key))
+            if done is not None:
+                logger.info(f"[SessionActor] Replayed result for duplicate submit (session={session_id})")
+                return done[0]
+            inflight = self._inflight.get((session_id, key))
+            if inflight is not None:
+                logger.info(f"[SessionActor] Coalesced duplicate submit (session={session_id})")
+                return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark failures as retrieved: every caller may have gone away.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if key is not None:
+            self._inflight[(session_id, key)] = future
+
+        mailbox = self._mailboxes.get(session_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[session_id] = asyncio.Queue()
+        mailbox.put_nowait((work, future, key))
+        if session_id not in self._workers:
+            self._workers[session_id] = asyncio.create_task(self._drain(session_id, mailbox))
+        return await asyncio.shield(future)
+
+    async def _drain(self, session_id: str, mailbox: asyncio.Queue):
+        try:
+            while True:
+                try:
+                    work, future, key = mailbox.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                try:
+                    result = await work()
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    if key is not None:
+                        self._results.set((session_id, key), (result,))
+                    future.set_result(result)
+                finally:
+                    if key is not None:
+                        self._inflight.pop((session_id, key), None)
+        finally:
+            # No await between the empty check and here, so no submit can slip in.
+            self._mailboxes.pop(session_id, None)
+            self._workers.pop(session_id, None)
+
+
+# Global actor registry (chat turns)
+session_actors = SessionActors()
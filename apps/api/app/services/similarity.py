@@ -0,0 +1,252 @@
+"""Semantic near-duplicate index for reusing analysis results.
+
+Paraphrased reposts of the same article produce near-identical claim sets.
+After each analysis the claim texts are embedded and stored together with
+the downstream (source / perspective / aggregate) results, so a later
+session whose analyzer output lands close enough can reuse them.
+"""
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Result fields produced after the analyzer that are safe to reuse. The
+# perspective image (a base64 PNG) is left out: thousands of entries would
+# pin hundreds of MB of images.
+REUSABLE_FIELDS = (
+    "verified_sources",
+    "overall_trust_score",
+    "source_summary",
+    "perspectives",
+    "common_facts",
+    "divergence_points",
+    "perspective_summary",
+    "steel_man",
+    "alternative_framing",
+    "expanded_topics",
+    "related_content",
+)
+
+
+def content_fingerprint(content: str) -> str:
+    """Exact fingerprint of whitespace/case-normalized content."""
+    normalized = " ".join(content.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def claims_text(claims: list[dict]) -> str:
+    """Join claim texts into the string that represents a claim set."""
+    return "\n".join(c.get("text", "") for c in claims if c.get("text"))
+
+
+class Embedder(Protocol):
+    dim: int
+
+    async def embed(self, texts: list[str]) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """Deterministic feature-hashing embedder (no model call, for offline use).
+
+    Word tokens and character bigrams are hashed into a fixed number of
+    signed buckets, which copes with Korean text where spacing is unreliable.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> list[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = list(tokens)
+        for token in tokens:
+            features.extend(token[i:i + 2] for i in range(len(token) - 1))
+        return features
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dim] += sign
+        return vector
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._embed_one(t) for t in texts])
+
+
+class GeminiEmbedder:
+    """Embedder backed by the Gemini embedding model."""
+
+    def __init__(self, model: str, dim: int):
+        self.model = model
+        self.dim = dim
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        from google.genai import types
+        from app.core.gemini import get_gemini_client
+
+        client = get_gemini_client()
+        response = await client.aio.models.embed_content(
+            model=self.model,
+            contents=texts,
+            config=types.EmbedContentConfig(output_dimensionality=self.dim),
+        )
+        return np.array([e.values for e in response.embeddings], dtype=np.float32)
+
+
+def create_embedder(backend: str | None = None) -> Embedder:
+    """Create the embedder selected by settings.similarity_embedding_backend."""
+    backend = backend or settings.similarity_embedding_backend
+    if backend == "hashing":
+        return HashingEmbedder(dim=settings.similarity_embedding_dim)
+    if backend == "gemini":
+        return GeminiEmbedder(
+            model=settings.gemini_model_embedding,
+            dim=settings.similarity_embedding_dim,
+        )
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+@dataclass
+class SimilarityMatch:
+    """A past analysis whose claim set is close to the current one."""
+
+    score: float
+    session_id: str
+    result: dict
+
+
+class SimilarityIndex:
+    """In-memory cosine-similarity index over past claim sets.
+
+    Vectors are kept L2-normalized in one preallocated (max_entries, dim)
+    matrix used as a ring buffer, so a lookup is a single matrix-vector
+    product and an insert copies nothing. The oldest entries are overwritten
+    first once max_entries is reached.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        *,
+        threshold: float,
+        max_entries: int,
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors = np.zeros((max_entries, embedder.dim), dtype=np.float32)
+        self._entries: list[Optional[SimilarityMatch]] = [None] * max_entries
+        self._fingerprints: dict[str, SimilarityMatch] = {}
+        self._entry_fingerprints: list[Optional[str]] = [None] * max_entries
+        self._size = 0
+        self._next = 0  # slot written by the next add
+
+    def __len__(self) -> int:
+        return self._size
+
+    async def add(self, session_id: str, content: str, claims: list[dict], result: dict):
+        """Index a finished analysis under its content fingerprint and claim set."""
+        text = claims_text(claims)
+        if not text:
+            return
+        vector = _normalize(await self.embedder.embed([text]))
+        entry = SimilarityMatch(
+            score=1.0,
+            session_id=session_id,
+            result={k: result.get(k) for k in REUSABLE_FIELDS if k in result},
+        )
+
+        slot = self._next
+        evicted = self._entry_fingerprints[slot]
+        if evicted is not None and self._fingerprints.get(evicted) is self._entries[slot]:
+            del self._fingerprints[evicted]
+
+        fingerprint = content_fingerprint(content)
+        self._vectors[slot] = vector[0]
+        self._entries[slot] = entry
+        self._entry_fingerprints[slot] = fingerprint
+        self._fingerprints[fingerprint] = entry
+        self._next = (slot + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    async def lookup(self, content: str, claims: list[dict]) -> Optional[SimilarityMatch]:
+        """Return the closest past analysis above the threshold, if any."""
+        exact = self._fingerprints.get(content_fingerprint(content))
+        if exact is not None:
+            return exact
+
+        text = claims_text(claims)
+        if not text or not self._size:
+            return None
+
+        query = _normalize(await self.embedder.embed([text]))[0]
+        # Slots fill from 0, so the first _size rows are the live ones.
+        scores = self._vectors[:self._size] @ query
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < self.threshold:
+            return None
+
+        entry = self._entries[best]
+        return SimilarityMatch(score=score, session_id=entry.session_id, result=entry.result)
+
+    def clear(self):
+        self._vectors[:] = 0.0
+        self._entries = [None] * self.max_entries
+        self._entry_fingerprints = [None] * self.max_entries
+        self._fingerprints = {}
+        self._size = 0
+        self._next = 0
+
+
+def _has_reusable_payload(result: dict) -> bool:
+    return bool(result.get("verified_sources") or result.get("perspectives"))
+
+
+async def remember_analysis(session_id: str, content: str, claims: list[dict], result: dict):
+    """Add a finished analysis to the index (no-op when reuse is disabled)."""
+    if not settings.similarity_reuse_enabled or not _has_reusable_payload(result):
+        return
+    try:
+        await claim_index.add(session_id, content, claims, result)
+    except Exception:
+        logger.exception("[Similarity] Failed to index analysis %s", session_id)
+
+
+async def find_reusable_result(content: str, claims: list[dict]) -> Optional[SimilarityMatch]:
+    """Look up a near-identical past analysis (None when reuse is disabled)."""
+    if not settings.similarity_reuse_enabled:
+        return None
+    try:
+        return await claim_index.lookup(content, claims)
+    except Exception:
+        logger.exception("[Similarity] Lookup failed")
+        return None
+
+
+# Global index instance
+claim_index = SimilarityIndex(
+    create_embedder(),
+    threshold=settings.similarity_threshold,
+    max_entries=settings.similarity_index_max_entries,
+)
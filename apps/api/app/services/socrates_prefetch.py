@@ -0,0 +1,158 @@
+"""Speculative preparation of the next Socrates turn.
+
+The dialogue follows four known steps and the question for each step is
+generated with the analysis (conversation_context["questions"]). While the
+user reads the latest reply, the next turn is prepared from the context
+alone: candidate follow-ups for the upcoming step, one per likely stance,
+written with the session's shared prompt prefix (which also warms the model
+API's prefix cache for that session).
+
+When the user's message arrives, /api/chat finishes the turn from those
+candidates with a short, cheap call instead of the full Socrates call. A
+stale prefetch (the dialogue moved on) is dropped; one still running is
+waited for up to socrates_prefetch_wait_seconds, and the full call only
+starts once the candidates turned out unusable, so a turn never pays for
+both.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.agents.prompts import SOCRATES_CONTEXT_TEMPLATE, SOCRATES_PREFETCH_TEMPLATE
+from app.agents.utils import extract_json
+from app.core.config import settings
+from app.services.cache import TTLCache
+from app.services.session import session_store
+
+logger = logging.getLogger(__name__)
+
+MAX_STEPS = 4
+
+
+def socrates_context_prefix(context: dict) -> str:
+    """Session-constant prompt prefix shared by every Socrates call of a session."""
+    return SOCRATES_CONTEXT_TEMPLATE.render(
+        source_result=context.get("source_summary", ""),
+        perspectives=context.get("perspective_summary", ""),
+        biases=json.dumps(context.get("detected_biases", []), ensure_ascii=False),
+    )
+
+
+@dataclass
+class TurnPrefetch:
+    """Candidates being prepared for one dialogue position (step, message count)."""
+
+    step: int
+    message_count: int
+    task: asyncio.Task = field(repr=False)
+
+
+_prefetches: TTLCache[TurnPrefetch] = TTLCache(ttl=30 * 60, max_entries=2000)
+
+
+async def _prepare_candidates(session_id: str, mode: str, context: dict) -> list[dict]:
+    from app.core.gemini import generate_for_node, get_gemini_client
+    from app.services.usage import BudgetExceededError, bind_session
+
+    bind_session(session_id)
+    step = context.get("step", 0)
+    questions = context.get("questions") or []
+    prompt = SOCRATES_PREFETCH_TEMPLATE.render(
+        current_step=step + 1,
+        planned_question=questions[step] if step < len(questions) else "",
+        previous_messages=json.dumps(context.get("messages", []), ensure_ascii=False),
+    )
+    try:
+        response = await generate_for_node(
+            get_gemini_client(),
+            "socrates_prefetch",
+            [socrates_context_prefix(context), prompt],
+            mode=mode,
+            response_mime_type="application/json",
+        )
+        result = extract_json(response.text) or {}
+        candidates = [c for c in result.get("candidates", []) if isinstance(c, dict) and c.get("response")]
+        logger.info(f"[Socrates] Prefetched {len(candidates)} candidates for step {step + 1} (session={session_id})")
+        return candidates
+    except asyncio.CancelledError:
+        raise
+    except BudgetExceededError:
+        return []
+    except Exception as e:
+        logger.warning(f"[Socrates] Prefetch failed for step {step + 1} (session={session_id}): {e}")
+        return []
+
+
+def schedule_prefetch(session_id: str) -> Optional[TurnPrefetch]:
+    """Start preparing the session's next turn, unless already prepared or not needed."""
+    if not settings.socrates_prefetch_enabled:
+        return None
+    session = session_store.get(session_id)
+    if session is None or not session.conversation_context:
+        return None
+
+    from app.core.gemini import get_generation_profile
+
+    if not get_generation_profile("socrates_prefetch", session.mode).enabled:
+        return None
+
+    context = session.conversation_context
+    step = context.get("step", 0)
+    message_count = len(context.get("messages", []))
+    if step >= MAX_STEPS:
+        return None
+
+    current = _prefetches.get(session_id)
+    if current is not None and (current.step, current.message_count) == (step, message_count):
+        return current
+    if current is not None:
+        current.task.cancel()
+
+    prefetch = TurnPrefetch(
+        step=step,
+        message_count=message_count,
+        task=asyncio.create_task(_prepare_candidates(session_id, session.mode, dict(context))),
+    )
+    _prefetches.set(session_id, prefetch)
+    return prefetch
+
+
+def cancel_prefetch(session_id: str):
+    """Cancel and drop the session's prefetch (the session is going away)."""
+    prefetch = _prefetches.pop(session_id)
+    if prefetch is not None:
+        prefetch.task.cancel()
+
+
+def prefetch_status(session_id: str, step: int, message_count: int) -> Optional[str]:
+    """"ready" | "pending" for a prefetch of this dialogue position, None when there is none."""
+    prefetch = _prefetches.get(session_id)
+    if prefetch is None or (prefetch.step, prefetch.message_count) != (step, message_count):
+        return None
+    return "ready" if prefetch.task.done() else "pending"
+
+
+async def take_prefetched_candidates(session_id: str, step: int, message_count: int) -> list[dict]:
+    """Candidates prepared for this dialogue position ([] when none are usable).
+
+    Waits up to socrates_prefetch_wait_seconds for a prefetch still running;
+    the prefetch is consumed either way.
+    """
+    prefetch = _prefetches.pop(session_id)
+    if prefetch is None:
+        return []
+    if (prefetch.step, prefetch.message_count) != (step, message_count):
+        prefetch.task.cancel()
+        return []
+    if not prefetch.task.done():
+        try:
+            await asyncio.wait_for(prefetch.task, timeout=settings.socrates_prefetch_wait_seconds)
+        except asyncio.TimeoutError:
+            logger.info(f"[Socrates] Prefetch for step {step + 1} not ready in time (session={session_id})")
+            return []
+    if prefetch.task.cancelled():
+        return []
+    return prefetch.task.result()
@@ -0,0 +1,337 @@
+"""URL pre-fetching with a pooled HTTP client and an on-disk HTTP cache.
+
+The analyzer used to let Gemini fetch article pages through the
+`url_context` tool inside the Pro call, which serialized the network fetch
+with model reasoning and ruled out JSON mode. Pages are now fetched here as
+soon as a session is created, reduced to readable article text, and cached
+on disk with their ETag / Last-Modified validators so that other sessions
+for the same URL only need a conditional request (or none at all).
+
+The URL comes from the user, so only http(s) URLs whose host resolves to
+public addresses are fetched. Redirects are followed by hand and every hop
+is checked again; each request connects to the address that was checked
+(no second DNS lookup), so a rebinding resolver cannot swap in an internal
+address. Bodies are capped at url_fetch_max_bytes.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import ipaddress
+import json
+import logging
+import socket
+import time
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe"}
+_BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "blockquote", "pre", "figcaption", "td"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+@dataclass
+class FetchedArticle:
+    """Readable text extracted from a web page."""
+
+    url: str
+    title: str
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+class _ReadableTextParser(HTMLParser):
+    """Collects block-level text, preferring the <article> element if present."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.og_title = ""
+        self._stack: list[str] = []
+        self._skip_depth = 0
+        self._article_depth = 0
+        self._block: list[str] = []
+        self.blocks: list[str] = []
+        self.article_blocks: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attr_map = dict(attrs)
+            if attr_map.get("property") == "og:title" and attr_map.get("content"):
+                self.og_title = attr_map["content"].strip()
+            return
+        if tag in _VOID_TAGS:
+            if tag == "br":
+                self._block.append(" ")
+            return
+        self._stack.append(tag)
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "article":
+            self._article_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag not in self._stack:
+            return
+        # Pop up to and including the matching tag (tolerates unclosed tags).
+        while self._stack:
+            open_tag = self._stack.pop()
+            if open_tag in _SKIP_TAGS:
+                self._skip_depth -= 1
+            elif open_tag == "article":
+                self._flush()
+                self._article_depth -= 1
+            elif open_tag in _BLOCK_TAGS:
+                self._flush()
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._stack and self._stack[-1] == "title":
+            self.title += data
+            return
+        self._block.append(data)
+
+    def _flush(self):
+        text = " ".join("".join(self._block).split())
+        self._block = []
+        if not text:
+            return
+        self.blocks.append(text)
+        if self._article_depth:
+            self.article_blocks.append(text)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_readable_text(html: str) -> tuple[str, str]:
+    """Return (title, text) of the readable part of an HTML document."""
+    parser = _ReadableTextParser()
+    parser.feed(html)
+    parser.close()
+
+    blocks = parser.article_blocks
+    if sum(len(b) for b in blocks) < settings.url_prefetch_min_chars:
+        blocks = parser.blocks
+    # Drop short fragments such as menu labels and share buttons.
+    blocks = [b for b in blocks if len(b) >= 20]
+
+    title = (parser.og_title or parser.title).strip()
+    return title, "\n\n".join(blocks)
+
+
+# ====================
+# On-disk cache
+# ====================
+
+def _cache_path(url: str) -> Path:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return Path(settings.url_cache_dir) / f"{digest}.json"
+
+
+def _read_cache(url: str) -> Optional[FetchedArticle]:
+    path = _cache_path(url)
+    try:
+        return FetchedArticle(**json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(article: FetchedArticle):
+    path = _cache_path(article.url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(asdict(article), ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+# ====================
+# Fetching
+# ====================
+
+class UnsafeURLError(ValueError):
+    """Raised for URLs the server must not fetch (other schemes, non-public addresses)."""
+
+
+async def _resolve_public(url: httpx.URL) -> str:
+    """Return a public IP address of the URL's host.
+
+    Raises UnsafeURLError for non-http(s) URLs and for hosts that resolve to
+    any private, loopback, link-local or otherwise non-global address.
+    """
+    if url.scheme not in ("http", "https") or not url.host:
+        raise UnsafeURLError(f"Only http(s) URLs can be fetched: {url}")
+    port = url.port or (443 if url.scheme == "https" else 80)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(url.host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise UnsafeURLError(f"Cannot resolve {url.host}: {e}") from e
+
+    addresses = []
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise UnsafeURLError(f"{url.host} resolves to a non-public address ({address})")
+        addresses.append(str(address))
+    if not addresses:
+        raise UnsafeURLError(f"Cannot resolve {url.host}")
+    return addresses[0]
+
+
+@contextlib.asynccontextmanager
+async def _stream_public(url: str, headers: dict) -> AsyncIterator[httpx.Response]:
+    """GET a URL, following redirects by hand with the public-address check on every hop."""
+    client = get_http_client()
+    target = httpx.URL(url)
+    for _ in range(settings.url_fetch_max_redirects + 1):
+        address = await _resolve_public(target)
+        async with client.stream(
+            "GET",
+            target.copy_with(host=address),
+            headers={**headers, "Host": target.netloc.decode("ascii")},
+            extensions={"sni_hostname": target.host},
+        ) as response:
+            if not response.is_redirect:
+                yield response
+                return
+            target = target.join(response.headers["location"])
+            headers = {}  # cache validators belong to the original URL
+    raise httpx.TooManyRedirects(f"More than {settings.url_fetch_max_redirects} redirects: {url}", request=response.request)
+
+
+_client: Optional[httpx.AsyncClient] = None
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared, connection-pooled HTTP client."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.url_fetch_timeout_seconds,
+            follow_redirects=False,  # followed by _stream_public, which checks every hop
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            headers={
+                "User-Agent": "Mozilla/5.0 (compatible; FlipsideBot/1.0)",
+                "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.5",
+            },
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (call on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _download(url: str, cached: Optional[FetchedArticle]) -> Optional[FetchedArticle]:
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    async with _stream_public(url, headers) as response:
+        if response.status_code == 304 and cached:
+            logger.info(f"[URLFetcher] Not modified: {url}")
+            cached.fetched_at = time.time()
+            return cached
+        response.raise_for_status()
+
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type:
+            logger.info(f"[URLFetcher] Skipping non-HTML content ({content_type}): {url}")
+            return None
+
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > settings.url_fetch_max_bytes:
+                logger.info(f"[URLFetcher] Page exceeds {settings.url_fetch_max_bytes} bytes, truncating: {url}")
+                break
+
+        encoding = response.encoding or "utf-8"
+        html = bytes(body).decode(encoding, errors="replace")
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+
+    title, text = await asyncio.to_thread(extract_readable_text, html)
+    return FetchedArticle(
+        url=url,
+        title=title,
+        text=text[:settings.url_prefetch_max_chars],
+        etag=etag,
+        last_modified=last_modified,
+        fetched_at=time.time(),
+    )
+
+
+async def _fetch(url: str) -> Optional[FetchedArticle]:
+    cached = await asyncio.to_thread(_read_cache, url)
+    if cached and time.time() - cached.fetched_at < settings.url_cache_fresh_seconds:
+        logger.info(f"[URLFetcher] Fresh cache hit: {url}")
+        return cached
+
+    try:
+        article = await _download(url, cached)
+    except (httpx.HTTPError, UnsafeURLError, UnicodeError, LookupError) as e:
+        logger.warning(f"[URLFetcher] Fetch failed for {url}: {e}")
+        return None
+
+    if article is None:
+        return None
+    if len(article.text) < settings.url_prefetch_min_chars:
+        logger.info(f"[URLFetcher] Too little readable text ({len(article.text)} chars): {url}")
+        return None
+
+    try:
+        await asyncio.to_thread(_write_cache, article)
+    except OSError:
+        logger.exception(f"[URLFetcher] Failed to write cache for {url}")
+    return article
+
+
+def prefetch_url(url: str) -> asyncio.Task:
+    """Start fetching a URL in the background; concurrent callers share one task."""
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.create_task(_fetch(url))
+        _inflight[url] = task
+        task.add_done_callback(lambda _: _inflight.pop(url, None))
+    return task
+
+
+async def fetch_article(url: str) -> Optional[FetchedArticle]:
+    """Return readable article text for a URL, or None if it could not be extracted.
+
+    Awaits an in-flight prefetch for the same URL if there is one.
+    """
+    if not settings.url_prefetch_enabled:
+        return None
+    try:
+        # Shield the shared task so one cancelled waiter does not cancel it for others.
+        return await asyncio.shield(prefetch_url(url))
+    except Exception:
+        logger.exception(f"[URLFetcher] Unexpected error while fetching {url}")
+        return None
@@ -0,0 +1,275 @@
+"""Model usage accounting and budget-driven degradation.
+
+Every model call goes through app.core.gemini.generate_for_node, which asks
+plan_call for a preflight estimate before the call and hands the response's
+usage_metadata to record_call afterwards. Usage is recorded per node in the
+session's UsageLedger (served by /api/result) and in process-wide counters
+(served by /api/metrics).
+
+Sessions and tenants (the client id used for fair queuing) can have
+budgets. Once spent plus in-flight estimates plus the next call's estimate
+reach budget_degrade_ratio of a budget, Pro calls are downgraded to Flash
+and optional calls (GenerationProfile.optional) are skipped. Required calls
+are never refused, so an analysis always completes; the ratio leaves room
+for them.
+
+Tenant budgets are a best-effort cost limit, not a quota. The tenant is
+app.services.admission.client_id_of, which believes client headers only
+from settings.trusted_proxies (otherwise it is the peer address). Spend is
+kept in memory per worker for the current month only: each worker of a
+multi-worker deployment enforces the budget on its own share, and a
+restart starts from zero.
+
+The session a call belongs to is bound to the running task with
+bind_session (analysis runs, chat turns, prefetches).
+"""
+
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.config import GenerationProfile, ModelPrice, settings
+
+logger = logging.getLogger(__name__)
+
+_current_session: ContextVar[Optional[str]] = ContextVar("usage_session", default=None)
+
+
+def bind_session(session_id: str):
+    """Attribute model calls made by the current task (and tasks it starts) to a session."""
+    _current_session.set(session_id)
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised instead of an optional model call once the budget is nearly spent."""
+
+
+class NodeUsage(BaseModel):
+    """Usage counters of one node (or a total)."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    thinking_tokens: int = 0
+    cached_tokens: int = 0
+    grounding_calls: int = 0
+    cost_usd: float = 0.0
+    downgraded_calls: int = 0
+    skipped_calls: int = 0
+
+    def add(self, other: "NodeUsage"):
+        for name in NodeUsage.model_fields:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+class UsageLedger(BaseModel):
+    """Model usage of one session, per node and in total."""
+
+    budget_usd: Optional[float] = None
+    total: NodeUsage = Field(default_factory=NodeUsage)
+    nodes: dict[str, NodeUsage] = Field(default_factory=dict)
+    reserved_usd: float = 0.0  # preflight estimates of calls in flight
+
+    def add(self, node: str, usage: NodeUsage):
+        self.nodes.setdefault(node, NodeUsage()).add(usage)
+        self.total.add(usage)
+
+
+def _month() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+class UsageMetrics:
+    """Process-wide usage per (node, model) and spend per tenant in the current month."""
+
+    def __init__(self):
+        self.by_node_model: dict[tuple[str, str], NodeUsage] = {}
+        self.tenant_spend: dict[tuple[str, str], float] = {}  # (tenant, month) -> USD
+        self._month = _month()
+
+    def add(self, node: str, model: str, tenant: str, usage: NodeUsage):
+        self.by_node_model.setdefault((node, model), NodeUsage()).add(usage)
+        if tenant and usage.cost_usd:
+            month = _month()
+            if month != self._month:
+                # Only the current month is budgeted; past months are dropped.
+                self.tenant_spend = {k: v for k, v in self.tenant_spend.items() if k[1] == month}
+                self._month = month
+            key = (tenant, month)
+            self.tenant_spend[key] = self.tenant_spend.get(key, 0.0) + usage.cost_usd
+
+    def tenant_month_spend(self, tenant: str) -> float:
+        return self.tenant_spend.get((tenant, _month()), 0.0)
+
+
+usage_metrics = UsageMetrics()
+
+
+def price_for(model: str) -> ModelPrice:
+    """Price of a model name (or alias); unknown models are priced as Flash."""
+    prices = settings.model_prices
+    if model in prices:
+        return prices[model]
+    aliases = {
+        settings.gemini_model_pro: "pro",
+        settings.gemini_model_flash: "flash",
+        settings.gemini_model_image: "image",
+    }
+    return prices.get(aliases.get(model, "flash"), prices["flash"])
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0, grounding_calls: int = 0) -> float:
+    price = price_for(model)
+    cached_price = price.input_per_million if price.cached_input_per_million is None else price.cached_input_per_million
+    return (
+        (input_tokens - cached_tokens) * price.input_per_million
+        + cached_tokens * cached_price
+        + output_tokens * price.output_per_million
+    ) / 1_000_000 + grounding_calls * settings.grounding_price_per_call
+
+
+def estimate_tokens(contents) -> int:
+    """Local preflight estimate of a request's input tokens (no API call)."""
+    items = contents if isinstance(contents, list) else [contents]
+    tokens = 0
+    for item in items:
+        text = item if isinstance(item, str) else getattr(item, "text", None)
+        if text:
+            tokens += int(len(text) / settings.usage_chars_per_token)
+        elif getattr(item, "inline_data", None) is not None or getattr(item, "file_data", None) is not None:
+            tokens += settings.usage_tokens_per_image
+    return tokens
+
+
+def _tenant_budget(tenant: str) -> Optional[float]:
+    if not tenant:
+        return None
+    return settings.tenant_monthly_budgets_usd.get(tenant, settings.tenant_default_monthly_budget_usd)
+
+
+def _session(session_id: Optional[str]):
+    if not session_id:
+        return None
+    from app.services.session import session_store
+
+    return session_store.get(session_id)
+
+
+def _near_budget(ledger: Optional[UsageLedger], tenant: str, extra_usd: float) -> bool:
+    """Whether spending extra_usd more crosses the degrade ratio of the session or tenant budget."""
+    ratio = settings.budget_degrade_ratio
+    if ledger is not None and ledger.budget_usd is not None:
+        if ledger.total.cost_usd + ledger.reserved_usd + extra_usd >= ratio * ledger.budget_usd:
+            return True
+    tenant_budget = _tenant_budget(tenant)
+    if tenant_budget is not None:
+        if usage_metrics.tenant_month_spend(tenant) + extra_usd >= ratio * tenant_budget:
+            return True
+    return False
+
+
+def optional_call_allowed(node: str) -> bool:
+    """False once the current session or its tenant nears its budget."""
+    session = _session(_current_session.get())
+    if session is None:
+        return True
+    allowed = not _near_budget(session.usage, session.client_id, 0.0)
+    if not allowed:
+        _record_skip(session, node)
+    return allowed
+
+
+@dataclass
+class CallPlan:
+    """Model and preflight estimate for one call, with the session it is billed to."""
+
+    node: str
+    model: str
+    estimate_usd: float
+    downgraded: bool = False
+    session_id: Optional[str] = None
+
+
+def plan_call(node: str, profile: GenerationProfile, model: str, contents) -> CallPlan:
+    """Estimate a call and apply the budget policy (Flash downgrade, optional skip).
+
+    Raises BudgetExceededError for optional calls near the budget.
+    """
+    session_id = _current_session.get()
+    session = _session(session_id)
+    input_tokens = estimate_tokens(contents)
+    output_tokens = profile.max_output_tokens or settings.usage_default_output_tokens
+    plan = CallPlan(node, model, call_cost(model, input_tokens, output_tokens), session_id=session_id)
+    if session is None:
+        return plan
+
+    ledger = session.usage
+    if _near_budget(ledger, session.client_id, plan.estimate_usd):
+        if profile.optional:
+            _record_skip(session, node, model)
+            raise BudgetExceededError(f"Budget nearly spent, skipping optional {node} call")
+        if model == settings.gemini_model_pro:
+            plan.model = settings.gemini_model_flash
+            plan.estimate_usd = call_cost(plan.model, input_tokens, output_tokens)
+            plan.downgraded = True
+            logger.info(f"[Usage] Downgraded {node} to {plan.model} near the budget (session={session_id})")
+    ledger.reserved_usd += plan.estimate_usd
+    return plan
+
+
+def release_call(plan: CallPlan):
+    """Drop the reservation of a call that failed."""
+    session = _session(plan.session_id)
+    if session is not None:
+        session.usage.reserved_usd = max(0.0, session.usage.reserved_usd - plan.estimate_usd)
+
+
+def record_call(plan: CallPlan, response) -> NodeUsage:
+    """Record a response's usage_metadata for the node, the session and the process."""
+    meta = getattr(response, "usage_metadata", None)
+    input_tokens = (getattr(meta, "prompt_token_count", None) or 0) + (getattr(meta, "tool_use_prompt_token_count", None) or 0)
+    output_tokens = getattr(meta, "candidates_token_count", None) or 0
+    thinking_tokens = getattr(meta, "thoughts_token_count", None) or 0
+    cached_tokens = getattr(meta, "cached_content_token_count", None) or 0
+    grounding_calls = 0
+    if getattr(response, "candidates", None):
+        grounding = getattr(response.candidates[0], "grounding_metadata", None)
+        if grounding is not None and grounding.web_search_queries:
+            grounding_calls = 1
+
+    usage = NodeUsage(
+        calls=1,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        thinking_tokens=thinking_tokens,
+        cached_tokens=cached_tokens,
+        grounding_calls=grounding_calls,
+        cost_usd=call_cost(plan.model, input_tokens, output_tokens + thinking_tokens, cached_tokens, grounding_calls),
+        downgraded_calls=int(plan.downgraded),
+    )
+
+    session = _session(plan.session_id)
+    usage_metrics.add(plan.node, plan.model, session.client_id if session else "", usage)
+    if session is not None:
+        session.usage.reserved_usd = max(0.0, session.usage.reserved_usd - plan.estimate_usd)
+        session.usage.add(plan.node, usage)
+        _touch(session.id)
+    return usage
+
+
+def _record_skip(session, node: str, model: str = ""):
+    skipped = NodeUsage(skipped_calls=1)
+    session.usage.add(node, skipped)
+    usage_metrics.add(node, model, session.client_id, skipped)
+    _touch(session.id)
+    logger.info(f"[Usage] Skipped optional {node} near the budget (session={session.id})")
+
+
+def _touch(session_id: str):
+    from app.services.session import session_store
+
+    session_store.update(session_id)
@@ -0,0 +1 @@
+"""Offline benchmarks for the Flipside API (run from apps/api with `python -m benchmarks.<name>`)."""
@@ -0,0 +1,120 @@
+"""Shared pieces for the offline benchmarks: in-process server, SSE client, fake backend."""
+
+import asyncio
+import contextlib
+import json
+import statistics
+import time
+from typing import AsyncIterator
+
+import httpx
+import uvicorn
+
+from app.core.config import settings
+from app.core.fake_gemini import Cassette, FakeGeminiClient, FaultInjector, LatencyModel
+from app.core.gemini import set_gemini_client
+
+SAMPLE_TEXTS = [
+    "정부가 내년 최저임금을 5% 인상한다고 발표했다. 경영계는 고용 감소를 우려하며 반발했고, "
+    "노동계는 물가 상승률에도 못 미친다며 추가 인상을 요구했다. 한 연구원은 인상 효과가 "
+    "지역별로 크게 다를 것이라고 분석했다.",
+    "새로운 연구에 따르면 하루 30분 걷기가 심혈관 질환 위험을 절반으로 줄인다. 연구진은 "
+    "10만 명을 10년간 추적했으며, 전문가들은 인과관계를 단정하기 어렵다고 지적했다.",
+    "전기차 판매가 3분기 연속 감소했다. 업계는 충전 인프라 부족을 원인으로 꼽았지만, "
+    "일부 분석가는 보조금 축소와 금리 상승이 더 큰 영향을 미쳤다고 본다.",
+]
+
+
+def install_fake_backend(
+    *,
+    latency: str = "fixed:0",
+    error_rate: float = 0.0,
+    timeout_rate: float = 0.0,
+    cassette: str | None = None,
+    seed: int = 0,
+    strict: bool = False,
+    keyword_overlap: float = 0.5,
+) -> FakeGeminiClient:
+    """Route every model call in the app to a FakeGeminiClient."""
+    client = FakeGeminiClient(
+        cassette=Cassette(cassette),
+        latency=LatencyModel(latency),
+        faults=FaultInjector(error_rate=error_rate, timeout_rate=timeout_rate),
+        seed=seed,
+        strict=strict,
+        keyword_overlap=keyword_overlap,
+    )
+    set_gemini_client(client)
+    return client
+
+
+def disable_caches():
+    """Turn off cross-session reuse so every run pays for the full pipeline."""
+    settings.similarity_reuse_enabled = False
+    settings.perspective_cache_enabled = False
+    settings.url_prefetch_enabled = False
+
+
+@contextlib.asynccontextmanager
+async def running_server(app) -> AsyncIterator[str]:
+    """Serve the ASGI app with uvicorn on an ephemeral port; yields the base URL.
+
+    A real server is used because httpx's ASGI transport buffers whole
+    responses, which would hide SSE timing.
+    """
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+async def iter_sse(client: httpx.AsyncClient, url: str, headers: dict | None = None) -> AsyncIterator[tuple[float, dict]]:
+    """Yield (receive perf_counter, parsed data) for each SSE frame until the stream ends."""
+    async with client.stream("GET", url, headers=headers) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                yield time.perf_counter(), json.loads(line[len("data: "):])
+
+
+def is_terminal(event: dict) -> bool:
+    return event.get("type") in ("analysis_complete", "error")
+
+
+def interval_union(intervals: list[tuple[float, float]]) -> float:
+    """Total length covered by possibly overlapping intervals."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def summarize(values: list[float]) -> dict:
+    """mean / p50 / p95 / max of a sample (empty dict for no data)."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    p95_index = min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[p95_index],
+        "max": ordered[-1],
+    }
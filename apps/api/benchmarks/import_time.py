@@ -0,0 +1,147 @@
+"""Startup benchmark: import time, lifespan warm-up and the first analysis.
+
+Every run starts a fresh interpreter (nothing cached in sys.modules) on the
+offline Gemini backend and measures:
+
+- import: `import app.main`, the work done before uvicorn can even start
+- warm-up: the FastAPI lifespan startup (graph compile, clients, services)
+- ready: import + warm-up, i.e. when an autoscaled instance accepts traffic
+- first analysis: POST /api/analyze + the full /api/stream of the first
+  request served by the instance
+
+Runs alternate between the lifespan warm-up enabled and disabled, which
+shows what the first user pays without it. One extra run under
+`python -X importtime` lists the slowest modules imported by app.main.
+
+Usage (from apps/api):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --top 25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_CHILD = r"""
+import asyncio, json, time
+
+started_at = time.perf_counter()
+import app.main
+imported_at = time.perf_counter()
+
+
+async def run():
+    import httpx
+
+    app_ = app.main.app
+    async with app_.router.lifespan_context(app_):
+        warmed_at = time.perf_counter()
+        transport = httpx.ASGITransport(app=app_)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post("/api/analyze", json={"type": "text", "content": TEXT})
+            stream = await client.get(response.json()["stream_url"])
+            assert "analysis_complete" in stream.text, stream.text[-500:]
+        done_at = time.perf_counter()
+    return warmed_at, done_at
+
+
+warmed_at, done_at = asyncio.run(run())
+print(json.dumps({
+    "import": imported_at - started_at,
+    "warmup": warmed_at - imported_at,
+    "ready": warmed_at - started_at,
+    "first_analysis": done_at - warmed_at,
+}))
+"""
+
+
+def _child_env(warmup: bool) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")])),
+        "GEMINI_BACKEND": "fake",
+        "GEMINI_CASSETTE_PATH": "",
+        "GEMINI_FAKE_LATENCY": "fixed:0",
+        "SIMILARITY_REUSE_ENABLED": "false",
+        "STARTUP_WARMUP_ENABLED": "true" if warmup else "false",
+        "STARTUP_WARM_CONNECTIONS": "false",
+    })
+    return env
+
+
+def run_once(warmup: bool) -> dict:
+    from benchmarks.harness import SAMPLE_TEXTS
+
+    script = f"TEXT = {SAMPLE_TEXTS[0]!r}\n" + _CHILD
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        env=_child_env(warmup),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list[tuple[float, float, str]]:
+    """(cumulative ms, self ms, module) of the slowest imports of app.main."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=_child_env(True),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, module.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main(args: argparse.Namespace) -> int:
+    results = {True: [], False: []}
+    for _ in range(args.runs):
+        for warmup in (True, False):
+            results[warmup].append(run_once(warmup))
+
+    print(f"fresh interpreter per run, median of {args.runs} (ms)")
+    print(f"  {'lifespan warm-up':<18} {'import':>8} {'warm-up':>8} {'ready':>8} {'first analysis':>15}")
+    for warmup in (True, False):
+        runs = results[warmup]
+
+        def median(key):
+            return statistics.median(r[key] for r in runs) * 1000
+
+        label = "enabled" if warmup else "disabled"
+        print(
+            f"  {label:<18} {median('import'):8.1f} {median('warmup'):8.1f} "
+            f"{median('ready'):8.1f} {median('first_analysis'):15.1f}"
+        )
+
+    print(f"\nslowest imports of app.main (cumulative / self ms)")
+    for cumulative, self_ms, module in slowest_imports(args.top):
+        print(f"  {cumulative:8.1f} {self_ms:8.1f}  {module}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"enabled": results[True], "disabled": results[False]}, f, indent=2)
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", help="write per-run timings to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,227 @@
+"""End-to-end pipeline benchmark on the offline Gemini backend.
+
+Drives POST /api/analyze + GET /api/stream/{id} against a real uvicorn
+server running the app and the real create_flipside_graph(), with every
+model call answered by FakeGeminiClient. Reports per-node time,
+time-to-first-panel, total latency and orchestration overhead (total
+latency minus the time during which at least one model call was in flight).
+
+Usage (from apps/api):
+    python -m benchmarks.pipeline --runs 10
+    python -m benchmarks.pipeline --latency "pro=fixed:0.5;flash=fixed:0.2;default=fixed:0.1"
+    python -m benchmarks.pipeline --json report.json
+    python -m benchmarks.pipeline --mode fast   # analysis depth mode (generation profiles)
+    python -m benchmarks.pipeline --baseline report.json --max-regression 0.25   # CI gate
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from app.agents.graph import NODE_TIMING_HOOKS
+from benchmarks.harness import (
+    SAMPLE_TEXTS,
+    disable_caches,
+    install_fake_backend,
+    interval_union,
+    is_terminal,
+    iter_sse,
+    running_server,
+    summarize,
+)
+
+# Absolute slack for the regression gate, so sub-millisecond noise never fails CI.
+_REGRESSION_SLACK_MS = 5.0
+
+
+async def _run_once(
+    http: httpx.AsyncClient,
+    base_url: str,
+    fake,
+    node_runs: list,
+    content: str,
+    mode: str | None = None,
+) -> dict:
+    fake.calls.clear()
+    node_runs.clear()
+
+    started = time.perf_counter()
+    response = await http.post(f"{base_url}/api/analyze", json={"type": "text", "content": content, "mode": mode})
+    response.raise_for_status()
+    session_id = response.json()["session_id"]
+
+    first_panel_at = None
+    finished_at = None
+    outcome = "incomplete"
+    async for received_at, event in iter_sse(http, f"{base_url}/api/stream/{session_id}"):
+        if event.get("type") == "panel_update" and first_panel_at is None:
+            first_panel_at = received_at
+        if is_terminal(event):
+            finished_at = received_at
+            outcome = event["type"]
+            break
+    finished_at = finished_at or time.perf_counter()
+
+    total = finished_at - started
+    # Clip every call to the run: work started on completion (the Socrates
+    # prefetch) is still running, with no ended_at yet.
+    spans = [
+        (c.node, c.started_at, min(c.ended_at or finished_at, finished_at))
+        for c in fake.calls
+        if c.started_at < finished_at
+    ]
+    model_time = interval_union([(start, end) for _, start, end in spans])
+
+    nodes = {}
+    for _, name, node_start, node_end in node_runs:
+        # Clip to the node's run: calls it spawned in background tasks may outlive it.
+        calls = [
+            (max(start, node_start), min(end, node_end))
+            for node, start, end in spans
+            if node == name and start < node_end and end > node_start
+        ]
+        nodes[name] = {
+            "wall_ms": (node_end - node_start) * 1000,
+            "model_ms": interval_union(calls) * 1000,
+            "calls": len(calls),
+        }
+
+    return {
+        "outcome": outcome,
+        "total_ms": total * 1000,
+        "first_panel_ms": (first_panel_at - started) * 1000 if first_panel_at else None,
+        "model_ms": model_time * 1000,
+        "overhead_ms": (total - model_time) * 1000,
+        "model_calls": len(spans),
+        "nodes": nodes,
+    }
+
+
+def _report(runs: list[dict], args: argparse.Namespace) -> dict:
+    node_wall = defaultdict(list)
+    node_overhead = defaultdict(list)
+    for run in runs:
+        for name, node in run["nodes"].items():
+            node_wall[name].append(node["wall_ms"])
+            node_overhead[name].append(node["wall_ms"] - node["model_ms"])
+
+    return {
+        "config": {
+            "runs": args.runs,
+            "latency": args.latency,
+            "mode": args.mode,
+            "error_rate": args.error_rate,
+            "timeout_rate": args.timeout_rate,
+            "warm_caches": args.warm_caches,
+        },
+        "outcomes": {o: sum(1 for r in runs if r["outcome"] == o) for o in {r["outcome"] for r in runs}},
+        "total_ms": summarize([r["total_ms"] for r in runs]),
+        "first_panel_ms": summarize([r["first_panel_ms"] for r in runs if r["first_panel_ms"] is not None]),
+        "model_ms": summarize([r["model_ms"] for r in runs]),
+        "overhead_ms": summarize([r["overhead_ms"] for r in runs]),
+        "nodes": {
+            name: {"wall_ms": summarize(node_wall[name]), "overhead_ms": summarize(node_overhead[name])}
+            for name in node_wall
+        },
+    }
+
+
+def _print_report(report: dict):
+    def row(label: str, stats: dict):
+        if not stats:
+            print(f"  {label:<28} -")
+            return
+        print(f"  {label:<28} p50 {stats['p50']:9.1f}   p95 {stats['p95']:9.1f}   mean {stats['mean']:9.1f}")
+
+    print(f"outcomes: {report['outcomes']}")
+    print("latency (ms)")
+    row("total", report["total_ms"])
+    row("time to first panel", report["first_panel_ms"])
+    row("model time", report["model_ms"])
+    row("orchestration overhead", report["overhead_ms"])
+    print("per node wall time (ms)")
+    for name, stats in report["nodes"].items():
+        row(name, stats["wall_ms"])
+    print("per node overhead excl. model time (ms)")
+    for name, stats in report["nodes"].items():
+        row(name, stats["overhead_ms"])
+
+
+def _check_regression(report: dict, baseline_path: str, max_regression: float) -> bool:
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    current = report["overhead_ms"]["p50"]
+    reference = baseline["overhead_ms"]["p50"]
+    limit = reference * (1 + max_regression) + _REGRESSION_SLACK_MS
+    print(f"orchestration overhead p50: {current:.1f} ms (baseline {reference:.1f} ms, limit {limit:.1f} ms)")
+    return current <= limit
+
+
+async def main(args: argparse.Namespace) -> int:
+    from app.main import app
+
+    if not args.warm_caches:
+        disable_caches()
+    fake = install_fake_backend(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        cassette=args.cassette,
+        seed=args.seed,
+        keyword_overlap=args.keyword_overlap,
+    )
+
+    node_runs: list = []
+    hook = lambda *timing: node_runs.append(timing)  # noqa: E731
+    NODE_TIMING_HOOKS.append(hook)
+
+    runs = []
+    try:
+        async with running_server(app) as base_url, httpx.AsyncClient(timeout=None) as http:
+            for i in range(args.warmup + args.runs):
+                content = SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]
+                result = await _run_once(http, base_url, fake, node_runs, content, args.mode)
+                if i >= args.warmup:
+                    runs.append(result)
+    finally:
+        NODE_TIMING_HOOKS.remove(hook)
+
+    report = _report(runs, args)
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    if args.baseline and not _check_regression(report, args.baseline, args.max_regression):
+        return 1
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--latency", default="fixed:0", help="LatencyModel spec for the fake backend")
+    parser.add_argument("--mode", choices=["fast", "balanced", "deep"], help="analysis mode (server default if unset)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--cassette", help="JSONL cassette to replay (synthetic responses on misses)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--keyword-overlap", type=float, default=0.5,
+        help="share of the fake analyzer's keywords taken from the content (below "
+        "perspective_speculation_min_overlap the speculative search is discarded)",
+    )
+    parser.add_argument("--warm-caches", action="store_true", help="keep cross-session caches enabled")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="baseline report; exit 1 if overhead regressed")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
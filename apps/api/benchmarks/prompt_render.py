@@ -0,0 +1,142 @@
+"""Microbenchmark: prompt rendering and shared state serialization.
+
+Compares, per analysis-sized input, the previous rendering approaches
+(chained str.replace and str.format on the raw prompt strings, one
+json.dumps per use) with the precompiled PromptTemplate and the
+per-session state_json memo.
+
+Usage (from apps/api):
+    python -m benchmarks.prompt_render
+    python -m benchmarks.prompt_render --claims 30 --number 2000
+"""
+
+import argparse
+import json
+import sys
+import timeit
+
+from app.agents import prompts
+from app.agents.utils import state_json
+
+
+def _sample_state(n_claims: int) -> dict:
+    claims = [
+        {
+            "id": i,
+            "text": f"정부 발표에 따르면 {i}번째 정책은 내년부터 시행되며 전국 단위로 확대될 예정이다.",
+            "evidence": "보도자료 및 관계 부처 인터뷰 인용, 구체적 수치는 제시되지 않음",
+            "sources": [f"https://news.example.com/articles/{i}"],
+        }
+        for i in range(n_claims)
+    ]
+    biases = [
+        {"type": "framing", "confidence": 0.7, "example": "'폭탄 인상'이라는 표현으로 부정적 인상을 강조"},
+        {"type": "selection", "confidence": 0.5, "example": "반대 측 전문가 의견만 인용"},
+    ]
+    perspectives = [
+        {
+            "id": i,
+            "source": {"url": f"https://media{i}.example.com", "title": "관점 기사", "publisher": f"매체{i}"},
+            "main_claim": "정책 효과는 지역과 업종에 따라 크게 다르다",
+            "frame": "경제적 영향",
+            "key_points": ["고용 효과", "물가 영향", "지역 격차"],
+            "spectrum": {"political": 0.1 * i, "emotional": 0.3, "complexity": 0.6},
+        }
+        for i in range(4)
+    ]
+    return {
+        "session_id": "bench-session",
+        "claims": claims,
+        "detected_biases": biases,
+        "perspectives": perspectives,
+        "verified_sources": [],
+    }
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def legacy_render_all(state: dict) -> list[str]:
+    """Rendering as the nodes did it: chained replace / format, one dumps per use."""
+    claims, biases, perspectives = state["claims"], state["detected_biases"], state["perspectives"]
+    return [
+        prompts.SOURCE_VERIFIER_PROMPT
+        .replace("{sources}", "[]")
+        .replace("{claims}", _dumps(claims)),
+        prompts.PERSPECTIVE_EXPLORER_PROMPT
+        .replace("{topic}", claims[0]["text"])
+        .replace("{keywords}", '["최저임금", "고용"]')
+        .replace("{claims}", _dumps(claims)),
+        prompts.SOCRATES_QUESTION_GENERATOR_PROMPT.format(
+            claims=_dumps(claims), biases=_dumps(biases), perspectives=_dumps(perspectives)
+        ),
+        prompts.STEEL_MAN_GENERATOR_PROMPT.format(
+            claims=_dumps(claims),
+            biases=_dumps(biases),
+            perspectives=_dumps(perspectives[:3]),
+            sources=_dumps(state["verified_sources"][:2]),
+        ),
+        prompts.EXPANDED_TOPICS_PROMPT.format(
+            claims=_dumps(claims), biases=_dumps(biases), perspectives=_dumps(perspectives[:3])
+        ),
+    ]
+
+
+def compiled_render_all(state: dict) -> list[str]:
+    """Rendering as the nodes do it now: compiled templates + per-session memo."""
+    claims = state["claims"]
+    return [
+        prompts.SOURCE_VERIFIER_TEMPLATE.render(sources="[]", claims=state_json(state, "claims")),
+        prompts.PERSPECTIVE_EXPLORER_TEMPLATE.render(
+            topic=claims[0]["text"], keywords='["최저임금", "고용"]', claims=state_json(state, "claims")
+        ),
+        prompts.SOCRATES_QUESTION_GENERATOR_TEMPLATE.render(
+            claims=state_json(state, "claims"),
+            biases=state_json(state, "detected_biases"),
+            perspectives=state_json(state, "perspectives"),
+        ),
+        prompts.STEEL_MAN_GENERATOR_TEMPLATE.render(
+            claims=state_json(state, "claims"),
+            biases=state_json(state, "detected_biases"),
+            perspectives=state_json(state, "perspectives", limit=3),
+            sources=state_json(state, "verified_sources", limit=2),
+        ),
+        prompts.EXPANDED_TOPICS_TEMPLATE.render(
+            claims=state_json(state, "claims"),
+            biases=state_json(state, "detected_biases"),
+            perspectives=state_json(state, "perspectives", limit=3),
+        ),
+    ]
+
+
+def main(args: argparse.Namespace) -> int:
+    state = _sample_state(args.claims)
+    if legacy_render_all(state) != compiled_render_all(state):
+        print("rendered prompts differ between the legacy and compiled paths")
+        return 1
+
+    cases = {
+        "legacy (replace/format + dumps per use)": lambda: legacy_render_all(state),
+        "compiled templates + session memo": lambda: compiled_render_all(state),
+        "compiled templates, cold memo": lambda: compiled_render_all(dict(state, session_id=None)),
+    }
+    print(f"{args.claims} claims, 5 prompts per analysis, best of {args.repeat} x {args.number}")
+    baseline = None
+    for label, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat)) / args.number
+        baseline = baseline or best
+        print(f"  {label:<42} {best * 1e6:9.1f} us/analysis   ({baseline / best:4.1f}x)")
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=10)
+    parser.add_argument("--number", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,256 @@
+"""Concurrent SSE load test for /api/stream on the offline Gemini backend.
+
+Opens N concurrent analyses (POST /api/analyze + GET /api/stream/{id})
+against one uvicorn worker serving the real app, with the model layer
+answered by FakeGeminiClient, and measures for each concurrency level:
+
+- events per second delivered to clients
+- per-event delivery latency (server send of the SSE frame -> client receive)
+- event-loop lag (overshoot of a 10 ms ticker running in the server loop)
+- CPU time per event, i.e. the cost of event_generator's per-update
+  session_store.update / json.dumps work plus graph bookkeeping
+- memory per in-flight session (tracemalloc peak over the baseline)
+
+Client and server share one process and one clock, so send/receive
+timestamps are directly comparable. The client competes with the server
+for the same event loop; absolute numbers are therefore pessimistic, but
+runs are comparable with each other.
+
+Usage (from apps/api):
+    python -m benchmarks.sse_load --concurrency 10,50,100
+    python -m benchmarks.sse_load --concurrency 200 --latency "default=lognormal:0.5,0.4" --json load.json
+    python -m benchmarks.sse_load --concurrency 50 --profile   # top event_generator costs
+"""
+
+import argparse
+import asyncio
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.harness import (
+    SAMPLE_TEXTS,
+    disable_caches,
+    install_fake_backend,
+    is_terminal,
+    iter_sse,
+    running_server,
+    summarize,
+)
+
+_TICK_SECONDS = 0.01
+
+
+class SendRecorder:
+    """ASGI wrapper that timestamps every SSE data frame per stream path."""
+
+    def __init__(self, app):
+        self.app = app
+        self.sends: dict[str, list[float]] = defaultdict(list)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/stream/"):
+            return await self.app(scope, receive, send)
+
+        timestamps = self.sends[scope["path"]]
+
+        async def timed_send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                # Count data frames only (iter_sse skips heartbeat comments), in
+                # case chunks are coalesced.
+                frames = sum(1 for frame in message["body"].split(b"\n\n") if b"data: " in frame)
+                now = time.perf_counter()
+                timestamps.extend([now] * frames)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
+
+async def _loop_lag_monitor(samples: list[float], stop: asyncio.Event):
+    while not stop.is_set():
+        expected = time.perf_counter() + _TICK_SECONDS
+        await asyncio.sleep(_TICK_SECONDS)
+        samples.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def _session(http: httpx.AsyncClient, base_url: str, content: str) -> dict:
+    started = time.perf_counter()
+    response = await http.post(f"{base_url}/api/analyze", json={"type": "text", "content": content})
+    response.raise_for_status()
+    session_id = response.json()["session_id"]
+
+    path = f"/api/stream/{session_id}"
+    received = []
+    outcome = "incomplete"
+    async for received_at, event in iter_sse(http, f"{base_url}{path}"):
+        received.append(received_at)
+        if is_terminal(event):
+            outcome = event["type"]
+            break
+    return {
+        "path": path,
+        "outcome": outcome,
+        "received": received,
+        "total_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+async def _run_level(
+    http: httpx.AsyncClient,
+    base_url: str,
+    recorder: SendRecorder,
+    concurrency: int,
+    ramp_seconds: float,
+    trace_memory: bool,
+) -> dict:
+    recorder.sends.clear()
+    lag_samples: list[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_loop_lag_monitor(lag_samples, stop))
+
+    if trace_memory:
+        tracemalloc.reset_peak()
+        memory_baseline, _ = tracemalloc.get_traced_memory()
+
+    async def delayed(i: int):
+        await asyncio.sleep(ramp_seconds * i / concurrency)
+        return await _session(http, base_url, SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)])
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    sessions = await asyncio.gather(*(delayed(i) for i in range(concurrency)), return_exceptions=True)
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+
+    stop.set()
+    await monitor
+
+    memory_per_session_kb = None
+    if trace_memory:
+        _, memory_peak = tracemalloc.get_traced_memory()
+        memory_per_session_kb = (memory_peak - memory_baseline) / concurrency / 1024
+
+    failures = [s for s in sessions if isinstance(s, BaseException)]
+    completed = [s for s in sessions if not isinstance(s, BaseException)]
+
+    delivery = []
+    for session in completed:
+        sent = recorder.sends.get(session["path"], [])
+        delivery.extend((r - s) * 1000 for s, r in zip(sent, session["received"]))
+
+    events = sum(len(s["received"]) for s in completed)
+    outcomes = defaultdict(int)
+    for session in completed:
+        outcomes[session["outcome"]] += 1
+    if failures:
+        outcomes["client_error"] += len(failures)
+
+    return {
+        "concurrency": concurrency,
+        "outcomes": dict(outcomes),
+        "wall_s": wall,
+        "events": events,
+        "events_per_s": events / wall if wall else 0.0,
+        "cpu_ms_per_event": cpu * 1000 / events if events else None,
+        "session_ms": summarize([s["total_ms"] for s in completed]),
+        "delivery_ms": summarize(delivery),
+        "loop_lag_ms": summarize(lag_samples),
+        "memory_per_session_kb": memory_per_session_kb,
+    }
+
+
+def _print_level(level: dict):
+    def fmt(stats: dict) -> str:
+        if not stats:
+            return "-"
+        return f"p50 {stats['p50']:8.2f}  p95 {stats['p95']:8.2f}  max {stats['max']:8.2f}"
+
+    print(f"concurrency {level['concurrency']}: {level['outcomes']}")
+    print(f"  events/s              {level['events_per_s']:10.1f}   ({level['events']} events in {level['wall_s']:.2f}s)")
+    if level["cpu_ms_per_event"] is not None:
+        print(f"  cpu per event (ms)    {level['cpu_ms_per_event']:10.3f}")
+    print(f"  session total (ms)    {fmt(level['session_ms'])}")
+    print(f"  delivery latency (ms) {fmt(level['delivery_ms'])}")
+    print(f"  event-loop lag (ms)   {fmt(level['loop_lag_ms'])}")
+    if level["memory_per_session_kb"] is not None:
+        print(f"  memory per session    {level['memory_per_session_kb']:10.1f} KiB")
+
+
+def _print_profile(profiler: cProfile.Profile, limit: int = 15):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("tottime").print_stats(r"analyze\.py|session\.py|json", limit)
+    print(stream.getvalue())
+
+
+async def main(args: argparse.Namespace) -> int:
+    from app.main import app
+
+    disable_caches()
+    install_fake_backend(latency=args.latency, seed=args.seed)
+    recorder = SendRecorder(app)
+    levels = [int(n) for n in args.concurrency.split(",")]
+
+    if args.trace_memory:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if args.profile else None
+
+    results = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with running_server(recorder) as base_url, httpx.AsyncClient(timeout=None, limits=limits) as http:
+        # Warm imports, graph compilation and connection setup outside the measurement.
+        await _session(http, base_url, SAMPLE_TEXTS[0])
+        for concurrency in levels:
+            if profiler:
+                profiler.enable()
+            level = await _run_level(http, base_url, recorder, concurrency, args.ramp, args.trace_memory)
+            if profiler:
+                profiler.disable()
+            _print_level(level)
+            results.append(level)
+
+    if args.trace_memory:
+        tracemalloc.stop()
+    if profiler:
+        _print_profile(profiler)
+
+    report = {
+        "config": {
+            "latency": args.latency,
+            "ramp_s": args.ramp,
+            "trace_memory": args.trace_memory,
+        },
+        "levels": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="10,50", help="comma separated concurrent session counts")
+    parser.add_argument("--ramp", type=float, default=0.0, help="seconds over which to spread session starts")
+    parser.add_argument("--latency", default="pro=lognormal:0.3,0.3;default=lognormal:0.1,0.3")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-trace-memory",
+        dest="trace_memory",
+        action="store_false",
+        help="skip tracemalloc (it slows allocation-heavy code and inflates lag)",
+    )
+    parser.add_argument("--profile", action="store_true", help="cProfile the levels and print the top costs")
+    parser.add_argument("--json", help="write the report to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
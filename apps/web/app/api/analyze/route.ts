@@ -1,6 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server';
 import type { AnalyzeRequest, AnalyzeResponse, ApiResponse } from '@/lib/types';
-import { fetchBackend, convertKeys } from '@/lib/api/backend';
+import { fetchBackend, convertKeys, clientAddress } from '@/lib/api/backend';
 
 export async function POST(request: NextRequest) {
   try {
@@ -46,9 +46,16 @@ export async function POST(request: NextRequest) {
       );
     }
 
+    // Forward the browser's address (never its own X-Forwarded-For or
+    // X-Client-Id): the backend queues and budgets analyses per client.
+    const forwardedFor = clientAddress(request);
     const raw = await fetchBackend<Record<string, unknown>>('/api/analyze', {
       method: 'POST',
-      body: JSON.stringify({ type: body.type, content: body.content }),
+      headers: {
+        'Content-Type': 'application/json',
+        ...(forwardedFor ? { 'X-Forwarded-For': forwardedFor } : {}),
+      },
+      body: JSON.stringify({ type: body.type, content: body.content, mode: body.mode }),
     });
     const data = convertKeys(raw) as AnalyzeResponse;
     return NextResponse.json<ApiResponse<AnalyzeResponse>>({
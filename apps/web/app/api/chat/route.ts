@@ -2,6 +2,15 @@ import { NextRequest, NextResponse } from 'next/server';
 import type { ChatRequest, ChatResponse, ApiResponse } from '@/lib/types';
 import { fetchBackend, convertKeys } from '@/lib/api/backend';
 
+// Forward the client's Idempotency-Key so retried submits share one reply.
+function backendHeaders(request: NextRequest): HeadersInit {
+  const idempotencyKey = request.headers.get('idempotency-key');
+  return {
+    'Content-Type': 'application/json',
+    ...(idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}),
+  };
+}
+
 export async function POST(request: NextRequest) {
   try {
     const body = (await request.json()) as Partial<ChatRequest> & {
@@ -34,6 +43,7 @@ export async function POST(request: NextRequest) {
           : '아니요';
     const raw = await fetchBackend<Record<string, unknown>>('/api/chat', {
       method: 'POST',
+      headers: backendHeaders(request),
       body: JSON.stringify({
         sessionId: body.sessionId,
         message: normalizedMessage,
@@ -80,6 +90,7 @@ export async function PUT(request: NextRequest) {
     const normalizedMessage = agreed ? '네, 동의해요' : '아니요';
     const raw = await fetchBackend<Record<string, unknown>>('/api/chat', {
       method: 'POST',
+      headers: backendHeaders(request),
       body: JSON.stringify({
         sessionId,
         message: normalizedMessage,
@@ -1,17 +1,35 @@
 import { NextRequest } from 'next/server';
-import { backendUrl } from '@/lib/api/backend';
+import { backendUrl, clientAddress } from '@/lib/api/backend';
 
 export const dynamic = 'force-dynamic';
 
 export async function GET(
-  _request: NextRequest,
+  request: NextRequest,
   { params }: { params: Promise<{ sessionId: string }> }
 ) {
   const { sessionId } = await params;
 
-  const backendRes = await fetch(backendUrl(`/api/stream/${sessionId}`), {
-    headers: { Accept: 'text/event-stream' },
-  });
+  // Forward Last-Event-ID so a reconnecting EventSource only gets missed events.
+  const headers: Record<string, string> = { Accept: 'text/event-stream' };
+  const lastEventId = request.headers.get('last-event-id');
+  if (lastEventId) {
+    headers['Last-Event-ID'] = lastEventId;
+  }
+  // The browser's address identifies the client of a session rebuilt after a backend restart.
+  const forwardedFor = clientAddress(request);
+  if (forwardedFor) {
+    headers['X-Forwarded-For'] = forwardedFor;
+  }
+
+  // Abort the upstream stream when the browser goes away, so the backend
+  // stops counting this client as listening.
+  const backendRes = await fetch(backendUrl(`/api/stream/${sessionId}`), { headers, signal: request.signal });
+
+  // 204 means the run finished and this client has every event; passing it
+  // through stops EventSource from reconnecting.
+  if (backendRes.status === 204) {
+    return new Response(null, { status: 204 });
+  }
 
   if (!backendRes.ok || !backendRes.body) {
     return new Response(
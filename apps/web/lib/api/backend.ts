@@ -3,6 +3,25 @@ function backendBaseUrl(): string {
   return raw.trim().replace(/\/+$/, '');
 }
 
+// Reverse proxies in front of this server that append the address they
+// received the request from to X-Forwarded-For (e.g. 1 for a load balancer).
+// Entries left of theirs were written by the browser and are ignored; with 0
+// (server exposed directly) no address is forwarded at all.
+const TRUSTED_PROXY_HOPS = Number(process.env.TRUSTED_PROXY_HOPS ?? '1');
+
+/**
+ * Address the browser connected from, as recorded by the outermost trusted
+ * proxy (null when unknown). The backend queues and budgets per client on it.
+ */
+export function clientAddress(request: Request): string | null {
+  if (!(TRUSTED_PROXY_HOPS > 0)) return null;
+  const hops = (request.headers.get('x-forwarded-for') ?? '')
+    .split(',')
+    .map((hop) => hop.trim())
+    .filter(Boolean);
+  return hops.length >= TRUSTED_PROXY_HOPS ? hops[hops.length - TRUSTED_PROXY_HOPS] : null;
+}
+
 export function backendUrl(path: string): string {
   const base = backendBaseUrl();
   const normalizedPath = path.startsWith('/') ? path : `/${path}`;
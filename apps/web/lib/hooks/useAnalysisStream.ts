@@ -28,6 +28,13 @@ export function useAnalysisStream(
         const data = JSON.parse(event.data) as StreamEvent;
 
         switch (data.type) {
+          case 'queued':
+            updateAgent('analyzer', {
+              status: 'idle',
+              message: `대기 중 (${data.payload.position}번째)`,
+            });
+            break;
+
           case 'agent_status':
             updateAgent(data.payload.agentId as AgentId, {
               status: data.payload.status as AgentStatus,
@@ -87,6 +94,11 @@ export function useAnalysisStream(
         if (result.status === 'error') {
           setError('Analysis failed');
           stopPolling();
+          return;
+        }
+        if (result.status === 'cancelled') {
+          setError('Analysis cancelled');
+          stopPolling();
         }
       } catch {
         // Keep polling on transient failures.
@@ -8,12 +8,15 @@ export interface ContentInput {
   };
 }
 
+// 분석 세션 상태 ('cancelled': 아무도 듣지 않아 서버가 중단한 분석, 다시 연결하면 재개)
+export type SessionStatus = 'pending' | 'analyzing' | 'done' | 'error' | 'cancelled';
+
 // 분석 세션
 export interface AnalysisSession {
   id: string;
   createdAt: Date;
   content: ContentInput;
-  status: 'analyzing' | 'done' | 'error';
+  status: SessionStatus;
   result?: AnalysisResult;
 }
 
@@ -18,11 +18,22 @@ export interface ApiResponse<T> {
 
 // SSE 이벤트 (Discriminated Union)
 export type StreamEvent =
+  | QueuedEvent
   | AgentStatusEvent
   | PanelUpdateEvent
   | AnalysisCompleteEvent
   | StreamErrorEvent;
 
+// 분석 대기열에서 기다리는 동안 (position: 1부터)
+export interface QueuedEvent {
+  type: 'queued';
+  payload: {
+    position: number;
+    queueLength: number;
+    estimatedWaitSeconds: number;
+  };
+}
+
 export interface AgentStatusEvent {
   type: 'agent_status';
   payload: {
@@ -56,9 +67,12 @@ export interface StreamErrorEvent {
   };
 }
 
+export type AnalysisMode = 'fast' | 'balanced' | 'deep';
+
 export interface AnalyzeRequest {
   type: 'url' | 'text' | 'image';
   content: string;
+  mode?: AnalysisMode;
 }
 
 export interface AnalyzeResponse {
@@ -1,6 +1,7 @@
 export type {
   ContentInput,
   AnalysisSession,
+  SessionStatus,
   SourcePanelData,
   VerifiedSource,
   PerspectivePanelData,
@@ -57,6 +58,7 @@ export type {
   AnalysisCompleteEvent,
   StreamErrorEvent,
   AnalyzeRequest,
+  AnalysisMode,
   AnalyzeResponse,
   ChatRequest,
   ChatResponse,